@@ -0,0 +1,39 @@
+"""
+Add song_renders table for write-time rendered song bodies.
+
+Revision ID: 20261017_000001
+Revises: 06fb30c7a21a
+Create Date: 2026-10-17 00:00:01
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op as alembic_op
+
+revision = '20261017_000001'
+down_revision = '06fb30c7a21a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    alembic_op.create_table(
+        'song_renders',
+        sa.Column(
+            'song_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('songs.id', ondelete='CASCADE'),
+            primary_key=True,
+        ),
+        sa.Column('key', sa.String(length=3), primary_key=True),
+        sa.Column('chords', sa.Boolean(), primary_key=True),
+        sa.Column('html', sa.Text(), nullable=False),
+        sa.Column('source_updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    alembic_op.drop_table('song_renders')
@@ -0,0 +1,36 @@
+"""
+Add stored ChordPro parse columns to songs.
+
+Revision ID: 20261017_000002
+Revises: 20261017_000001
+Create Date: 2026-10-17 00:00:02
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op as alembic_op
+
+revision = '20261017_000002'
+down_revision = '20261017_000001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by `python -m app.song_ast`; readers re-parse rows left NULL.
+    alembic_op.add_column(
+        'songs',
+        sa.Column('chordpro_ast', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+    alembic_op.add_column(
+        'songs',
+        sa.Column('chordpro_ast_version', sa.SmallInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    alembic_op.drop_column('songs', 'chordpro_ast_version')
+    alembic_op.drop_column('songs', 'chordpro_ast')
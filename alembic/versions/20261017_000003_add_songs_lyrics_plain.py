@@ -0,0 +1,46 @@
+"""
+Add generated lyrics_plain column with a trigram index.
+
+Revision ID: 20261017_000003
+Revises: 20261017_000002
+Create Date: 2026-10-17 00:00:03
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op as alembic_op
+
+revision = '20261017_000003'
+down_revision = '20261017_000002'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.db.LYRICS_PLAIN_SQL at this revision.
+LYRICS_PLAIN_SQL = (
+    'regexp_replace(lower('
+    'regexp_replace(regexp_replace(regexp_replace(chordpro_content, '
+    r"'\[[^\]]+\]', '', 'g'), "
+    r"'\{start_of_section:\s*[^}]+\}', '', 'gi'), "
+    r"'\{end_of_section\}', '', 'gi')), "
+    "'[\u2019\u02bc\u2018`\u2032]', '''', 'g')"
+)
+
+
+def upgrade() -> None:
+    # Existing rows are computed by Postgres while the column is added.
+    alembic_op.add_column(
+        'songs',
+        sa.Column('lyrics_plain', sa.Text(), sa.Computed(LYRICS_PLAIN_SQL, persisted=True)),
+    )
+    alembic_op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    alembic_op.execute(
+        'CREATE INDEX IF NOT EXISTS songs_lyrics_plain_trgm '
+        'ON songs USING gin (lyrics_plain gin_trgm_ops)',
+    )
+
+
+def downgrade() -> None:
+    alembic_op.execute('DROP INDEX IF EXISTS songs_lyrics_plain_trgm')
+    alembic_op.drop_column('songs', 'lyrics_plain')
@@ -0,0 +1,27 @@
+"""
+Add a text_pattern_ops index for title prefix suggestions.
+
+Revision ID: 20261017_000004
+Revises: 20261017_000003
+Create Date: 2026-10-17 00:00:04
+"""
+
+from __future__ import annotations
+
+from alembic import op as alembic_op
+
+revision = '20261017_000004'
+down_revision = '20261017_000003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    alembic_op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_songs_title_prefix '
+        'ON songs (lower(translated_title) text_pattern_ops)',
+    )
+
+
+def downgrade() -> None:
+    alembic_op.execute('DROP INDEX IF EXISTS ix_songs_title_prefix')
@@ -0,0 +1,28 @@
+"""
+Add a covering index for the recent songs listing.
+
+Revision ID: 20261017_000005
+Revises: 20261017_000004
+Create Date: 2026-10-17 00:00:05
+"""
+
+from __future__ import annotations
+
+from alembic import op as alembic_op
+
+revision = '20261017_000005'
+down_revision = '20261017_000004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    alembic_op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_songs_recent_listing ON songs (created_at DESC) '
+        'INCLUDE (id, translated_title, original_title, artist, default_key, youtube_url, '
+        'songlink_url) WHERE is_draft IS false',
+    )
+
+
+def downgrade() -> None:
+    alembic_op.execute('DROP INDEX IF EXISTS ix_songs_recent_listing')
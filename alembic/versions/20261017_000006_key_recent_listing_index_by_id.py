@@ -0,0 +1,34 @@
+"""
+Add id to the recent listing index key for keyset pagination.
+
+Revision ID: 20261017_000006
+Revises: 20261017_000005
+Create Date: 2026-10-17 00:00:06
+"""
+
+from __future__ import annotations
+
+from alembic import op as alembic_op
+
+revision = '20261017_000006'
+down_revision = '20261017_000005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    alembic_op.execute('DROP INDEX IF EXISTS ix_songs_recent_listing')
+    alembic_op.execute(
+        'CREATE INDEX ix_songs_recent_listing ON songs (created_at DESC, id DESC) '
+        'INCLUDE (translated_title, original_title, artist, default_key, youtube_url, '
+        'songlink_url) WHERE is_draft IS false',
+    )
+
+
+def downgrade() -> None:
+    alembic_op.execute('DROP INDEX IF EXISTS ix_songs_recent_listing')
+    alembic_op.execute(
+        'CREATE INDEX ix_songs_recent_listing ON songs (created_at DESC) '
+        'INCLUDE (id, translated_title, original_title, artist, default_key, youtube_url, '
+        'songlink_url) WHERE is_draft IS false',
+    )
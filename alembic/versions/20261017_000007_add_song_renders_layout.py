@@ -0,0 +1,39 @@
+"""
+Keep stored song renders per render layout.
+
+Revision ID: 20261017_000007
+Revises: 20261017_000006
+Create Date: 2026-10-17 00:00:07
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op as alembic_op
+
+revision = '20261017_000007'
+down_revision = '20261017_000006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows were all rendered hard-wrapped.
+    alembic_op.add_column(
+        'song_renders',
+        sa.Column('layout', sa.String(length=8), nullable=False, server_default='wrapped'),
+    )
+    alembic_op.drop_constraint('song_renders_pkey', 'song_renders', type_='primary')
+    alembic_op.create_primary_key(
+        'song_renders_pkey',
+        'song_renders',
+        ['song_id', 'key', 'chords', 'layout'],
+    )
+
+
+def downgrade() -> None:
+    alembic_op.execute("DELETE FROM song_renders WHERE layout <> 'wrapped'")
+    alembic_op.drop_constraint('song_renders_pkey', 'song_renders', type_='primary')
+    alembic_op.create_primary_key('song_renders_pkey', 'song_renders', ['song_id', 'key', 'chords'])
+    alembic_op.drop_column('song_renders', 'layout')
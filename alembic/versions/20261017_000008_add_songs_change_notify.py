@@ -0,0 +1,52 @@
+"""
+Notify `song_changes` listeners whenever a song is written or deleted.
+
+Revision ID: 20261017_000008
+Revises: 20261017_000007
+Create Date: 2026-10-17 00:00:08
+"""
+
+from __future__ import annotations
+
+from alembic import op as alembic_op
+
+revision = '20261017_000008'
+down_revision = '20261017_000007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The payload shape is parsed by `SongChangeBus.handle`; a deleted song has no updated_at.
+    alembic_op.execute(
+        """
+        CREATE OR REPLACE FUNCTION songs_notify_change() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify(
+                    'song_changes',
+                    json_build_object('id', OLD.id, 'updated_at', NULL)::text
+                );
+            ELSE
+                PERFORM pg_notify(
+                    'song_changes',
+                    json_build_object('id', NEW.id, 'updated_at', NEW.updated_at)::text
+                );
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """,
+    )
+    alembic_op.execute(
+        """
+        CREATE TRIGGER songs_notify_change_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON songs
+        FOR EACH ROW EXECUTE FUNCTION songs_notify_change();
+        """,
+    )
+
+
+def downgrade() -> None:
+    alembic_op.execute('DROP TRIGGER IF EXISTS songs_notify_change_trigger ON songs')
+    alembic_op.execute('DROP FUNCTION IF EXISTS songs_notify_change()')
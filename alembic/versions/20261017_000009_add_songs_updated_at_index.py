@@ -0,0 +1,24 @@
+"""
+Index song change times, so the catalog version finds the latest one directly.
+
+Revision ID: 20261017_000009
+Revises: 20261017_000008
+Create Date: 2026-10-17 00:00:09
+"""
+
+from __future__ import annotations
+
+from alembic import op as alembic_op
+
+revision = '20261017_000009'
+down_revision = '20261017_000008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    alembic_op.execute('CREATE INDEX IF NOT EXISTS ix_songs_updated_at ON songs (updated_at)')
+
+
+def downgrade() -> None:
+    alembic_op.execute('DROP INDEX IF EXISTS ix_songs_updated_at')
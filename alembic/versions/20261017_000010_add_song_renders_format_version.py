@@ -0,0 +1,30 @@
+"""
+Record the render format of stored song renders.
+
+Revision ID: 20261017_000010
+Revises: 20261017_000009
+Create Date: 2026-10-17 00:00:10
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op as alembic_op
+
+revision = '20261017_000010'
+down_revision = '20261017_000009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Renders already stored may predate the current format, so they start out stale.
+    alembic_op.add_column(
+        'song_renders',
+        sa.Column('format_version', sa.SmallInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    alembic_op.drop_column('song_renders', 'format_version')
@@ -2,12 +2,16 @@
 
 __all__ = [
     'admin',
+    'cache',
     'db',
+    'http_cache',
     'main',
     'models',
     'parser',
+    'prerender',
     'renderer',
     'repositories',
     'settings',
+    'song_ast',
     'transposer',
 ]
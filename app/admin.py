@@ -15,9 +15,14 @@ from starlette.responses import RedirectResponse
 from wtforms import PasswordField, TextAreaField
 
 from .auth import AdminAuth
+from .cache import invalidate_song
 from .models import AdminUserModel, SongModel
 from .parser import parse_chordpro
+from .prerender import schedule_prerender
+from .search_cache import cached_searches
+from .search_refresh import schedule_search_index_refresh
 from .settings import settings
+from .song_ast import AST_FORMAT_VERSION, dump_parsed_song
 from .transposer import NOTE_TO_SEMITONE
 
 
@@ -70,11 +75,11 @@ class SongAdmin(ModelView, model=SongModel):
         is_created: bool,
         request: Request,
     ) -> None:
-        """Validate ChordPro before saving."""
-        _ = (is_created, request)
+        """Validate ChordPro, store its parse and drop cached renders of the song."""
+        _ = (request,)
         raw = data.get('chordpro_content') if 'chordpro_content' in data else model.chordpro_content
         content: str = str(raw)
-        parse_chordpro(content)
+        parsed = parse_chordpro(content)
         dk_raw = (
             data.get('default_key')
             if 'default_key' in data
@@ -86,6 +91,30 @@ class SongAdmin(ModelView, model=SongModel):
         root = dk.rstrip('m')
         if root not in NOTE_TO_SEMITONE:
             raise ValueError('default_key must be a valid key (e.g., C, F#, Eb, Em)')
+        data['chordpro_ast'] = dump_parsed_song(parsed)
+        data['chordpro_ast_version'] = AST_FORMAT_VERSION
+        song_id = getattr(model, 'id', None)
+        if not is_created and song_id is not None:
+            invalidate_song(song_id)
+
+    async def after_model_change(
+        self,
+        data: dict[str, Any],
+        model: SongModel,
+        is_created: bool,
+        request: Request,
+    ) -> None:
+        """Pre-render the saved song for every key and re-index it, in the background."""
+        _ = (data, is_created, request)
+        cached_searches.invalidate()
+        schedule_prerender(model.id)
+        schedule_search_index_refresh()
+
+    async def after_model_delete(self, model: SongModel, request: Request) -> None:
+        """Drop the deleted song from cached searches and the in-memory search index."""
+        _ = (model, request)
+        cached_searches.invalidate()
+        schedule_search_index_refresh()
 
 
 class AdminUserAdmin(ModelView, model=AdminUserModel):
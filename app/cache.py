@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Generic, Protocol, TypeVar
+
+from .parser import dump_parsed_song, load_parsed_song
+from .settings import settings
+from .shared_cache import TEXT_CODEC, Codec, SharedCache
+from .song_changes import song_changes
+
+if TYPE_CHECKING:  # pragma: no cover
+    import uuid
+    from collections.abc import Callable
+    from datetime import datetime
+
+    from .parser import ParsedSong
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+
+class CacheBackend(Protocol[K, V]):
+    """What the song caches need from a store: `LRUCache` in process or `SharedCache` per host."""
+
+    hits: int
+    misses: int
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, key: object) -> bool: ...
+
+    def get(self, key: K) -> V | None: ...
+
+    def set(self, key: K, value: V) -> None: ...
+
+    def discard_where(self, predicate: Callable[[K], bool]) -> int: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+class LRUCache(Generic[K, V]):
+    """Keep a bounded number of entries, evicting the least recently used."""
+
+    backend = 'memory'
+
+    def __init__(self, maxsize: int) -> None:
+        """Create an empty cache holding at most `maxsize` entries."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def get(self, key: K) -> V | None:
+        """Return a cached value and mark it as recently used."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting the oldest entries beyond capacity."""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def discard_where(self, predicate: Callable[[K], bool]) -> int:
+        """Drop entries whose key matches the predicate and return how many."""
+        stale = [key for key in self._data if predicate(key)]
+        for key in stale:
+            del self._data[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the counters."""
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+# The stored AST layout, as compact JSON.
+PARSED_SONG_CODEC: Codec[ParsedSong] = Codec(
+    lambda parsed: json.dumps(
+        dump_parsed_song(parsed),
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode(),
+    lambda data: load_parsed_song(json.loads(data)),
+)
+
+
+def song_cache(namespace: str, maxsize: int, codec: Codec[V]) -> CacheBackend[Any, V]:
+    """
+    Build a song cache on the backend `settings.cache_backend` names.
+
+    A `maxsize` of 0 turns the cache off on either backend; the shared one is
+    bounded by `settings.shared_cache_max_bytes` instead of an entry count.
+    """
+    if settings.cache_backend == 'sqlite' and maxsize > 0:
+        return SharedCache(
+            settings.shared_cache_path,
+            namespace,
+            settings.shared_cache_max_bytes,
+            codec,
+        )
+    return LRUCache(maxsize)
+
+
+# Parsed songs are shared between requests and must never be mutated in place.
+parsed_songs: CacheBackend[tuple[uuid.UUID, datetime], ParsedSong] = song_cache(
+    'parsed_songs',
+    settings.parsed_song_cache_size,
+    PARSED_SONG_CODEC,
+)
+
+# Finished `<article class="song">` markup per (id, updated_at, target key, show chords, layout).
+song_articles: CacheBackend[tuple[uuid.UUID, datetime, str | None, bool, str], str] = song_cache(
+    'song_articles',
+    settings.song_article_cache_size,
+    TEXT_CODEC,
+)
+
+# Transposed chord symbols per (symbol, semitones, prefer sharps); pure, so never invalidated.
+# Cheaper to recompute than to fetch from a shared store, so always in process.
+transposed_chords: LRUCache[tuple[str, int, bool], str] = LRUCache(
+    settings.transposed_chord_cache_size,
+)
+
+
+song_changes.register_cache(parsed_songs)
+song_changes.register_cache(song_articles)
+
+
+def invalidate_song(song_id: uuid.UUID) -> None:
+    """Drop every cached artifact derived from a song."""
+    parsed_songs.discard_where(lambda key: key[0] == song_id)
+    song_articles.discard_where(lambda key: key[0] == song_id)
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Return counters of every song cache."""
+    return {
+        'parsed_songs': parsed_songs.stats(),
+        'song_articles': song_articles.stats(),
+        'transposed_chords': transposed_chords.stats(),
+    }
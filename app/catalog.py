@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .repositories.songs import get_catalog_version
+from .song_changes import SongChangeBus, song_changes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Callable
+    from datetime import datetime
+
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+    CatalogVersion = tuple[datetime | None, int]
+
+
+class CatalogVersionCache:
+    """
+    Remember `get_catalog_version` between song changes.
+
+    Listings validate against it on every request, so the aggregate query runs
+    once per change rather than per request. The stored value is trusted only
+    while the song change listener is connected; otherwise every lookup reads
+    the database.
+    """
+
+    def __init__(
+        self,
+        bus: SongChangeBus,
+        load: Callable[[AsyncConnection], Awaitable[CatalogVersion]] = get_catalog_version,
+    ) -> None:
+        """Subscribe to `bus` so any song change drops the stored version."""
+        self.loads = 0
+        self._bus = bus
+        self._load = load
+        self._version: CatalogVersion | None = None
+        # Bumped per change, so a query racing with one does not store its answer.
+        self._epoch = 0
+        bus.subscribe(lambda _song_id, _updated_at: self.invalidate(), self.invalidate)
+
+    def invalidate(self) -> None:
+        """Make the next lookup read the database."""
+        self._version = None
+        self._epoch += 1
+
+    async def get(self, conn: AsyncConnection) -> CatalogVersion:
+        """Return the latest song change and the number of songs."""
+        if self._version is not None and self._bus.connected:
+            return self._version
+        # Only a read made while listening is sure to be invalidated by later changes.
+        listening, epoch = self._bus.connected, self._epoch
+        version = await self._load(conn)
+        self.loads += 1
+        if listening and epoch == self._epoch:
+            self._version = version
+        return version
+
+    def stats(self) -> dict[str, Any]:
+        """Return how often the database was asked."""
+        return {'loads': self.loads, 'cached': self._version is not None}
+
+
+catalog_version = CatalogVersionCache(song_changes)
@@ -2,10 +2,25 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, DateTime, Index, MetaData, String, Table, Text, func, text
-from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    MetaData,
+    SmallInteger,
+    String,
+    Table,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
+from .parser import APOSTROPHE_VARIANTS
 from .settings import settings
 
 
@@ -24,6 +39,20 @@ def _build_metadata() -> MetaData:
 
 metadata = _build_metadata()
 
+# Text search configuration used by the `songs_update_search_vector` trigger.
+SEARCH_TS_CONFIG = 'simple'
+
+# `app.parser.plain_lyrics` in SQL: the `strip_chordpro_to_lyrics` rules, lowercased,
+# apostrophe variants folded. Keep both in step; a migration must recreate the column.
+LYRICS_PLAIN_SQL = (
+    'regexp_replace(lower('
+    'regexp_replace(regexp_replace(regexp_replace(chordpro_content, '
+    r"'\[[^\]]+\]', '', 'g'), "
+    r"'\{start_of_section:\s*[^}]+\}', '', 'gi'), "
+    r"'\{end_of_section\}', '', 'gi')), "
+    f"'[{APOSTROPHE_VARIANTS}]', '''', 'g')"
+)
+
 
 songs = Table(
     'songs',
@@ -33,6 +62,11 @@ songs = Table(
     Column('translated_title', String(255), nullable=False, index=True),
     Column('artist', String(255), nullable=True, index=True),
     Column('chordpro_content', Text, nullable=False),
+    # Serialized `parse_chordpro` result, see `app.song_ast`; stale unless the version matches.
+    Column('chordpro_ast', JSONB, nullable=True),
+    Column('chordpro_ast_version', SmallInteger, nullable=True),
+    # Searchable plain lyrics; its trigram index lives in the migrations, as pg_trgm is optional.
+    Column('lyrics_plain', Text, Computed(LYRICS_PLAIN_SQL, persisted=True)),
     Column('default_key', String(3), nullable=False),
     Column('youtube_url', String(500), nullable=True),
     Column('songlink_url', String(500), nullable=True),
@@ -47,6 +81,50 @@ songs = Table(
         onupdate=func.now(),
     ),
     Index('ix_songs_created_at_desc', text('created_at DESC')),
+    Index('ix_songs_search_vector', 'search_vector', postgresql_using='gin'),
+    # `max(updated_at)` for the catalog version reads one index entry.
+    Index('ix_songs_updated_at', 'updated_at'),
+    # Covers the published recent listing (same predicate as the query) for index-only scans;
+    # `id` is a key so `(created_at, id) < (...)` keyset pages start with an index seek.
+    Index(
+        'ix_songs_recent_listing',
+        text('created_at DESC'),
+        text('id DESC'),
+        postgresql_include=[
+            'translated_title',
+            'original_title',
+            'artist',
+            'default_key',
+            'youtube_url',
+            'songlink_url',
+        ],
+        postgresql_where=text('is_draft IS false'),
+    ),
+    # Serves `lower(translated_title) LIKE 'prefix%'` suggestions in any collation.
+    Index('ix_songs_title_prefix', text('lower(translated_title) text_pattern_ops')),
+)
+
+
+# Song bodies rendered at write time; a row is fresh while it matches `songs.updated_at`
+# and the current render format.
+song_renders = Table(
+    'song_renders',
+    metadata,
+    Column(
+        'song_id',
+        UUID(as_uuid=True),
+        ForeignKey('songs.id', ondelete='CASCADE'),
+        primary_key=True,
+    ),
+    # Target key as requested in the setlist; '' stands for "no key given".
+    Column('key', String(3), primary_key=True),
+    Column('chords', Boolean, primary_key=True),
+    # RenderLayout the html was rendered with.
+    Column('layout', String(8), primary_key=True, server_default='wrapped'),
+    Column('html', Text, nullable=False),
+    Column('source_updated_at', DateTime(timezone=True), nullable=False),
+    # `prerender.RENDER_FORMAT_VERSION` the html was rendered with.
+    Column('format_version', SmallInteger, nullable=False, server_default=text('0')),
 )
 
 
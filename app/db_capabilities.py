@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import text
+
+from .db import get_connection
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# Indexes created by the migrations only when pg_trgm is available.
+TRIGRAM_INDEXES = frozenset({'songs_title_trgm', 'songs_artist_trgm', 'songs_lyrics_plain_trgm'})
+# GIN indexes on `search_vector`; the initial migration and the pg_trgm one each create one.
+TSVECTOR_INDEXES = frozenset({'ix_songs_search_vector', 'songs_search_vector_gin'})
+
+_DETECT_SQL = text(
+    """
+    SELECT
+        current_setting('server_version_num')::int AS server_version,
+        ARRAY(
+            SELECT extname::text FROM pg_extension WHERE extname IN ('pg_trgm', 'unaccent')
+        ) AS extensions,
+        ARRAY(
+            SELECT indexname::text FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = 'songs'
+        ) AS indexes
+    """,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DatabaseCapabilities:
+    """What the connected Postgres offers the search queries."""
+
+    server_version: int
+    extensions: frozenset[str] = frozenset()
+    indexes: frozenset[str] = frozenset()
+    detected_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    @property
+    def pg_trgm(self) -> bool:
+        """Whether `similarity()` and `%` can be used."""
+        return 'pg_trgm' in self.extensions
+
+    @property
+    def unaccent(self) -> bool:
+        """Whether `unaccent()` can be used."""
+        return 'unaccent' in self.extensions
+
+    @property
+    def trigram_indexes(self) -> bool:
+        """Whether every trigram index exists, so trigram matching avoids a scan."""
+        return TRIGRAM_INDEXES.issubset(self.indexes)
+
+    @property
+    def tsvector_index(self) -> bool:
+        """Whether `search_vector` matches are index-backed."""
+        return not TSVECTOR_INDEXES.isdisjoint(self.indexes)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-ready summary for diagnostics."""
+        return {
+            'server_version': self.server_version,
+            'pg_trgm': self.pg_trgm,
+            'unaccent': self.unaccent,
+            'trigram_indexes': self.trigram_indexes,
+            'tsvector_index': self.tsvector_index,
+            'indexes': sorted(self.indexes),
+            'detected_at': self.detected_at.isoformat(),
+        }
+
+
+class CapabilityRegistry:
+    """Hold the detected `DatabaseCapabilities`, filled at startup and refreshed on a timer."""
+
+    def __init__(self) -> None:
+        """Create an empty registry; the first `get` detects lazily."""
+        self.current: DatabaseCapabilities | None = None
+
+    async def detect(self, conn: AsyncConnection) -> DatabaseCapabilities:
+        """Query the server catalog once and store the result."""
+        row = (await conn.execute(_DETECT_SQL)).one()
+        self.current = DatabaseCapabilities(
+            server_version=row.server_version,
+            extensions=frozenset(row.extensions),
+            indexes=frozenset(row.indexes),
+        )
+        return self.current
+
+    async def get(self, conn: AsyncConnection) -> DatabaseCapabilities:
+        """Return the stored capabilities, detecting them on `conn` if none are stored."""
+        if self.current is None:
+            return await self.detect(conn)
+        return self.current
+
+
+db_capabilities = CapabilityRegistry()
+
+
+async def _detect_in_background() -> None:
+    try:
+        async for conn in get_connection():
+            await db_capabilities.detect(conn)
+            break
+    except Exception:
+        # Keep the previous capabilities; an unfilled registry detects on first use.
+        logger.exception('Detecting database capabilities failed')
+
+
+async def _detect_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await _detect_in_background()
+
+
+async def start_capability_detection(interval: float) -> asyncio.Task[None] | None:
+    """
+    Detect capabilities now and start re-detecting every `interval` seconds.
+
+    Returns the refresh task for the caller to cancel on shutdown, or None
+    when `interval` is 0.
+    """
+    await _detect_in_background()
+    if db_capabilities.current is not None:
+        logger.info('Database capabilities: %s', db_capabilities.current.as_dict())
+    if interval <= 0:
+        return None
+    return asyncio.get_running_loop().create_task(_detect_periodically(interval))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from starlette.responses import Response
+
+if TYPE_CHECKING:  # pragma: no cover
+    from starlette.requests import Request
+
+
+def _build_fingerprint() -> str:
+    """Hash app sources and templates so a deploy changes every validator."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    root = Path(__file__).parent
+    for path in sorted([*root.rglob('*.py'), *root.rglob('*.html')]):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+_FINGERPRINT = _build_fingerprint()
+
+
+def build_etag(*parts: object) -> str:
+    """Build a weak ETag from everything the page output depends on."""
+    payload = '|'.join(str(p) for p in (_FINGERPRINT, *parts))
+    digest = hashlib.sha1(payload.encode(), usedforsecurity=False).hexdigest()
+    # Weak, because GZip middleware changes the bytes but not the meaning.
+    return f'W/"{digest}"'
+
+
+def _strip_weak(tag: str) -> str:
+    return tag.removeprefix('W/')
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since."""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        candidates = {_strip_weak(t.strip()) for t in if_none_match.split(',')}
+        return '*' in candidates or _strip_weak(etag) in candidates
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    """Return ETag/Last-Modified headers that force revalidation on reuse."""
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = format_datetime(last_modified.astimezone(UTC), usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: datetime | None) -> Response:
+    """Return an empty 304 carrying the current validators."""
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
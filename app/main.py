@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import uuid
 from contextlib import asynccontextmanager
+from html import escape
 from http import HTTPStatus
-from typing import TYPE_CHECKING, Annotated
+from typing import TYPE_CHECKING, Annotated, Any
+from urllib.parse import quote, urlencode
 
 import sentry_sdk
 from fastapi import Depends, FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.cors import CORSMiddleware
@@ -18,25 +20,50 @@ from starlette.middleware.trustedhost import TrustedHostMiddleware
 from starlette.templating import Jinja2Templates
 
 from .admin import setup_admin
+from .cache import cache_stats, parsed_songs, song_articles, transposed_chords
+from .catalog import catalog_version
 from .db import get_connection
-from .middleware import SecurityHeadersMiddleware
-from .parser import parse_chordpro
-from .renderer import render_parsed_song, render_stream_links
-from .repositories.songs import get_song_by_id, list_recent_songs, search_songs
-from .settings import settings
-from .transposer import (
-    compute_semitone_interval,
-    prefer_sharps_for_key,
-    transpose_chord_symbol,
+from .db_capabilities import db_capabilities, start_capability_detection
+from .http_cache import build_etag, is_not_modified, not_modified_response, validator_headers
+from .middleware import FlushingGZipResponse, SecurityHeadersMiddleware
+from .pagination import InvalidCursorError
+from .prerender import RENDER_FORMAT_VERSION, render_key
+from .renderer import render_song_body, render_stream_links
+from .repositories.song_renders import get_fresh_song_renders
+from .repositories.songs import (
+    get_song_by_id,
+    get_song_versions,
+    get_songs_by_ids,
+    list_recent_song_page,
+    search_song_page,
+    suggest_songs,
 )
+from .search_cache import cached_searches
+from .search_refresh import start_search_index
+from .settings import settings
+from .song_ast import AST_FORMAT_VERSION, dump_parsed_song, parsed_song_from_row
+from .song_changes import song_changes, start_song_change_listener
 
 if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import AsyncIterator, Mapping
+    from datetime import datetime
+
     from sqlalchemy.ext.asyncio import AsyncConnection
 
+    from .parser import ParsedSong
+
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    tasks = [
+        await start_capability_detection(settings.db_capabilities_refresh_seconds),
+        await start_search_index(),
+        await start_song_change_listener(),
+    ]
     yield
+    for task in tasks:
+        if task is not None:
+            task.cancel()
 
 
 if settings.sentry_dsn:
@@ -69,6 +96,18 @@ if settings.force_https:
 app.add_middleware(SecurityHeadersMiddleware)
 
 
+SONG_SEPARATOR = '<hr class="song-separator">'
+_CONTENT_SLOT = '<!--page-content-->'
+# Suggestions are only hints; a short shared lifetime beats a revalidation query per keystroke.
+SUGGEST_CACHE_CONTROL = 'public, max-age=15'
+SUGGEST_MAX_LIMIT = 20
+# Result pages are small; "load more" continues from a keyset cursor instead of an OFFSET.
+SEARCH_PAGE_SIZE = 50
+RECENT_PAGE_SIZE = 10
+# `/api/songs/{id}?v=<version>` never changes; other requests revalidate.
+SONG_JSON_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
 def parse_setlist_param(raw: str | None) -> list[tuple[uuid.UUID, str | None]]:
     """Parse setlist param into (id, key) pairs."""
     if not raw:
@@ -95,10 +134,326 @@ def parse_setlist_param(raw: str | None) -> list[tuple[uuid.UUID, str | None]]:
 ## removed deprecated startup event in favor of lifespan
 
 
+def _load_parsed_song(row: dict[str, Any]) -> ParsedSong:
+    """Load a song row's parse, reusing the cached parse of the same version."""
+    cache_key = (row['id'], row['updated_at'])
+    parsed = parsed_songs.get(cache_key)
+    if parsed is None:
+        parsed = parsed_song_from_row(row)
+        parsed_songs.set(cache_key, parsed)
+    return parsed
+
+
+def _song_version(updated_at: datetime) -> str:
+    """Name a song revision for versioned URLs such as `/api/songs/{id}?v=`."""
+    return str(int(updated_at.timestamp() * 1_000_000))
+
+
+def _article_key(
+    row: dict[str, Any],
+    target_key: str | None,
+    show_chords: bool,
+) -> tuple[uuid.UUID, datetime, str | None, bool, str]:
+    """Key a rendered article in `song_articles`."""
+    return (row['id'], row['updated_at'], target_key, show_chords, settings.render_layout)
+
+
+def _render_song_article(
+    row: dict[str, Any],
+    target_key: str | None,
+    show_chords: bool,
+    body_html: str | None = None,
+) -> str:
+    """Render a single song row into its setlist article, reusing cached markup."""
+    song_id = row['id']
+    cache_key = _article_key(row, target_key, show_chords)
+    cached = song_articles.get(cache_key)
+    if cached is not None:
+        return cached
+    if body_html is None:
+        try:
+            parsed = _load_parsed_song(row)
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail='не вдалося розібрати') from exc
+        body_html = render_song_body(
+            parsed,
+            row.get('default_key'),
+            target_key,
+            show_chords,
+            settings.render_layout,
+            chord_memo=transposed_chords,
+        )
+    title = str(row.get('translated_title'))
+    artist = str(row.get('artist') or '')
+    original = str(row.get('original_title') or '')
+    # Center key (effective key after transpose)
+    eff_key = target_key or row.get('default_key')
+    links_html = render_stream_links(
+        str(row.get('youtube_url') or '') or None,
+        str(row.get('songlink_url') or '') or None,
+    )
+    left_stack_parts = [f'<div class="song-title">{title}</div>']
+    if original:
+        left_stack_parts.append(f'<div class="song-sub original">{original}</div>')
+    if artist:
+        left_stack_parts.append(f'<div class="song-sub artist">{artist}</div>')
+    left_stack = '<div class="song-stack">' + ''.join(left_stack_parts) + '</div>'
+    default_key_str = str(row.get('default_key') or '')
+    eff_key_str = str(eff_key or '')
+    key_base_attrs = (
+        f'data-song-id="{song_id}" '
+        f'data-version="{_song_version(row["updated_at"])}" '
+        f'data-default-key="{default_key_str}" '
+        f'data-layout="{settings.render_layout}" '
+        f'data-effective-key="{eff_key_str}"'
+    )
+    up_btn = (
+        '<button type="button" class="icon-btn key-btn transpose-btn" '
+        'data-dir="up" aria-label="Transpose up" title="Transpose up">'
+        '<span class="icon icon-chev-up" aria-hidden="true"></span>'
+        '</button>'
+    )
+    down_btn = (
+        '<button type="button" class="icon-btn key-btn transpose-btn" '
+        'data-dir="down" aria-label="Transpose down" title="Transpose down">'
+        '<span class="icon icon-chev-down" aria-hidden="true"></span>'
+        '</button>'
+    )
+    key_label = f'<div class="key-label">Тональність: {eff_key or "&nbsp;"}</div>'
+    key_html = (
+        f'<div class="song-key" {key_base_attrs}>{up_btn}{key_label}{down_btn}</div>'
+        if show_chords
+        else ''
+    )
+    header = (
+        '<header class="song-header">'
+        f'{left_stack}'
+        f'{key_html}'
+        f'<div class="song-links">{links_html}</div>'
+        '</header>'
+    )
+    article = f'<article class="song">{header}<div class="song-body">{body_html}</div></article>'
+    song_articles.set(cache_key, article)
+    return article
+
+
+def _setlist_validators(
+    pairs: list[tuple[uuid.UUID, str | None]],
+    versions: Mapping[uuid.UUID, Mapping[str, Any]],
+    dark: int | None,
+    chords: int | None,
+    font: str | None,
+) -> tuple[str, datetime]:
+    """Build the setlist ETag and Last-Modified from ids, keys, flags and versions."""
+    stamps = [
+        (song_id, target_key, versions[song_id]['updated_at']) for song_id, target_key in pairs
+    ]
+    etag = build_etag(
+        'setlist',
+        stamps,
+        bool(dark),
+        bool(chords),
+        font,
+        settings.setlist_eager_songs,
+        settings.render_layout,
+    )
+    last_modified = max(updated_at for _, _, updated_at in stamps)
+    return etag, last_modified
+
+
+async def _setlist_rows(
+    conn: AsyncConnection,
+    song_ids: list[uuid.UUID],
+) -> dict[uuid.UUID, dict[str, Any]]:
+    """Load the setlist fields of published songs, 404ing on a missing or draft one."""
+    rows = await get_songs_by_ids(conn, song_ids, ast_version=AST_FORMAT_VERSION)
+    for song_id in song_ids:
+        row = rows.get(song_id)
+        if not row or row['is_draft']:
+            raise HTTPException(status_code=404, detail='немає такого')
+    return rows
+
+
+async def _prerendered_bodies(
+    conn: AsyncConnection,
+    pairs: list[tuple[uuid.UUID, str | None]],
+    rows: Mapping[uuid.UUID, dict[str, Any]],
+    show_chords: bool,
+) -> dict[tuple[uuid.UUID, str | None], str]:
+    """Load fresh write-time renders for setlist entries missing from the article cache."""
+    wanted = {
+        (song_id, target_key): (song_id, render_key(target_key, show_chords), show_chords)
+        for song_id, target_key in pairs
+        if _article_key(rows[song_id], target_key, show_chords) not in song_articles
+    }
+    if not wanted:
+        return {}
+    found = await get_fresh_song_renders(
+        conn,
+        wanted.values(),
+        settings.render_layout,
+        RENDER_FORMAT_VERSION,
+    )
+    return {pair: found[triple] for pair, triple in wanted.items() if triple in found}
+
+
+def _page_shell(request: Request, name: str, context: dict[str, Any]) -> tuple[str, str]:
+    """Render a page template and split it around its content slot."""
+    page = templates.get_template(name).render(
+        {**context, 'request': request, 'content': _CONTENT_SLOT},
+    )
+    head, tail = page.split(_CONTENT_SLOT, 1)
+    return head, tail
+
+
+async def _stream_setlist(
+    head: str,
+    tail: str,
+    pairs: list[tuple[uuid.UUID, str | None]],
+    rows: Mapping[uuid.UUID, dict[str, Any]],
+    bodies: Mapping[tuple[uuid.UUID, str | None], str],
+    *,
+    show_chords: bool,
+) -> AsyncIterator[str]:
+    """
+    Yield the page head, then every article as soon as it is rendered.
+
+    Missing and draft ids are rejected before the first byte, so they still
+    answer 404. A song that fails to parse once the status line is sent cannot
+    turn into a 400, so it is replaced by an inline error article instead.
+    """
+    yield head
+    rendered: dict[tuple[uuid.UUID, str | None], str] = {}
+    for index, (song_id, target_key) in enumerate(pairs):
+        if index:
+            yield SONG_SEPARATOR
+        row = rows[song_id]
+        try:
+            yield _setlist_article(
+                index,
+                row,
+                target_key,
+                show_chords,
+                bodies=bodies,
+                rendered=rendered,
+            )
+        except HTTPException as exc:
+            yield _render_error_article(row, str(exc.detail))
+    yield tail
+
+
+def _render_error_article(row: dict[str, Any], message: str) -> str:
+    """Render a placeholder article for a song that could not be rendered."""
+    title = escape(str(row.get('translated_title')))
+    return (
+        f'<article class="song song-error" role="alert" data-song-id="{row["id"]}">'
+        '<header class="song-header">'
+        f'<div class="song-stack"><div class="song-title">{title}</div></div>'
+        '</header>'
+        f'<div class="song-body"><p class="song-error-text">{escape(message)}</p></div>'
+        '</article>'
+    )
+
+
+def _fragment_href(song_id: uuid.UUID, target_key: str | None, show_chords: bool) -> str:
+    """Link the `/songs/{id}/fragment` that renders one setlist entry."""
+    query = urlencode({'key': target_key or '', 'chords': int(show_chords)})
+    return f'/songs/{song_id}/fragment?{query}'
+
+
+def _render_placeholder_article(
+    row: dict[str, Any],
+    target_key: str | None,
+    show_chords: bool,
+) -> str:
+    """Render a title-only stand-in that the page swaps for the fragment near the viewport."""
+    song_id = row['id']
+    title = escape(str(row.get('translated_title')))
+    single = escape(f'/?s={song_id}:{quote(target_key or "")}&chords={int(show_chords)}')
+    fragment = escape(_fragment_href(song_id, target_key, show_chords))
+    return (
+        f'<article class="song song-placeholder" data-song-id="{song_id}" '
+        f'data-fragment="{fragment}">'
+        '<header class="song-header">'
+        f'<div class="song-stack"><a class="song-title" href="{single}">{title}</a></div>'
+        '</header>'
+        '<div class="song-body"></div>'
+        '</article>'
+    )
+
+
+def _setlist_article(
+    index: int,
+    row: dict[str, Any],
+    target_key: str | None,
+    show_chords: bool,
+    *,
+    bodies: Mapping[tuple[uuid.UUID, str | None], str],
+    rendered: dict[tuple[uuid.UUID, str | None], str],
+) -> str:
+    """Render setlist entry `index`, as a placeholder past `setlist_eager_songs`."""
+    eager = settings.setlist_eager_songs
+    if 0 < eager <= index:
+        return _render_placeholder_article(row, target_key, show_chords)
+    article = rendered.get((row['id'], target_key))
+    if article is None:
+        article = _render_song_article(
+            row,
+            target_key,
+            show_chords=show_chords,
+            body_html=bodies.get((row['id'], target_key)),
+        )
+        rendered[row['id'], target_key] = article
+    return article
+
+
+async def _result_page(
+    conn: AsyncConnection,
+    q: str,
+    cursor: str | None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Fetch one page of search results, or of recent songs without a query."""
+    try:
+        if q.strip():
+            return await search_song_page(conn, q, SEARCH_PAGE_SIZE, cursor)
+        return await list_recent_song_page(conn, RECENT_PAGE_SIZE, cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail='invalid cursor') from exc
+
+
+def _more_href(path: str, q: str, next_cursor: str | None) -> str | None:
+    """Link the next result page, which also works without JavaScript."""
+    if next_cursor is None:
+        return None
+    params = {'q': q, 'cursor': next_cursor} if q else {'cursor': next_cursor}
+    return f'{path}?{urlencode(params)}'
+
+
 @app.get('/health')
 async def health() -> JSONResponse:
     """Return application health."""
-    return JSONResponse({'status': 'ok'})
+    caches = {
+        **cache_stats(),
+        'search_results': cached_searches.stats(),
+        'catalog_version': catalog_version.stats(),
+    }
+    return JSONResponse({'status': 'ok', 'caches': caches, 'song_changes': song_changes.stats()})
+
+
+@app.get('/diagnostics/database')
+async def database_diagnostics(
+    request: Request,
+    refresh: Annotated[int | None, Query()] = None,
+    conn: Annotated[AsyncConnection, Depends(get_connection)] = Depends(get_connection),  # noqa: FAST002
+) -> JSONResponse:
+    """Show the detected database capabilities to admins; `refresh=1` re-detects them."""
+    if not request.session.get('admin_email'):
+        raise HTTPException(status_code=403, detail='admin login required')
+    if refresh:
+        capabilities = await db_capabilities.detect(conn)
+    else:
+        capabilities = await db_capabilities.get(conn)
+    return JSONResponse(capabilities.as_dict(), headers={'Cache-Control': 'no-store'})
 
 
 @app.get('/', response_class=HTMLResponse)
@@ -108,104 +463,118 @@ async def render_setlist(
     dark: Annotated[int | None, Query()] = None,
     chords: Annotated[int | None, Query()] = 1,
     font: Annotated[str | None, Query()] = None,
+    cursor: Annotated[str | None, Query()] = None,
     conn: Annotated[AsyncConnection, Depends(get_connection)] = Depends(get_connection),  # noqa: FAST002
-) -> HTMLResponse:
+) -> Response:
     """Render one or many songs in a setlist."""
     pairs = parse_setlist_param(s)
     if not pairs:
-        recent = await list_recent_songs(conn, limit=10)
+        catalog_updated, catalog_size = await catalog_version.get(conn)
+        etag = build_etag('recent', catalog_updated, catalog_size, bool(dark), font, cursor)
+        if is_not_modified(request, etag, catalog_updated):
+            return not_modified_response(etag, catalog_updated)
+        recent, next_cursor = await _result_page(conn, '', cursor)
         return templates.TemplateResponse(
             request,
             'search.html',
             {
                 'results': recent,
+                'more_href': _more_href('/', '', next_cursor),
                 'selected': [],
                 'query': '',
                 'dark': bool(dark),
                 'font': font or 'normal',
                 'is_search': True,
             },
+            headers=validator_headers(etag, catalog_updated),
         )
-    blocks: list[str] = []
-    for song_id, target_key in pairs:
-        row = await get_song_by_id(conn, song_id)
-        if not row or row.get('is_draft'):
+    song_ids = [song_id for song_id, _ in pairs]
+    versions = await get_song_versions(conn, song_ids)
+    for song_id in song_ids:
+        version = versions.get(song_id)
+        if not version or version['is_draft']:
             raise HTTPException(status_code=404, detail='немає такого')
-        try:
-            parsed = parse_chordpro(row['chordpro_content'])
-        except Exception as exc:
-            raise HTTPException(status_code=400, detail='не вдалося розібрати') from exc
-        semitones = compute_semitone_interval(row.get('default_key'), target_key)
-        prefer_sharps = prefer_sharps_for_key(target_key)
-        for section in parsed.sections:
-            for _idx, ch in enumerate(section.lines):
-                ch.chords = [
-                    transpose_chord_symbol(c, semitones, prefer_sharps) if c else None
-                    for c in ch.chords
-                ]
-        html = render_parsed_song(parsed, show_chords=bool(chords))
-        title = str(row.get('translated_title'))
-        artist = str(row.get('artist') or '')
-        original = str(row.get('original_title') or '')
-        # Center key (effective key after transpose)
-        eff_key = target_key or row.get('default_key')
-        links_html = render_stream_links(
-            str(row.get('youtube_url') or '') or None,
-            str(row.get('songlink_url') or '') or None,
-        )
-        left_stack_parts = [f'<div class="song-title">{title}</div>']
-        if original:
-            left_stack_parts.append(f'<div class="song-sub original">{original}</div>')
-        if artist:
-            left_stack_parts.append(f'<div class="song-sub artist">{artist}</div>')
-        left_stack = '<div class="song-stack">' + ''.join(left_stack_parts) + '</div>'
-        default_key_str = str(row.get('default_key') or '')
-        eff_key_str = str(eff_key or '')
-        key_base_attrs = (
-            f'data-song-id="{song_id}" '
-            f'data-default-key="{default_key_str}" '
-            f'data-effective-key="{eff_key_str}"'
-        )
-        up_btn = (
-            '<button type="button" class="icon-btn key-btn transpose-btn" '
-            'data-dir="up" aria-label="Transpose up" title="Transpose up">'
-            '<span class="icon icon-chev-up" aria-hidden="true"></span>'
-            '</button>'
-        )
-        down_btn = (
-            '<button type="button" class="icon-btn key-btn transpose-btn" '
-            'data-dir="down" aria-label="Transpose down" title="Transpose down">'
-            '<span class="icon icon-chev-down" aria-hidden="true"></span>'
-            '</button>'
+    etag, last_modified = _setlist_validators(pairs, versions, dark, chords, font)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    rows = await _setlist_rows(conn, song_ids)
+    # Rows may be newer than the versions checked above; describe what is sent.
+    etag, last_modified = _setlist_validators(pairs, rows, dark, chords, font)
+    context = {
+        'dark': bool(dark),
+        'font': font or 'normal',
+        'chords': bool(chords),
+        'is_search': False,
+    }
+    headers = validator_headers(etag, last_modified)
+    eager = settings.setlist_eager_songs
+    bodies = await _prerendered_bodies(
+        conn,
+        pairs[:eager] if eager > 0 else pairs,
+        rows,
+        show_chords=bool(chords),
+    )
+    stream_from = settings.setlist_stream_min_songs
+    if stream_from > 0 and len(pairs) >= stream_from:
+        head, tail = _page_shell(request, 'song.html', context)
+        # Stock GZip may hold streamed chunks inside zlib; this one flushes each article.
+        gzipped = settings.gzip_min_length > 0 and 'gzip' in request.headers.get(
+            'accept-encoding',
+            '',
         )
-        key_label = f'<div class="key-label">Тональність: {eff_key or "&nbsp;"}</div>'
-        key_html = (
-            f'<div class="song-key" {key_base_attrs}>{up_btn}{key_label}{down_btn}</div>'
-            if bool(chords)
-            else ''
+        response_class = FlushingGZipResponse if gzipped else StreamingResponse
+        return response_class(
+            _stream_setlist(head, tail, pairs, rows, bodies, show_chords=bool(chords)),
+            media_type='text/html; charset=utf-8',
+            headers=headers,
         )
-        header = (
-            '<header class="song-header">'
-            f'{left_stack}'
-            f'{key_html}'
-            f'<div class="song-links">{links_html}</div>'
-            '</header>'
+    rendered: dict[tuple[uuid.UUID, str | None], str] = {}
+    blocks = [
+        _setlist_article(
+            index,
+            rows[song_id],
+            target_key,
+            bool(chords),
+            bodies=bodies,
+            rendered=rendered,
         )
-        article = f'<article class="song">{header}<div class="song-body">{html}</div></article>'
-        blocks.append(article)
+        for index, (song_id, target_key) in enumerate(pairs)
+    ]
     return templates.TemplateResponse(
         request,
         'song.html',
-        {
-            'content': '<hr class="song-separator">'.join(blocks),
-            'dark': bool(dark),
-            'font': font or 'normal',
-            'chords': bool(chords),
-            'is_search': False,
-        },
+        {**context, 'content': SONG_SEPARATOR.join(blocks)},
+        headers=headers,
     )
 
 
+@app.get('/songs/{song_id}/fragment', response_class=HTMLResponse)
+async def song_fragment(
+    request: Request,
+    song_id: uuid.UUID,
+    key: Annotated[str | None, Query()] = None,
+    chords: Annotated[int | None, Query()] = 1,
+    conn: Annotated[AsyncConnection, Depends(get_connection)] = Depends(get_connection),  # noqa: FAST002
+) -> Response:
+    """Render one setlist `<article class="song">` exactly as `render_setlist` does."""
+    target_key = key or None
+    show_chords = bool(chords)
+    version = (await get_song_versions(conn, [song_id])).get(song_id)
+    if not version or version['is_draft']:
+        raise HTTPException(status_code=404, detail='немає такого')
+    layout = settings.render_layout
+    etag = build_etag('fragment', song_id, target_key, show_chords, layout, version['updated_at'])
+    if is_not_modified(request, etag, version['updated_at']):
+        return not_modified_response(etag, version['updated_at'])
+    rows = await _setlist_rows(conn, [song_id])
+    row = rows[song_id]
+    pair = (song_id, target_key)
+    bodies = await _prerendered_bodies(conn, [pair], rows, show_chords=show_chords)
+    article = _render_song_article(row, target_key, show_chords, body_html=bodies.get(pair))
+    etag = build_etag('fragment', song_id, target_key, show_chords, layout, row['updated_at'])
+    return HTMLResponse(article, headers=validator_headers(etag, row['updated_at']))
+
+
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     if exc.status_code == HTTPStatus.NOT_FOUND:
@@ -228,19 +597,110 @@ async def search(
     q: Annotated[str, Query()] = '',
     dark: Annotated[int | None, Query()] = None,
     font: Annotated[str | None, Query()] = None,
+    cursor: Annotated[str | None, Query()] = None,
+    *,
     conn: Annotated[AsyncConnection, Depends(get_connection)] = Depends(get_connection),  # noqa: FAST002
-) -> HTMLResponse:
+) -> Response:
     """Search and list songs."""
-    results = await search_songs(conn, q, limit=200) if q else []
+    catalog_updated, catalog_size = await catalog_version.get(conn)
+    etag = build_etag('search', q, catalog_updated, catalog_size, bool(dark), font, cursor)
+    if is_not_modified(request, etag, catalog_updated):
+        return not_modified_response(etag, catalog_updated)
+    results, next_cursor = await _result_page(conn, q, cursor) if q else ([], None)
     return templates.TemplateResponse(
         request,
         'search.html',
         {
             'results': results,
+            'more_href': _more_href('/search', q, next_cursor),
             'selected': [],
             'query': q,
             'dark': bool(dark),
             'font': font or 'normal',
             'is_search': True,
         },
+        headers=validator_headers(etag, catalog_updated),
     )
+
+
+@app.get('/search/results', response_class=HTMLResponse)
+async def search_results(
+    request: Request,
+    q: Annotated[str, Query()] = '',
+    cursor: Annotated[str | None, Query()] = None,
+    conn: Annotated[AsyncConnection, Depends(get_connection)] = Depends(get_connection),  # noqa: FAST002
+) -> Response:
+    """Render one page of result rows and its "load more" link, for appending in place."""
+    catalog_updated, catalog_size = await catalog_version.get(conn)
+    etag = build_etag('results', q, catalog_updated, catalog_size, cursor)
+    if is_not_modified(request, etag, catalog_updated):
+        return not_modified_response(etag, catalog_updated)
+    results, next_cursor = await _result_page(conn, q, cursor)
+    return templates.TemplateResponse(
+        request,
+        '_results.html',
+        {'results': results, 'more_href': _more_href('/search' if q else '/', q, next_cursor)},
+        headers=validator_headers(etag, catalog_updated),
+    )
+
+
+@app.get('/api/songs/{song_id}')
+async def song_json(
+    request: Request,
+    song_id: uuid.UUID,
+    v: Annotated[str | None, Query()] = None,
+    conn: Annotated[AsyncConnection, Depends(get_connection)] = Depends(get_connection),  # noqa: FAST002
+) -> Response:
+    """
+    Return a song's parse as compact JSON for transposing in the browser.
+
+    `sections` uses the stored AST layout: `[[name, [[chords, positions, lyrics], ...]], ...]`.
+    """
+    version = (await get_song_versions(conn, [song_id])).get(song_id)
+    if not version or version['is_draft']:
+        raise HTTPException(status_code=404, detail='немає такого')
+    etag = build_etag('song-json', song_id, version['updated_at'])
+    headers = validator_headers(etag, version['updated_at'])
+    if v == _song_version(version['updated_at']):
+        headers['Cache-Control'] = SONG_JSON_CACHE_CONTROL
+    if is_not_modified(request, etag, version['updated_at']):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    row = await get_song_by_id(conn, song_id)
+    if not row or row['is_draft']:
+        raise HTTPException(status_code=404, detail='немає такого')
+    try:
+        parsed = _load_parsed_song(row)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail='не вдалося розібрати') from exc
+    payload = {
+        'id': str(song_id),
+        'version': _song_version(row['updated_at']),
+        'default_key': row['default_key'],
+        'sections': dump_parsed_song(parsed)[0],
+    }
+    # Describe the row actually sent, which may be newer than the version checked above.
+    etag = build_etag('song-json', song_id, row['updated_at'])
+    headers = validator_headers(etag, row['updated_at'])
+    if v == payload['version']:
+        headers['Cache-Control'] = SONG_JSON_CACHE_CONTROL
+    return JSONResponse(payload, headers=headers)
+
+
+@app.get('/api/search/suggest')
+async def search_suggest(
+    q: Annotated[str, Query()] = '',
+    limit: Annotated[int, Query(ge=1, le=SUGGEST_MAX_LIMIT)] = 8,
+    conn: Annotated[AsyncConnection, Depends(get_connection)] = Depends(get_connection),  # noqa: FAST002
+) -> JSONResponse:
+    """Suggest songs for a partial query as compact JSON."""
+    found = await suggest_songs(conn, q, limit) if q.strip() else []
+    payload = [
+        {
+            'id': str(song['id']),
+            'translated_title': song['translated_title'],
+            'artist': song['artist'],
+            'default_key': song['default_key'],
+        }
+        for song in found
+    ]
+    return JSONResponse(payload, headers={'Cache-Control': SUGGEST_CACHE_CONTROL})
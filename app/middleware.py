@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import zlib
+from typing import TYPE_CHECKING, Any
+
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import StreamingResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from starlette.types import Message, Receive, Scope, Send
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -21,3 +28,35 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
                 'max-age=63072000; includeSubDomains; preload',
             )
         return response
+
+
+class FlushingGZipResponse(StreamingResponse):
+    """
+    Stream a gzip body the client can decode chunk by chunk.
+
+    Every chunk is compressed and sync-flushed as it is sent, so a streamed page
+    stays progressively renderable. `GZipMiddleware` passes the response through
+    untouched because it already carries a Content-Encoding.
+    """
+
+    def __init__(self, *args: Any, compresslevel: int = 6, **kwargs: Any) -> None:
+        """Take `StreamingResponse` arguments plus the zlib `compresslevel`."""
+        super().__init__(*args, **kwargs)
+        self.compresslevel = compresslevel
+        self.headers['Content-Encoding'] = 'gzip'
+        self.headers.add_vary_header('Accept-Encoding')
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        async def send_compressed(message: Message) -> None:
+            if message['type'] == 'http.response.body':
+                body = compressor.compress(message.get('body', b''))
+                if message.get('more_body', False):
+                    body += compressor.flush(zlib.Z_SYNC_FLUSH)
+                else:
+                    body += compressor.flush()
+                message = {**message, 'body': body}
+            await send(message)
+
+        await super().__call__(scope, receive, send_compressed)
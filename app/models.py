@@ -23,6 +23,8 @@ class SongModel:
     translated_title: ClassVar[str]
     artist: ClassVar[str | None]
     chordpro_content: ClassVar[str]
+    chordpro_ast: ClassVar[list | None]
+    chordpro_ast_version: ClassVar[int | None]
     default_key: ClassVar[str]
     youtube_url: ClassVar[str | None]
     songlink_url: ClassVar[str | None]
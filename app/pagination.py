@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import and_, or_, tuple_
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Sequence
+
+    from sqlalchemy import ColumnElement
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor token that was not issued by `encode_cursor`."""
+
+
+def _plain(value: object) -> object:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack the sort key of the last row sent into an opaque URL-safe token."""
+    raw = json.dumps([_plain(v) for v in values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(token: str) -> list[Any]:
+    """Unpack a token from `encode_cursor` into its JSON values."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError(token) from exc
+    if not isinstance(values, list):
+        raise InvalidCursorError(token)
+    return values
+
+
+def parse_created_at_and_id(values: Sequence[Any]) -> tuple[datetime, uuid.UUID]:
+    """Read the `(created_at, id)` tie-breaker that ends every song sort key."""
+    try:
+        return datetime.fromisoformat(values[-2]), uuid.UUID(values[-1])
+    except (IndexError, TypeError, ValueError) as exc:
+        raise InvalidCursorError(str(values)) from exc
+
+
+def after_key(keys: Sequence[tuple[ColumnElement[Any], bool]], values: Sequence[Any]) -> Any:
+    """
+    Match rows sorting after `values` by `keys`, pairs of (expression, descending).
+
+    Uniform directions compare as one row value, which an index on the keys
+    can serve; mixed directions expand into the lexicographic OR.
+    """
+    exprs = [expr for expr, _ in keys]
+    if all(desc for _, desc in keys):
+        return tuple_(*exprs) < tuple_(*values)
+    if not any(desc for _, desc in keys):
+        return tuple_(*exprs) > tuple_(*values)
+    branches = []
+    for i, (expr, desc) in enumerate(keys):
+        ties = [exprs[j] == values[j] for j in range(i)]
+        branches.append(and_(*ties, expr < values[i] if desc else expr > values[i]))
+    return or_(*branches)
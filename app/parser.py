@@ -2,11 +2,20 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from typing import Any
 
 CHORD_PATTERN = re.compile(r'\[([^\]]+)\]')
 SECTION_START_PATTERN = re.compile(r'\{start_of_section:\s*([^}]+)\}', re.IGNORECASE)
 SECTION_START_EMPTY_PATTERN = re.compile(r'\{start_of_section\}', re.IGNORECASE)
 SECTION_END_PATTERN = re.compile(r'\{end_of_section\}', re.IGNORECASE)
+# Typographic stand-ins for the Ukrainian apostrophe, all folded to a plain "'".
+APOSTROPHE_VARIANTS = '\u2019\u02bc\u2018`\u2032'
+_APOSTROPHE_TABLE = str.maketrans(dict.fromkeys(APOSTROPHE_VARIANTS, "'"))
+# The three section directives above as one pattern, tried only on `{...}` lines.
+SECTION_DIRECTIVE_PATTERN = re.compile(
+    r'\{(?:start_of_section(?::\s*(?P<name>[^}]+))?|(?P<end>end_of_section))\}',
+    re.IGNORECASE,
+)
 
 
 @dataclass(slots=True)
@@ -34,6 +43,40 @@ class ParsedSong:
     warnings: list[str]
 
 
+def dump_parsed_song(parsed: ParsedSong) -> list[Any]:
+    """
+    Serialize a parsed song into compact JSON-ready lists.
+
+    Layout: `[[[name, [[chords, positions, lyrics], ...]], ...], warnings]`. Songs store it
+    and caches share it, so changing it means bumping `song_ast.AST_FORMAT_VERSION`.
+    """
+    return [
+        [
+            [
+                section.name,
+                [[line.chords, line.chord_positions, line.lyrics] for line in section.lines],
+            ]
+            for section in parsed.sections
+        ],
+        parsed.warnings,
+    ]
+
+
+def load_parsed_song(data: list[Any]) -> ParsedSong:
+    """Rebuild a parsed song from its serialized lists."""
+    sections_data, warnings = data
+    return ParsedSong(
+        [
+            Section(
+                name,
+                [LineBlock(chords, positions, lyrics) for chords, positions, lyrics in lines],
+            )
+            for name, lines in sections_data
+        ],
+        list(warnings),
+    )
+
+
 class ParseError(Exception):
     """Represent an unrecoverable parse error."""
 
@@ -62,49 +105,74 @@ def tokenize_line(line: str) -> tuple[list[str | None], list[int], str]:
     return chords, positions, lyrics
 
 
+def _scan_chords(line: str) -> LineBlock:
+    """
+    Split a content line into chords, positions and lyrics in one left-to-right scan.
+
+    Accepts exactly what `CHORD_PATTERN` does and rejects any bracket it would leave behind.
+    """
+    if '[' not in line:
+        if ']' in line:
+            raise ParseError('Invalid chord syntax')
+        return LineBlock([], [], line)
+    chords: list[str | None] = []
+    positions: list[int] = []
+    lyrics_parts: list[str] = []
+    removed_total = 0
+    last_index = 0
+    while True:
+        start = line.find('[', last_index)
+        if start < 0:
+            tail = line[last_index:]
+            if ']' in tail:
+                raise ParseError('Invalid chord syntax')
+            lyrics_parts.append(tail)
+            break
+        end = line.find(']', start + 1)
+        if end <= start + 1:
+            raise ParseError('Invalid chord syntax')
+        text = line[last_index:start]
+        if ']' in text:
+            raise ParseError('Invalid chord syntax')
+        lyrics_parts.append(text)
+        chords.append(line[start + 1 : end].strip())
+        positions.append(start - removed_total)
+        removed_total += end + 1 - start
+        last_index = end + 1
+    return LineBlock(chords, positions, ''.join(lyrics_parts))
+
+
 def parse_chordpro(content: str) -> ParsedSong:  # noqa: PLR0912
     """Parse ChordPro content into a structured song."""
     sections: list[Section] = []
     current_section: Section | None = None
     current_is_implicit = False
     warnings: list[str] = []
-    for raw_line in content.splitlines():
-        line = raw_line.rstrip('\n')
-        if not line.strip():
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped:
             if current_section is not None:
                 current_section.lines.append(LineBlock([], [], ''))
             continue
-        start_named = SECTION_START_PATTERN.fullmatch(line.strip())
-        start_empty = SECTION_START_EMPTY_PATTERN.fullmatch(line.strip())
-        end_match = SECTION_END_PATTERN.fullmatch(line.strip())
-        if start_named or start_empty:
-            if current_section is not None and not current_is_implicit:
-                raise ParseError('Nested sections are not supported')
-            if current_section is not None and current_is_implicit:
+        if stripped[0] == '{' and stripped[-1] == '}':
+            directive = SECTION_DIRECTIVE_PATTERN.fullmatch(stripped)
+            if directive is None:
+                continue
+            if directive['end']:
+                if current_section is None or current_is_implicit:
+                    raise ParseError('Unmatched section end')
                 sections.append(current_section)
-            section_name = start_named.group(1).strip() if start_named else ''
-            current_section = Section(section_name, [])
-            current_is_implicit = False
-            continue
-        if end_match:
-            if current_section is None or current_is_implicit:
-                raise ParseError('Unmatched section end')
-            sections.append(current_section)
-            current_section = None
+                current_section = None
+                current_is_implicit = False
+                continue
+            if current_section is not None:
+                if not current_is_implicit:
+                    raise ParseError('Nested sections are not supported')
+                sections.append(current_section)
+            current_section = Section((directive['name'] or '').strip(), [])
             current_is_implicit = False
             continue
-        stripped = line.strip()
-        if (
-            stripped.startswith('{')
-            and stripped.endswith('}')
-            and not (start_named or start_empty or end_match)
-        ):
-            continue
-        no_chords = CHORD_PATTERN.sub('', line)
-        if '[' in no_chords or ']' in no_chords:
-            raise ParseError('Invalid chord syntax')
-        chords, positions, lyrics = tokenize_line(line)
-        line_block = LineBlock(chords, positions, lyrics)
+        line_block = _scan_chords(line)
         if current_section is None:
             current_section = Section('section', [])
             current_is_implicit = True
@@ -123,3 +191,13 @@ def strip_chordpro_to_lyrics(content: str) -> str:
     text = SECTION_START_PATTERN.sub('', text)
     text = SECTION_END_PATTERN.sub('', text)
     return text
+
+
+def normalize_search_text(text: str) -> str:
+    """Lowercase text and fold apostrophe variants, as stored in `songs.lyrics_plain`."""
+    return text.lower().translate(_APOSTROPHE_TABLE)
+
+
+def plain_lyrics(content: str) -> str:
+    """Strip ChordPro markup and normalize the lyrics for searching."""
+    return normalize_search_text(strip_chordpro_to_lyrics(content))
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .cache import transposed_chords
+from .db import get_connection
+from .renderer import render_song_body
+from .repositories.song_renders import list_song_ids_missing_renders, replace_song_renders
+from .repositories.songs import get_song_by_id, list_song_ids
+from .settings import settings
+from .song_ast import parsed_song_from_row
+
+if TYPE_CHECKING:  # pragma: no cover
+    import uuid
+
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+    from .renderer import RenderLayout
+
+logger = logging.getLogger(__name__)
+
+# Mirrors CHROMATIC_*_KEYS in base.html: the keys the key picker can produce.
+MAJOR_KEYS = ('C', 'Db', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'Ab', 'A', 'Bb', 'B')
+MINOR_KEYS = ('Am', 'Bbm', 'Bm', 'Cm', 'C#m', 'Dm', 'D#m', 'Em', 'Fm', 'F#m', 'Gm', 'G#m')
+
+# Bump whenever `render_song_body` output for the same song changes; older stored renders
+# are then ignored and picked up again by the backfill.
+RENDER_FORMAT_VERSION = 1
+
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+
+def render_key(target_key: str | None, show_chords: bool) -> str:
+    """
+    Map a requested key to its stored render key.
+
+    Without chords the body does not depend on the key, so one row serves all.
+    """
+    return (target_key or '') if show_chords else ''
+
+
+def prerender_keys(default_key: str | None) -> list[str]:
+    """List the target keys worth rendering ahead of time for a song."""
+    dk = default_key or ''
+    keys = list(MINOR_KEYS if dk.endswith('m') else MAJOR_KEYS)
+    if dk and dk not in keys:
+        keys.append(dk)
+    # '' is the song as written, requested without an explicit key.
+    return ['', *keys]
+
+
+def render_song_variants(
+    row: dict[str, Any],
+    layout: RenderLayout = 'wrapped',
+) -> dict[tuple[str, bool], str]:
+    """Render a song body for every pre-rendered key, with chords on and off."""
+    parsed = parsed_song_from_row(row)
+    default_key = row.get('default_key')
+    variants = {
+        (key, True): render_song_body(
+            parsed,
+            default_key,
+            key or None,
+            True,
+            layout,
+            chord_memo=transposed_chords,
+        )
+        for key in prerender_keys(default_key)
+    }
+    variants['', False] = render_song_body(parsed, default_key, None, False, layout)
+    return variants
+
+
+async def prerender_song(conn: AsyncConnection, song_id: uuid.UUID) -> int:
+    """Store fresh renders of one song in the configured layout and return how many were written."""
+    row = await get_song_by_id(conn, song_id)
+    if row is None:
+        return 0
+    layout = settings.render_layout
+    variants = render_song_variants(row, layout)
+    await replace_song_renders(
+        conn,
+        song_id,
+        row['updated_at'],
+        variants,
+        layout=layout,
+        format_version=RENDER_FORMAT_VERSION,
+    )
+    return len(variants)
+
+
+async def _prerender_in_background(song_id: uuid.UUID) -> None:
+    try:
+        async for conn in get_connection():
+            await prerender_song(conn, song_id)
+            await conn.commit()
+            break
+    except Exception:
+        # Readers fall back to live rendering, so a failed pre-render is not fatal.
+        logger.exception('Pre-rendering song %s failed', song_id)
+
+
+def schedule_prerender(song_id: uuid.UUID) -> asyncio.Task[None]:
+    """Pre-render a song in the background of the running event loop."""
+    task = asyncio.get_running_loop().create_task(_prerender_in_background(song_id))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def backfill(force: bool = False) -> int:
+    """Pre-render songs with missing or stale renders, or all of them with `force`."""
+    done = 0
+    async for conn in get_connection():
+        if force:
+            song_ids = await list_song_ids(conn)
+        else:
+            song_ids = await list_song_ids_missing_renders(
+                conn,
+                settings.render_layout,
+                RENDER_FORMAT_VERSION,
+            )
+        for song_id in song_ids:
+            try:
+                await prerender_song(conn, song_id)
+            except Exception:
+                logger.exception('Pre-rendering song %s failed', song_id)
+                await conn.rollback()
+                continue
+            await conn.commit()
+            done += 1
+        break
+    return done
+
+
+def main() -> None:
+    """Backfill pre-rendered song bodies from the command line."""
+    parser = argparse.ArgumentParser(description='Pre-render song bodies for all keys.')
+    parser.add_argument('--force', action='store_true', help='re-render fresh songs too')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    count = asyncio.run(backfill(force=args.force))
+    logger.info('Pre-rendered %d songs', count)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,85 +1,159 @@
 from __future__ import annotations
 
+import re
+from bisect import bisect_right
 from html import escape
+from typing import TYPE_CHECKING, Literal
 
 from .parser import LineBlock, ParsedSong
+from .transposer import compute_semitone_interval, prefer_sharps_for_key, transpose_parsed_song
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .transposer import ChordMemo
 
 WRAP_WIDTH = 40
 
+# 'wrapped' hard-wraps lines at WRAP_WIDTH into monospace rows; 'fluid' emits whole lines with
+# chords anchored to their lyric positions and leaves wrapping to CSS, so one render fits any width.
+RenderLayout = Literal['wrapped', 'fluid']
+
+# Whitespace runs, and words split after hyphens: the places a fluid line may wrap.
+_PIECE_RE = re.compile(r'\s+|[^\s-]*-|[^\s-]+')
+
 
 def build_chord_line(line: LineBlock, show_chords: bool) -> str:
     """Build a chord line preserving positions and avoiding overlaps with spacing."""
     if not show_chords:
         return ''
-    raw_tokens: list[tuple[int, str]] = []
-    for idx, ch in enumerate(line.chords):
-        token = ch or ''
-        if not token:
-            continue
-        position = line.chord_positions[idx]
-        raw_tokens.append((position, token))
+    raw_tokens = [
+        (position, token)
+        for token, position in zip(line.chords, line.chord_positions, strict=False)
+        if token
+    ]
     if not raw_tokens:
         return ''
     raw_tokens.sort(key=lambda t: t[0])
-    placed: list[tuple[int, str]] = []
-    last_end = -2
+    # Tokens land left to right at least one column apart, so spaces and tokens just alternate.
+    parts: list[str] = []
+    column = 0
     for desired_start, token in raw_tokens:
-        min_start = last_end + 2
-        start = max(desired_start, min_start)
-        placed.append((start, token))
-        last_end = start + len(token) - 1
-    max_len = max(start + len(tok) for start, tok in placed)
-    chars: list[str] = [' '] * max_len
-    for start, token in placed:
-        for offset, character in enumerate(token):
-            target_index = start + offset
-            if target_index >= len(chars):
-                chars.extend([' '] * (target_index + 1 - len(chars)))
-            chars[target_index] = character
-    return ''.join(chars)
+        start = max(desired_start, column + 1 if parts else 0)
+        parts.append(' ' * (start - column))
+        parts.append(token)
+        column = start + len(token)
+    return ''.join(parts)
+
+
+def _is_break(ch: str) -> bool:
+    return ch.isspace() or ch == '-'
 
 
 def wrap_line_blocks(line: LineBlock, width: int) -> list[LineBlock]:
     """Split a line into width-bound blocks while keeping chord indices."""
-    if width <= 0 or len(line.lyrics) <= width:
+    lyrics = line.lyrics
+    length = len(lyrics)
+    if width <= 0 or length <= width:
         return [line]
-    result: list[LineBlock] = []
+    # last_break[i]: largest j <= i such that a break may follow lyrics[j - 1], else 0.
+    last_break = [0] * (length + 1)
+    for i, ch in enumerate(lyrics, 1):
+        last_break[i] = i if _is_break(ch) else last_break[i - 1]
+    starts: list[int] = []
+    ends: list[int] = []
     start = 0
+    while start < length:
+        end = min(start + width, length)
+        if end < length and last_break[end] > start:
+            end = last_break[end]
+        starts.append(start)
+        ends.append(end)
+        start = end
+        while start < length and lyrics[start].isspace():
+            start += 1
+    # Blocks cover [0, length) back to back, so each chord falls into exactly one of them.
+    block_chords: list[list[str | None]] = [[] for _ in starts]
+    block_positions: list[list[int]] = [[] for _ in starts]
+    for token, pos in zip(line.chords, line.chord_positions, strict=False):
+        if 0 <= pos < length:
+            index = bisect_right(starts, pos) - 1
+            block_chords[index].append(token)
+            block_positions[index].append(pos - starts[index])
+    return [
+        LineBlock(block_chords[i], block_positions[i], lyrics[starts[i] : ends[i]].rstrip())
+        for i in range(len(starts))
+    ]
+
+
+def _render_segment(token: str, position: int, lyrics: str) -> str:
+    return (
+        f'<span class="seg" data-at="{position}">'
+        f'<span class="chord">{escape(token)}</span>{escape(lyrics)}</span>'
+    )
+
+
+def render_fluid_line(line: LineBlock, show_chords: bool) -> str:
+    """
+    Render one unwrapped line with each chord anchored above the lyrics it starts at.
+
+    A chord and the lyrics up to the next chord or wrap point form a segment; a
+    word holding segments is kept whole, so the browser only wraps where the
+    lyrics allow it. `data-at` keeps the chord's original column.
+    """
     lyrics = line.lyrics
-    while start < len(lyrics):
-        hard_end = min(start + width, len(lyrics))
-        end = hard_end
-        if end < len(lyrics):
-            for i in range(end, start, -1):
-                ch = lyrics[i - 1]
-                if ch.isspace() or ch == '-':
-                    end = i
-                    break
-        if end <= start:
-            end = hard_end
-        sub_lyrics = lyrics[start:end].rstrip()
-        next_start = end
-        while next_start < len(lyrics) and lyrics[next_start].isspace():
-            next_start += 1
-        sub_chords: list[str | None] = []
-        sub_positions: list[int] = []
-        for token, pos in zip(line.chords, line.chord_positions, strict=False):
-            if start <= pos < next_start:
-                sub_chords.append(token)
-                sub_positions.append(pos - start)
-        result.append(LineBlock(sub_chords, sub_positions, sub_lyrics))
-        start = next_start
-    return result
-
-
-def render_parsed_song(parsed: ParsedSong, show_chords: bool) -> str:
-    """Render a parsed song into HTML with monospace alignment."""
+    anchors = (
+        sorted(
+            (
+                (position, token)
+                for token, position in zip(line.chords, line.chord_positions, strict=False)
+                if token
+            ),
+            key=lambda t: t[0],
+        )
+        if show_chords
+        else []
+    )
+    parts = ['<p class="line">']
+    next_anchor = 0
+    for match in _PIECE_RE.finditer(lyrics):
+        start, end = match.span()
+        first = next_anchor
+        while next_anchor < len(anchors) and anchors[next_anchor][0] < end:
+            next_anchor += 1
+        inside = anchors[first:next_anchor]
+        if not inside:
+            parts.append(escape(match.group()))
+            continue
+        cuts = [max(position, start) for position, _ in inside] + [end]
+        piece = [escape(lyrics[start : cuts[0]])]
+        piece.extend(
+            _render_segment(token, position, lyrics[cuts[i] : cuts[i + 1]])
+            for i, (position, token) in enumerate(inside)
+        )
+        if match.group().isspace():
+            parts.extend(piece)
+        else:
+            parts.append('<span class="word">' + ''.join(piece) + '</span>')
+    # Chords past the end of the lyrics.
+    parts.extend(_render_segment(token, position, '') for position, token in anchors[next_anchor:])
+    parts.append('</p>')
+    return ''.join(parts)
+
+
+def render_parsed_song(
+    parsed: ParsedSong,
+    show_chords: bool,
+    layout: RenderLayout = 'wrapped',
+) -> str:
+    """Render a parsed song into HTML, hard-wrapped or fluid as `layout` says."""
     parts: list[str] = []
     for section in parsed.sections:
         parts.append('<section class="song-section">')
         if section.name:
             parts.append(f'<h3 class="section-header">{escape(section.name)}</h3>')
         for line in section.lines:
+            if layout == 'fluid':
+                parts.append(render_fluid_line(line, show_chords))
+                continue
             for sub in wrap_line_blocks(line, WRAP_WIDTH):
                 chord_line = build_chord_line(sub, show_chords)
                 lyric_line = escape(sub.lyrics)
@@ -90,6 +164,22 @@ def render_parsed_song(parsed: ParsedSong, show_chords: bool) -> str:
     return ''.join(parts)
 
 
+def render_song_body(
+    parsed: ParsedSong,
+    default_key: str | None,
+    target_key: str | None,
+    show_chords: bool,
+    layout: RenderLayout = 'wrapped',
+    *,
+    chord_memo: ChordMemo | None = None,
+) -> str:
+    """Transpose a parsed song from its default key and render its body HTML."""
+    semitones = compute_semitone_interval(default_key, target_key)
+    prefer_sharps = prefer_sharps_for_key(target_key)
+    transposed = transpose_parsed_song(parsed, semitones, prefer_sharps, chord_memo)
+    return render_parsed_song(transposed, show_chords=show_chords, layout=layout)
+
+
 def render_stream_links(youtube_url: str | None, songlink_url: str | None) -> str:
     """Render external streaming links as icon anchors."""
     links: list[str] = []
@@ -1,3 +1,3 @@
 """Expose repository modules."""
 
-__all__ = ['admin_users', 'songs']
+__all__ = ['admin_users', 'song_renders', 'songs']
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import and_, delete, exists, insert, select, tuple_
+
+from app.db import song_renders, songs
+
+if TYPE_CHECKING:  # pragma: no cover
+    import uuid
+    from collections.abc import Iterable, Mapping
+    from datetime import datetime
+
+    from sqlalchemy.engine import Result
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def replace_song_renders(
+    conn: AsyncConnection,
+    song_id: uuid.UUID,
+    source_updated_at: datetime,
+    renders: Mapping[tuple[str, bool], str],
+    *,
+    layout: str,
+    format_version: int,
+) -> None:
+    """Replace the stored renders of a song in one layout with a fresh set."""
+    await conn.execute(
+        delete(song_renders).where(
+            song_renders.c.song_id == song_id,
+            song_renders.c.layout == layout,
+        ),
+    )
+    if not renders:
+        return
+    values: list[dict[str, Any]] = [
+        {
+            'song_id': song_id,
+            'key': key,
+            'chords': chords,
+            'layout': layout,
+            'html': html,
+            'source_updated_at': source_updated_at,
+            'format_version': format_version,
+        }
+        for (key, chords), html in renders.items()
+    ]
+    await conn.execute(insert(song_renders), values)
+
+
+async def get_fresh_song_renders(
+    conn: AsyncConnection,
+    wanted: Iterable[tuple[uuid.UUID, str, bool]],
+    layout: str,
+    format_version: int,
+) -> dict[tuple[uuid.UUID, str, bool], str]:
+    """Get stored renders in `layout` and `format_version` still matching their song."""
+    triples = list(dict.fromkeys(wanted))
+    if not triples:
+        return {}
+    c = song_renders.c
+    stmt = (
+        select(c.song_id, c.key, c.chords, c.html)
+        .join(
+            songs,
+            and_(
+                songs.c.id == c.song_id,
+                songs.c.updated_at == c.source_updated_at,
+            ),
+        )
+        .where(
+            c.layout == layout,
+            c.format_version == format_version,
+            tuple_(c.song_id, c.key, c.chords).in_(triples),
+        )
+    )
+    res: Result = await conn.execute(stmt)
+    return {(r.song_id, r.key, r.chords): r.html for r in res}
+
+
+async def list_song_ids_missing_renders(
+    conn: AsyncConnection,
+    layout: str,
+    format_version: int,
+) -> list[uuid.UUID]:
+    """List songs without renders in `layout` and `format_version` matching their `updated_at`."""
+    fresh = exists().where(
+        song_renders.c.song_id == songs.c.id,
+        song_renders.c.layout == layout,
+        song_renders.c.format_version == format_version,
+        song_renders.c.source_updated_at == songs.c.updated_at,
+    )
+    res: Result = await conn.execute(select(songs.c.id).where(~fresh).order_by(songs.c.id))
+    return list(res.scalars().all())
@@ -2,15 +2,72 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import and_, case, func, insert, literal, or_, select, text
+from sqlalchemy import (
+    and_,
+    any_,
+    bindparam,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, UUID
 
-from app.db import songs
+from app.db import SEARCH_TS_CONFIG, songs
+from app.db_capabilities import db_capabilities
+from app.pagination import (
+    InvalidCursorError,
+    after_key,
+    decode_cursor,
+    encode_cursor,
+    parse_created_at_and_id,
+)
+from app.parser import normalize_search_text
+from app.search_cache import cached_searches
+from app.search_index import SONG_COLUMNS, search_index
+from app.settings import settings
 
 if TYPE_CHECKING:  # pragma: no cover
-    from sqlalchemy import Select
+    import uuid
+    from collections.abc import Iterable, Sequence
+    from datetime import datetime
+
+    from sqlalchemy import Column, Select
     from sqlalchemy.engine import Result
     from sqlalchemy.ext.asyncio import AsyncConnection
 
+# Fields of a search suggestion.
+SUGGEST_COLUMNS = ('id', 'translated_title', 'artist', 'default_key')
+# Fields the song listings render (search results, recent songs); no bodies or vectors.
+SUMMARY_COLUMNS = (
+    'id',
+    'translated_title',
+    'original_title',
+    'artist',
+    'default_key',
+    'youtube_url',
+    'songlink_url',
+    'created_at',
+)
+# Fields a setlist article renders from, besides the stored parse and its source.
+SETLIST_COLUMNS = (
+    'id',
+    'translated_title',
+    'original_title',
+    'artist',
+    'default_key',
+    'youtube_url',
+    'songlink_url',
+    'is_draft',
+    'updated_at',
+    'chordpro_ast',
+    'chordpro_ast_version',
+)
+
 
 async def create_song(conn: AsyncConnection, values: dict[str, Any]) -> Any:
     """Create a song and return row."""
@@ -27,50 +84,410 @@ async def get_song_by_id(conn: AsyncConnection, song_id: Any) -> dict[str, Any]
     return dict(row) if row else None
 
 
-async def list_recent_songs(
+async def get_songs_by_ids(
     conn: AsyncConnection,
-    limit: int = 20,
-    include_drafts: bool = False,
+    song_ids: Iterable[uuid.UUID],
+    *,
+    ast_version: int | None = None,
+) -> dict[uuid.UUID, dict[str, Any]]:
+    """
+    Get the setlist fields of many songs in one round trip, keyed by id.
+
+    With `ast_version`, `chordpro_content` is only read for songs whose stored
+    parse is missing or of another version, and is None for the rest.
+    """
+    unique_ids = list(dict.fromkeys(song_ids))
+    if not unique_ids:
+        return {}
+    content: Any = songs.c.chordpro_content
+    if ast_version is not None:
+        fresh = and_(
+            songs.c.chordpro_ast.is_not(None),
+            songs.c.chordpro_ast_version == ast_version,
+        )
+        content = case((fresh, None), else_=content).label('chordpro_content')
+    ids_param = bindparam('song_ids', value=unique_ids, type_=ARRAY(UUID(as_uuid=True)))
+    columns = [songs.c[name] for name in SETLIST_COLUMNS]
+    stmt: Select = select(*columns, content).where(songs.c.id == any_(ids_param))
+    res: Result = await conn.execute(stmt)
+    return {row['id']: dict(row) for row in res.mappings().all()}
+
+
+async def list_song_ids(conn: AsyncConnection) -> list[uuid.UUID]:
+    """List ids of every song, drafts included."""
+    res: Result = await conn.execute(select(songs.c.id).order_by(songs.c.id))
+    return list(res.scalars().all())
+
+
+async def list_songs_with_stale_ast(
+    conn: AsyncConnection,
+    version: int,
 ) -> list[dict[str, Any]]:
-    """List recent songs."""
-    conditions = [] if include_drafts else [songs.c.is_draft.is_(False)]
-    stmt = select(songs).where(and_(*conditions)).order_by(songs.c.created_at.desc()).limit(limit)
+    """List id and content of songs whose stored parse is missing or of another version."""
+    stmt = (
+        select(songs.c.id, songs.c.chordpro_content)
+        .where(
+            or_(
+                songs.c.chordpro_ast_version.is_(None),
+                songs.c.chordpro_ast_version != version,
+            ),
+        )
+        .order_by(songs.c.id)
+    )
     res: Result = await conn.execute(stmt)
     return [dict(m) for m in res.mappings().all()]
 
 
-async def search_songs(
+async def set_song_ast(
     conn: AsyncConnection,
-    query: str,
-    limit: int = 50,
+    song_id: uuid.UUID,
+    ast: Any,
+    version: int,
+) -> None:
+    """Store a song's serialized parse without touching its `updated_at`."""
+    stmt = (
+        update(songs)
+        .where(songs.c.id == song_id)
+        # Keep the version stamp: caches and pre-renders are keyed by it.
+        .values(chordpro_ast=ast, chordpro_ast_version=version, updated_at=songs.c.updated_at)
+    )
+    await conn.execute(stmt)
+
+
+async def get_song_versions(
+    conn: AsyncConnection,
+    song_ids: Iterable[uuid.UUID],
+) -> dict[uuid.UUID, dict[str, Any]]:
+    """Get only `updated_at` and `is_draft` for many songs, keyed by id."""
+    unique_ids = list(dict.fromkeys(song_ids))
+    if not unique_ids:
+        return {}
+    ids_param = bindparam('song_ids', value=unique_ids, type_=ARRAY(UUID(as_uuid=True)))
+    stmt: Select = select(songs.c.id, songs.c.updated_at, songs.c.is_draft).where(
+        songs.c.id == any_(ids_param),
+    )
+    res: Result = await conn.execute(stmt)
+    return {row['id']: dict(row) for row in res.mappings().all()}
+
+
+async def get_catalog_version(conn: AsyncConnection) -> tuple[datetime | None, int]:
+    """Get the latest song change and the number of songs, a cheap listing validator."""
+    stmt = select(func.max(songs.c.updated_at), func.count())
+    res: Result = await conn.execute(stmt)
+    latest, count = res.one()
+    return latest, int(count)
+
+
+def _summary_columns() -> list[Column[Any]]:
+    return [songs.c[name] for name in SUMMARY_COLUMNS]
+
+
+def _ranked_stmt(
+    columns: Sequence[Column[Any]],
+    conditions: list[Any],
+    ranks: list[tuple[str, Any, bool]],
+    limit: int,
+    after: Sequence[Any] | None,
+) -> Select:
+    """
+    Select `columns` and labeled `ranks` (name, expression, descending), newest first on ties.
+
+    `after` holds the rank values, `created_at` and `id` of the last row of the
+    previous page; only rows sorting after it are selected (keyset pagination).
+    """
+    keys = [(expr, desc) for _, expr, desc in ranks]
+    keys += [(songs.c.created_at, True), (songs.c.id, True)]
+    if after is not None:
+        if len(after) != len(keys):
+            raise InvalidCursorError(str(after))
+        conditions = [*conditions, after_key(keys, after)]
+    labeled = [expr.label(name) for name, expr, _ in ranks]
+    order = [
+        label.desc() if desc else label.asc()
+        for label, (_, _, desc) in zip(labeled, ranks, strict=True)
+    ]
+    return (
+        select(*columns, *labeled)
+        .where(and_(*conditions))
+        .order_by(*order, songs.c.created_at.desc(), songs.c.id.desc())
+        .limit(limit)
+    )
+
+
+def recent_songs_stmt(
+    limit: int,
     include_drafts: bool = False,
+    columns: Sequence[Column[Any]] = songs.c,
+    after: Sequence[Any] | None = None,
+) -> Select:
+    """Select the newest songs; `ix_songs_recent_listing` covers the summary columns."""
+    conditions = [] if include_drafts else [songs.c.is_draft.is_(False)]
+    return _ranked_stmt(columns, conditions, [], limit, after)
+
+
+async def list_search_documents(
+    conn: AsyncConnection,
+    changed_since: datetime | None = None,
 ) -> list[dict[str, Any]]:
-    """Search songs with pg_trgm similarity fallback to ILIKE."""
+    """List listing columns and `lyrics_plain` of songs, drafts included, for the search index."""
+    stmt = select(
+        *(songs.c[column] for column in SONG_COLUMNS),
+        songs.c.lyrics_plain,
+    )
+    if changed_since is not None:
+        # Inclusive: a row committed late with the same timestamp is not skipped.
+        stmt = stmt.where(songs.c.updated_at >= changed_since)
+    res: Result = await conn.execute(stmt)
+    return [dict(m) for m in res.mappings().all()]
+
+
+def _like_prefix(term: str) -> str:
+    """Build a LIKE pattern matching values that start with `term` literally."""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'{escaped}%'
+
+
+def suggest_songs_stmt(term: str, limit: int) -> Select:
+    """Select listing fields of published songs whose title starts with `term`."""
+    title = func.lower(songs.c.translated_title)
+    return (
+        select(songs.c.id, songs.c.translated_title, songs.c.artist, songs.c.default_key)
+        # A constant pattern on lower(title), so `ix_songs_title_prefix` can serve it.
+        .where(title.like(_like_prefix(term.lower()), escape='\\'), songs.c.is_draft.is_(False))
+        .order_by(title, songs.c.created_at.desc())
+        .limit(limit)
+    )
+
+
+async def suggest_songs(conn: AsyncConnection, query: str, limit: int = 8) -> list[dict[str, Any]]:
+    """
+    Suggest songs while the user types.
+
+    Uses the in-memory index when it serves searches, else a title prefix query.
+    """
     term = (query or '').strip()
     if not term:
         return []
+    if settings.search_engine == 'memory' and search_index.ready:
+        found = search_index.search(term, limit)
+        return [{key: song[key] for key in SUGGEST_COLUMNS} for song in found]
+    res: Result = await conn.execute(suggest_songs_stmt(term, limit))
+    return [dict(m) for m in res.mappings().all()]
+
+
+def _cache_term(term: str) -> str:
+    """Fold a query to the form every engine treats alike: lowercase, single spaces."""
+    return ' '.join(term.lower().split())
+
+
+async def _search_sql(
+    conn: AsyncConnection,
+    term: str,
+    limit: int,
+    include_drafts: bool,
+    columns: Sequence[Column[Any]],
+    *,
+    after: Sequence[Any] | None = None,
+) -> Result:
+    # Detected at startup; no catalog round trip per search.
+    capabilities = await db_capabilities.get(conn)
+    if settings.search_engine == 'ilike' or not capabilities.tsvector_index:
+        # Without its GIN index a full-text match reads every row anyway; ILIKE ranks better.
+        stmt = _ilike_search_stmt(
+            term,
+            limit,
+            include_drafts,
+            has_trgm=capabilities.pg_trgm,
+            columns=columns,
+            after=after,
+        )
+    else:
+        stmt = fulltext_search_stmt(
+            term,
+            limit,
+            include_drafts,
+            # The trigram branches would turn the bitmap OR into a scan without their indexes.
+            has_trgm=capabilities.pg_trgm and capabilities.trigram_indexes,
+            columns=columns,
+            after=after,
+        )
+    return await conn.execute(stmt)
+
+
+def _keyset_after(cursor: str | None, kind: str) -> list[Any] | None:
+    """Decode a keyset `cursor` issued for `kind` into the values `_ranked_stmt` pages after."""
+    if cursor is None:
+        return None
+    values = decode_cursor(cursor)
+    if len(values) < 3 or values[0] != kind:  # noqa: PLR2004
+        raise InvalidCursorError(cursor)
+    ranks = values[1:-2]
+    if not all(isinstance(v, int | float) and not isinstance(v, bool) for v in ranks):
+        raise InvalidCursorError(cursor)
+    return [*ranks, *parse_created_at_and_id(values)]
 
+
+def _keyset_page(
+    res: Result,
+    limit: int,
+    kind: str,
+    columns: Sequence[Column[Any]],
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Split `limit + 1` ranked rows into a page and the cursor of its last row, if more follow."""
+    rows = res.mappings().all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        names = {col.name for col in columns}
+        ranks = [last[key] for key in last.keys() if key not in names]  # noqa: SIM118
+        next_cursor = encode_cursor([kind, *ranks, last['created_at'], last['id']])
+    return [{col.name: m[col.name] for col in columns} for m in page], next_cursor
+
+
+async def list_recent_song_page(
+    conn: AsyncConnection,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    List one page of recent published songs with the `SUMMARY_COLUMNS`.
+
+    Returns the rows and an opaque cursor for the next page, or None on the last one.
+    """
+    columns = _summary_columns()
+    after = _keyset_after(cursor, 'recent')
+    res = await conn.execute(recent_songs_stmt(limit + 1, columns=columns, after=after))
+    return _keyset_page(res, limit, 'recent', columns)
+
+
+async def search_song_page(
+    conn: AsyncConnection,
+    query: str,
+    limit: int,
+    cursor: str | None = None,
+    include_drafts: bool = False,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Search one page of songs with the `SUMMARY_COLUMNS`, using `settings.search_engine`.
+
+    Returns the rows and an opaque cursor for the next page, or None on the last one.
+    The in-memory engine falls back to SQL until its index is loaded. First pages
+    go through the `cached_searches` TTL cache; treat them as read-only.
+    SQL pages continue after the last row's sort key instead of using OFFSET; the
+    in-memory index ranks in microseconds, so its cursor is a plain offset.
+    Raises `InvalidCursorError` for a cursor not issued by this function.
+    """
+    term = (query or '').strip()
+    if not term:
+        return [], None
+    kind = next(iter(decode_cursor(cursor)), None) if cursor is not None else None
+    use_memory = settings.search_engine == 'memory' and search_index.ready
+    # A cursor keeps its engine, so paging survives the index finishing its load.
+    if kind == 'memory' or (kind is None and use_memory):
+        return _memory_page(term, limit, cursor, include_drafts)
+    columns = _summary_columns()
+    after = _keyset_after(cursor, 'sql')
+    term = _cache_term(term)
+
+    async def load(c: AsyncConnection) -> tuple[list[dict[str, Any]], str | None]:
+        res = await _search_sql(c, term, limit + 1, include_drafts, columns, after=after)
+        return _keyset_page(res, limit, 'sql', columns)
+
+    if after is not None:
+        return await load(conn)
+    # First pages are what repeat; deeper pages go straight to the database.
+    return await cached_searches.get(('page', term, limit, include_drafts), load, conn)
+
+
+def _memory_page(
+    term: str,
+    limit: int,
+    cursor: str | None,
+    include_drafts: bool,
+) -> tuple[list[dict[str, Any]], str | None]:
+    offset = 0
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if not search_index.ready or len(values) != 2 or not isinstance(values[1], int):  # noqa: PLR2004
+            raise InvalidCursorError(cursor)
+        offset = max(values[1], 0)
+    found = search_index.search(term, offset + limit + 1, include_drafts)
+    page = [{key: song[key] for key in SUMMARY_COLUMNS} for song in found[offset : offset + limit]]
+    more = len(found) > offset + limit
+    return page, encode_cursor(['memory', offset + limit]) if more else None
+
+
+def fulltext_search_stmt(
+    term: str,
+    limit: int,
+    include_drafts: bool,
+    *,
+    has_trgm: bool,
+    columns: Sequence[Column[Any]] = songs.c,
+    after: Sequence[Any] | None = None,
+) -> Select:
+    """
+    Match `search_vector` with `websearch_to_tsquery`, ranked by `ts_rank_cd`.
+
+    Every match branch is served by a GIN index (search vector, title and artist
+    trigrams), so Postgres can combine them in a bitmap OR instead of scanning
+    song bodies. Title trigram similarity keeps typos findable.
+    """
+    like_any = f'%{term}%'
+    like_prefix = f'{term}%'
+    lyrics_like = f'%{normalize_search_text(term)}%'
+    # Same configuration as the `songs_update_search_vector` trigger.
+    tsquery = func.websearch_to_tsquery(cast(literal(SEARCH_TS_CONFIG), REGCONFIG), term)
+    matches = [
+        songs.c.search_vector.bool_op('@@')(tsquery),
+        songs.c.translated_title.ilike(like_any),
+        songs.c.artist.ilike(like_any),
+    ]
+    # ts_rank_cd weighs the trigger's A/B/C labels (title; original title and artist; lyrics).
+    # A title match may lack a vector; a NULL score would break the keyset cursor.
+    score = func.coalesce(func.ts_rank_cd(songs.c.search_vector, tsquery), literal(0))
+    if has_trgm:
+        # Substring lyric matches; only the trigram indexes can serve them.
+        matches.append(songs.c.lyrics_plain.ilike(lyrics_like))
+        matches.append(songs.c.translated_title.bool_op('%')(term))
+        score = score + func.similarity(songs.c.translated_title, term) * literal(0.5)
+    conditions = [or_(*matches)]
+    if not include_drafts:
+        conditions.append(songs.c.is_draft.is_(False))
+    prefix_first = case(
+        (songs.c.translated_title.ilike(like_prefix), literal(0)),
+        else_=literal(1),
+    )
+    ranks = [('prefix_first', prefix_first, False), ('score', score, True)]
+    return _ranked_stmt(columns, conditions, ranks, limit, after)
+
+
+def _ilike_search_stmt(
+    term: str,
+    limit: int,
+    include_drafts: bool,
+    *,
+    has_trgm: bool,
+    columns: Sequence[Column[Any]],
+    after: Sequence[Any] | None = None,
+) -> Select:
+    """Search songs with pg_trgm similarity fallback to ILIKE."""
     like_any = f'%{term}%'
     like_prefix = f'{term}%'
+    lyrics_term = normalize_search_text(term)
     base_conditions = [
         or_(
             songs.c.translated_title.ilike(like_any),
             songs.c.original_title.ilike(like_any),
             songs.c.artist.ilike(like_any),
-            songs.c.chordpro_content.ilike(like_any),
+            songs.c.lyrics_plain.ilike(f'%{lyrics_term}%'),
         ),
     ]
     if not include_drafts:
         base_conditions.append(songs.c.is_draft.is_(False))
 
-    # Check if pg_trgm is available; if not, keep simple ILIKE + priority ordering
-    has_trgm = False
-    try:
-        res = await conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
-        has_trgm = res.first() is not None
-    except Exception as _exc:  # noqa: BLE001
-        has_trgm = False
-
+    # Without pg_trgm keep simple ILIKE + priority ordering
     if not has_trgm:
         priority = case(
             (songs.c.translated_title.ilike(like_prefix), literal(1)),
@@ -78,22 +495,15 @@ async def search_songs(
             (songs.c.original_title.ilike(like_any), literal(3)),
             (songs.c.artist.ilike(like_any), literal(4)),
             else_=literal(5),
-        ).label('priority')
-        stmt = (
-            select(songs, priority)
-            .where(and_(*base_conditions))
-            .order_by(priority.asc(), songs.c.created_at.desc())
-            .limit(limit)
         )
-        res2: Result = await conn.execute(stmt)
-        maps2 = res2.mappings().all()
-        return [{col.name: m.get(col.name, None) for col in songs.c} for m in maps2]
+        return _ranked_stmt(columns, base_conditions, [('priority', priority, False)], limit, after)
 
-    # pg_trgm-enhanced ranking
+    # pg_trgm-enhanced ranking; similarity() is NULL for a missing original title or artist,
+    # which would null the whole score and break the keyset cursor.
     title_sim = func.similarity(songs.c.translated_title, term)
-    orig_sim = func.similarity(songs.c.original_title, term)
-    artist_sim = func.similarity(songs.c.artist, term)
-    lyrics_sim = func.similarity(songs.c.chordpro_content, term)
+    orig_sim = func.coalesce(func.similarity(songs.c.original_title, term), literal(0))
+    artist_sim = func.coalesce(func.similarity(songs.c.artist, term), literal(0))
+    lyrics_sim = func.similarity(songs.c.lyrics_plain, lyrics_term)
     title_prefix_bonus = case(
         (songs.c.translated_title.ilike(like_prefix), literal(0.1)),
         else_=literal(0),
@@ -104,20 +514,12 @@ async def search_songs(
         + (artist_sim * literal(0.3))
         + (lyrics_sim * literal(0.2))
         + title_prefix_bonus
-    ).label('score')
+    )
     # keep implicit thresholding; datasets are small and curated
 
     prefix_first = case(
         (songs.c.translated_title.ilike(like_prefix), literal(0)),
         else_=literal(1),
-    ).label('prefix_first')
-
-    stmt = (
-        select(songs, score)
-        .where(and_(*base_conditions))
-        .order_by(prefix_first.asc(), score.desc(), songs.c.created_at.desc())
-        .limit(limit)
     )
-    res3: Result = await conn.execute(stmt)
-    maps3 = res3.mappings().all()
-    return [{col.name: m.get(col.name, None) for col in songs.c} for m in maps3]
+    ranks = [('prefix_first', prefix_first, False), ('score', score, True)]
+    return _ranked_stmt(columns, base_conditions, ranks, limit, after)
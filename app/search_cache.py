@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+from .cache import LRUCache
+from .db import get_connection
+from .settings import settings
+from .song_changes import song_changes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar('V')
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry(Generic[V]):
+    value: V
+    stored_at: float
+    version: int
+
+
+class SearchResultCache(Generic[V]):
+    """
+    Keep recent search results for `ttl` seconds, then serve them stale while one task refreshes.
+
+    `invalidate` bumps a version counter instead of walking the entries; entries
+    stored under an older version count as misses. Values are shared between
+    requests and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stale_ttl: float,
+        connect: Callable[[], AsyncIterator[AsyncConnection]] = get_connection,
+    ) -> None:
+        """Create an empty cache; a `maxsize` or `ttl` of 0 turns it off."""
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.version = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._entries: LRUCache[Hashable, _Entry[V]] = LRUCache(maxsize)
+        self._refreshing: dict[Hashable, asyncio.Task[None]] = {}
+        self._connect = connect
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups are cached at all."""
+        return self._entries.maxsize > 0 and self.ttl > 0
+
+    def invalidate(self) -> None:
+        """Make every stored entry a miss, e.g. after a song is saved."""
+        self.version += 1
+
+    async def get(
+        self,
+        key: Hashable,
+        load: Callable[[AsyncConnection], Awaitable[V]],
+        conn: AsyncConnection,
+    ) -> V:
+        """Return the cached value for `key`, loading it with `load(conn)` on a miss."""
+        if not self.enabled:
+            return await load(conn)
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == self.version:
+            age = time.monotonic() - entry.stored_at
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._refresh(key, load)
+                return entry.value
+        self.misses += 1
+        return await self._load(key, load, conn)
+
+    async def _load(
+        self,
+        key: Hashable,
+        load: Callable[[AsyncConnection], Awaitable[V]],
+        conn: AsyncConnection,
+    ) -> V:
+        # Captured first: a load racing an invalidation is stored as already stale.
+        version = self.version
+        value = await load(conn)
+        self._entries.set(key, _Entry(value, time.monotonic(), version))
+        return value
+
+    def _refresh(self, key: Hashable, load: Callable[[AsyncConnection], Awaitable[V]]) -> None:
+        """Reload `key` in the background unless a reload is already running."""
+        if key in self._refreshing:
+            return
+        task = asyncio.get_running_loop().create_task(self._reload(key, load))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _reload(self, key: Hashable, load: Callable[[AsyncConnection], Awaitable[V]]) -> None:
+        try:
+            async for conn in self._connect():
+                await self._load(key, load, conn)
+                break
+        except Exception:
+            # Until the stale window closes the old value is served; then a request reloads.
+            logger.exception('Refreshing a cached search failed')
+            return
+        self.refreshes += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return size, hit/stale/miss counters and the invalidation version."""
+        lookups = self.hits + self.stale_hits + self.misses
+        served = self.hits + self.stale_hits
+        return {
+            'size': len(self._entries),
+            'maxsize': self._entries.maxsize,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_ratio': round(served / lookups, 4) if lookups else 0.0,
+            'refreshes': self.refreshes,
+            'version': self.version,
+        }
+
+
+# Database search results per (kind, normalized query, limit, include drafts).
+cached_searches: SearchResultCache[Any] = SearchResultCache(
+    settings.search_cache_size,
+    settings.search_cache_ttl_seconds,
+    settings.search_cache_stale_seconds,
+)
+# Any song change may reorder results, so each one drops every stored search.
+song_changes.subscribe(
+    lambda _song_id, _updated_at: cached_searches.invalidate(),
+    cached_searches.invalidate,
+)
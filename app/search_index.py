@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .parser import normalize_search_text
+
+if TYPE_CHECKING:  # pragma: no cover
+    import uuid
+    from collections.abc import Iterable, Iterator, Mapping
+
+# Fields in posting lists: translated title, original title, artist, lyrics.
+TITLE, ORIGINAL, ARTIST, LYRICS = range(4)
+# ts_rank_cd's default weights of the labels `songs_update_search_vector` gives each field.
+FIELD_WEIGHTS = (1.0, 0.4, 0.4, 0.2)
+TITLE_SIMILARITY_WEIGHT = 0.5
+# pg_trgm's default `similarity_threshold`, the bar the `%` operator applies.
+SIMILARITY_THRESHOLD = 0.3
+# The last query word also matches longer words once it is this long (search as you type).
+MIN_PREFIX_WORD = 3
+# Substrings of titles and artist indexed up to this length; longer queries AND their trigrams.
+GRAM_SIZE = 3
+# Title prefixes indexed up to this length; longer ones are checked against the title.
+PREFIX_SIZE = 16
+# Listing columns kept per song and returned by searches.
+SONG_COLUMNS = (
+    'id',
+    'translated_title',
+    'original_title',
+    'artist',
+    'default_key',
+    'youtube_url',
+    'songlink_url',
+    'is_draft',
+    'created_at',
+    'updated_at',
+)
+
+_WORD = re.compile(r'\w+')
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the trigrams pg_trgm extracts from text: per word, padded `'  w '`."""
+    grams: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """Return pg_trgm `similarity(a, b)`."""
+    ta, tb = trigrams(a), trigrams(b)
+    union = len(ta | tb)
+    return len(ta & tb) / union if union else 0.0
+
+
+def _substrings(text: str) -> set[str]:
+    return {
+        text[i : i + size] for size in range(1, GRAM_SIZE + 1) for i in range(len(text) - size + 1)
+    }
+
+
+def _query_grams(text: str) -> set[str]:
+    if len(text) <= GRAM_SIZE:
+        return {text}
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _highest_bits(mask: int) -> Iterator[int]:
+    """Yield set bit positions of `mask` from the highest down."""
+    while mask:
+        slot = mask.bit_length() - 1
+        yield slot
+        mask ^= 1 << slot
+
+
+def _count_equal(counter: list[int], count: int) -> int:
+    """Mask of positions whose bit-sliced `counter` holds exactly `count`."""
+    if count >> len(counter):
+        return 0
+    mask = -1
+    for i, bits in enumerate(counter):
+        mask &= bits if count >> i & 1 else ~bits
+    return mask
+
+
+@dataclass(slots=True)
+class _Entry:
+    song: dict[str, Any]
+    texts: tuple[str, str, str]
+    words: tuple[frozenset[str], ...]
+    title_trigrams: frozenset[str]
+
+
+class SearchIndex:
+    """
+    Rank songs in memory with the signals of the full-text SQL search.
+
+    Every song takes a slot, numbered by `created_at`, and each posting list is
+    an int bitmask over slots. Matching and grouping by score are then a few
+    big-int operations, and the newest songs of a group are its highest bits.
+    Ranking mirrors `fulltext_search_stmt`: title prefix first, then the
+    field-weighted word match plus half the title trigram similarity, then
+    recency. Word matches are approximated per field instead of by cover
+    density, and substring matches accept any field holding every trigram of
+    the query, as a trigram index would before its recheck.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index; searches fall back to SQL until it is loaded."""
+        self.ready = False
+        # Newest `updated_at` seen, and the `get_catalog_version` the index reflects.
+        self.latest_update: Any = None
+        self.catalog_version: Any = None
+        self._slots: dict[uuid.UUID, int] = {}
+        self._entries: list[_Entry | None] = []
+        # Posting lists by table; every value is a bitmask over slots.
+        self._flags: dict[str, int] = {}
+        self._grams: dict[tuple[str, int], int] = {}
+        self._title_prefixes: dict[str, int] = {}
+        self._words: dict[tuple[str, int], int] = {}
+        self._title_trigrams: dict[str, int] = {}
+        self._trigram_counts: dict[int, int] = {}
+        self._vocabulary: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, song_id: object) -> bool:
+        return song_id in self._slots
+
+    def load(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """Replace the index with the given song rows, which need `lyrics_plain`."""
+        self._reset([self._entry(row) for row in rows])
+        self.ready = True
+
+    def upsert(self, row: Mapping[str, Any]) -> None:
+        """Add a song or refresh its fields, keeping its slot when it has one."""
+        entry = self._entry(row)
+        slot = self._slots.get(entry.song['id'])
+        if slot is not None:
+            self._unindex(slot)
+            self._index(slot, entry)
+            return
+        newest = next((e for e in reversed(self._entries) if e is not None), None)
+        if newest is not None and entry.song['created_at'] < newest.song['created_at']:
+            # Slots are ordered by creation; an older newcomer renumbers them.
+            self._reset([*(e for e in self._entries if e is not None), entry])
+            return
+        self._entries.append(None)
+        self._index(len(self._entries) - 1, entry)
+
+    def remove(self, song_id: uuid.UUID) -> bool:
+        """Drop a song and return whether it was indexed."""
+        slot = self._slots.get(song_id)
+        if slot is None:
+            return False
+        self._unindex(slot)
+        return True
+
+    def song_ids(self) -> set[uuid.UUID]:
+        """Return the ids of every indexed song, drafts included."""
+        return set(self._slots)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        include_drafts: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Return up to `limit` listing dicts of the best matches, best first."""
+        term = normalize_search_text((query or '').strip())
+        if not term or limit <= 0:
+            return []
+        live = self._flags.get('live', 0)
+        universe = live if include_drafts else live & ~self._flags.get('draft', 0)
+        if not universe:
+            return []
+        substring = self._substring_matches(term)
+        word_all, word_levels = self._word_matches(term)
+        sim_groups = self._similarity_groups(term, universe)
+        fuzzy = 0
+        for sim, mask in sim_groups:
+            if sim >= SIMILARITY_THRESHOLD:
+                fuzzy |= mask
+        matches = (substring | word_all | fuzzy) & universe
+        if not matches:
+            return []
+        sim_groups.append((0.0, matches & ~self._any_mask(sim_groups)))
+        word_levels.append((0.0, ~word_all))
+
+        groups = self._rank_groups(
+            matches,
+            self._title_prefix_matches(term) & matches,
+            word_levels,
+            sim_groups,
+        )
+        found: list[dict[str, Any]] = []
+        for key in sorted(groups):
+            for slot in _highest_bits(groups[key]):
+                entry = self._entries[slot]
+                if entry is not None:
+                    found.append(dict(entry.song))
+                if len(found) >= limit:
+                    return found
+        return found
+
+    @staticmethod
+    def _rank_groups(
+        matches: int,
+        prefix: int,
+        word_levels: list[tuple[float, int]],
+        sim_groups: list[tuple[float, int]],
+    ) -> dict[tuple[int, float], int]:
+        """Split matches into groups of equal `(prefix_first, -score)`, the SQL sort key."""
+        groups: dict[tuple[int, float], int] = {}
+        for prefix_rank, base in ((0, matches & prefix), (1, matches & ~prefix)):
+            for weight, word_mask in word_levels:
+                part = base & word_mask
+                if not part:
+                    continue
+                for sim, sim_mask in sim_groups:
+                    group = part & sim_mask
+                    if group:
+                        key = (prefix_rank, -(weight + TITLE_SIMILARITY_WEIGHT * sim))
+                        groups[key] = groups.get(key, 0) | group
+        return groups
+
+    def _substring_matches(self, term: str) -> int:
+        """Songs whose title, original title or artist hold the term (ILIKE '%term%')."""
+        found = 0
+        for field in (TITLE, ORIGINAL, ARTIST):
+            mask = -1
+            for gram in _query_grams(term):
+                mask &= self._grams.get((gram, field), 0)
+                if not mask:
+                    break
+            found |= mask
+        return found
+
+    def _title_prefix_matches(self, term: str) -> int:
+        """Songs whose title starts with the term (ILIKE 'term%')."""
+        mask = self._title_prefixes.get(term[:PREFIX_SIZE], 0)
+        if len(term) > PREFIX_SIZE:
+            for slot in _highest_bits(mask):
+                entry = self._entries[slot]
+                if entry is None or not entry.texts[TITLE].startswith(term):
+                    mask ^= 1 << slot
+        return mask
+
+    def _field_masks(self, word: str, *, prefix: bool) -> list[int]:
+        words = [word]
+        if prefix:
+            vocabulary = self._vocabulary
+            start = bisect_left(vocabulary, word)
+            end = bisect_left(vocabulary, word + '\U0010ffff', start)
+            words = vocabulary[start:end]
+        masks = [0, 0, 0, 0]
+        for field in range(len(masks)):
+            for each in words:
+                masks[field] |= self._words.get((each, field), 0)
+        return masks
+
+    def _word_matches(self, term: str) -> tuple[int, list[tuple[float, int]]]:
+        """
+        Songs holding every query word, and the word-match weight levels.
+
+        A song weighs as its weakest query word, each word counting with the
+        heaviest field it occurs in, as ts_rank_cd weighs labels.
+        """
+        words = _WORD.findall(term)
+        if not words:
+            return 0, []
+        heavy = medium = every = -1
+        for i, word in enumerate(words):
+            prefix = i == len(words) - 1 and len(word) >= MIN_PREFIX_WORD
+            title, original, artist, lyrics = self._field_masks(word, prefix=prefix)
+            heavy &= title
+            medium &= title | original | artist
+            every &= title | original | artist | lyrics
+        medium &= ~heavy
+        levels = [
+            (FIELD_WEIGHTS[TITLE], heavy),
+            (FIELD_WEIGHTS[ARTIST], medium),
+            (FIELD_WEIGHTS[LYRICS], every & ~heavy & ~medium),
+        ]
+        return every, levels
+
+    def _similarity_groups(self, term: str, universe: int) -> list[tuple[float, int]]:
+        """Group songs sharing title trigrams with the term by their similarity."""
+        query_trigrams = trigrams(term)
+        counter: list[int] = []
+        for gram in query_trigrams:
+            carry = self._title_trigrams.get(gram, 0) & universe
+            for i, bits in enumerate(counter):
+                if not carry:
+                    break
+                counter[i] = bits ^ carry
+                carry &= bits
+            if carry:
+                counter.append(carry)
+        groups: list[tuple[float, int]] = []
+        for shared in range(1, len(query_trigrams) + 1):
+            with_shared = _count_equal(counter, shared)
+            if not with_shared:
+                continue
+            for count, bucket in self._trigram_counts.items():
+                group = with_shared & bucket
+                if group:
+                    groups.append((shared / (len(query_trigrams) + count - shared), group))
+        return groups
+
+    @staticmethod
+    def _any_mask(groups: list[tuple[float, int]]) -> int:
+        mask = 0
+        for _, group in groups:
+            mask |= group
+        return mask
+
+    @staticmethod
+    def _entry(row: Mapping[str, Any]) -> _Entry:
+        song = {column: row.get(column) for column in SONG_COLUMNS}
+        texts = tuple(normalize_search_text(row.get(column) or '') for column in SONG_COLUMNS[1:4])
+        # The column is normalized by the database already.
+        lyrics = row.get('lyrics_plain') or ''
+        return _Entry(
+            song=song,
+            texts=texts,  # type: ignore[arg-type]
+            words=tuple(frozenset(_WORD.findall(text)) for text in (*texts, lyrics)),
+            title_trigrams=frozenset(trigrams(texts[TITLE])),
+        )
+
+    def _postings(self, entry: _Entry) -> Iterator[tuple[dict[Any, int], Any]]:
+        """Yield every (table, key) posting list a song belongs to."""
+        yield self._flags, 'live'
+        if entry.song['is_draft']:
+            yield self._flags, 'draft'
+        for field, text in enumerate(entry.texts):
+            for gram in _substrings(text):
+                yield self._grams, (gram, field)
+        title = entry.texts[TITLE]
+        for size in range(1, min(len(title), PREFIX_SIZE) + 1):
+            yield self._title_prefixes, title[:size]
+        for field, words in enumerate(entry.words):
+            for word in words:
+                yield self._words, (word, field)
+        for gram in entry.title_trigrams:
+            yield self._title_trigrams, gram
+        if entry.title_trigrams:
+            yield self._trigram_counts, len(entry.title_trigrams)
+
+    def _reset(self, entries: list[_Entry]) -> None:
+        """Rebuild every posting list at once, slots ordered by creation."""
+        ready, catalog_version = self.ready, self.catalog_version
+        self.__init__()
+        self.ready, self.catalog_version = ready, catalog_version
+        entries.sort(key=lambda e: (e.song['created_at'], e.song['id']))
+        self._entries = list(entries)
+        slots: dict[tuple[int, Any], tuple[dict[Any, int], list[int]]] = {}
+        for slot, entry in enumerate(entries):
+            self._slots[entry.song['id']] = slot
+            self._note_update(entry)
+            for table, key in self._postings(entry):
+                slots.setdefault((id(table), key), (table, []))[1].append(slot)
+        # Setting bits in a byte buffer is linear; OR-ing ints one by one is not.
+        size = len(entries) // 8 + 1
+        for (_, key), (table, positions) in slots.items():
+            bits = bytearray(size)
+            for slot in positions:
+                bits[slot >> 3] |= 1 << (slot & 7)
+            table[key] = int.from_bytes(bits, 'little')
+        self._vocabulary = sorted({word for word, _ in self._words})
+
+    def _index(self, slot: int, entry: _Entry) -> None:
+        bit = 1 << slot
+        self._entries[slot] = entry
+        self._slots[entry.song['id']] = slot
+        self._note_update(entry)
+        for table, key in self._postings(entry):
+            if table is self._words and key not in table:
+                word = key[0]
+                i = bisect_left(self._vocabulary, word)
+                if i == len(self._vocabulary) or self._vocabulary[i] != word:
+                    insort(self._vocabulary, word)
+            table[key] = table.get(key, 0) | bit
+
+    def _unindex(self, slot: int) -> None:
+        entry = self._entries[slot]
+        if entry is None:
+            return
+        clear = ~(1 << slot)
+        self._entries[slot] = None
+        del self._slots[entry.song['id']]
+        for table, key in self._postings(entry):
+            mask = table[key] & clear
+            if mask:
+                table[key] = mask
+            else:
+                del table[key]
+
+    def _note_update(self, entry: _Entry) -> None:
+        latest = entry.song['updated_at']
+        if latest is not None and (self.latest_update is None or latest > self.latest_update):
+            self.latest_update = latest
+
+
+search_index = SearchIndex()
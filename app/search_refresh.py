@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .db import get_connection
+from .repositories.songs import get_catalog_version, list_search_documents, list_song_ids
+from .search_index import search_index
+from .settings import settings
+from .song_changes import song_changes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+_background_tasks: set[asyncio.Task[Any]] = set()
+
+
+async def load_search_index(conn: AsyncConnection) -> int:
+    """Fill the in-memory search index with every song and return how many."""
+    version = await get_catalog_version(conn)
+    search_index.load(await list_search_documents(conn))
+    search_index.catalog_version = version
+    return len(search_index)
+
+
+async def refresh_search_index(conn: AsyncConnection) -> int:
+    """Apply songs changed or deleted since the last refresh and return how many changed."""
+    version = await get_catalog_version(conn)
+    if version == search_index.catalog_version:
+        return 0
+    rows = await list_search_documents(conn, changed_since=search_index.latest_update)
+    for row in rows:
+        search_index.upsert(row)
+    deleted = search_index.song_ids() - set(await list_song_ids(conn))
+    for song_id in deleted:
+        search_index.remove(song_id)
+    search_index.catalog_version = version
+    return len(rows) + len(deleted)
+
+
+async def _refresh_in_background() -> None:
+    try:
+        async for conn in get_connection():
+            await refresh_search_index(conn)
+            break
+    except Exception:
+        # The next periodic refresh retries; searches meanwhile see the previous catalog.
+        logger.exception('Refreshing the search index failed')
+
+
+def schedule_search_index_refresh() -> asyncio.Task[None] | None:
+    """Refresh a loaded search index in the background of the running event loop."""
+    if not search_index.ready:
+        return None
+    task = asyncio.get_running_loop().create_task(_refresh_in_background())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+class _CoalescedRefresh:
+    """Refresh a loaded index on request, folding requests made meanwhile into one more pass."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task[None] | None = None
+        self._again = False
+
+    def request(self) -> None:
+        if not search_index.ready:
+            return
+        if self._task is not None and not self._task.done():
+            self._again = True
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        # Requests made before this task started are covered by its first pass.
+        self._again = True
+        while self._again:
+            self._again = False
+            await _refresh_in_background()
+
+
+# Songs changed on other workers reach the index without waiting for the periodic refresh;
+# a burst of notifications costs one refresh, plus one for changes made while it ran.
+_on_song_change = _CoalescedRefresh()
+song_changes.subscribe(
+    lambda _song_id, _updated_at: _on_song_change.request(),
+    _on_song_change.request,
+)
+
+
+async def _refresh_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await _refresh_in_background()
+
+
+async def start_search_index() -> asyncio.Task[None] | None:
+    """
+    Load the search index and start refreshing it, when `search_engine` is 'memory'.
+
+    Returns the refresh task for the caller to cancel on shutdown. When loading
+    fails, searches keep using the full-text query.
+    """
+    if settings.search_engine != 'memory':
+        return None
+    try:
+        async for conn in get_connection():
+            count = await load_search_index(conn)
+            break
+    except Exception:
+        logger.exception('Loading the search index failed')
+        return None
+    logger.info('Loaded %d songs into the search index', count)
+    return asyncio.get_running_loop().create_task(
+        _refresh_periodically(settings.search_index_refresh_seconds),
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +14,37 @@ class Settings(BaseSettings):
     force_https: bool = False
     gzip_min_length: int = 512
     sentry_dsn: str | None = None
+    parsed_song_cache_size: int = 256
+    song_article_cache_size: int = 1024
+    transposed_chord_cache_size: int = 4096
+    # 'memory' keeps parsed songs and rendered articles per worker; 'sqlite' shares them between
+    # the workers on a host through one file (`shared_cache_path`, default in the temp dir),
+    # each cache holding up to `shared_cache_max_bytes` of serialized entries.
+    cache_backend: Literal['memory', 'sqlite'] = 'memory'
+    shared_cache_path: str = ''
+    shared_cache_max_bytes: int = 64 * 1024 * 1024
+    # 'fulltext' matches the indexed search_vector; 'ilike' scans titles, artist and song bodies;
+    # 'memory' ranks in an in-process index loaded at startup, with 'fulltext' until it is ready.
+    search_engine: Literal['fulltext', 'ilike', 'memory'] = 'fulltext'
+    # How often a 'memory' search index picks up songs changed by other workers.
+    search_index_refresh_seconds: float = 30.0
+    # Database search results are reused for the TTL, then served stale for up to
+    # `search_cache_stale_seconds` while one background query refreshes them; size 0 disables.
+    search_cache_size: int = 512
+    search_cache_ttl_seconds: float = 60.0
+    search_cache_stale_seconds: float = 600.0
+    # How often extensions and search indexes are re-detected (`/diagnostics/database`); 0 never.
+    db_capabilities_refresh_seconds: float = 300.0
+    # Stream setlists with at least this many songs article by article; 0 disables.
+    setlist_stream_min_songs: int = 0
+    # Render this many setlist songs up front and the rest as placeholders that load near the
+    # viewport from `/songs/{id}/fragment`; 0 renders every song.
+    setlist_eager_songs: int = 0
+    # 'wrapped' hard-wraps song lines for a phone-width column; 'fluid' leaves wrapping to the
+    # browser so one render serves every screen. Stored renders are kept per layout.
+    render_layout: Literal['wrapped', 'fluid'] = 'wrapped'
+    # Evict songs edited by other workers or the admin as Postgres notifies the changes.
+    listen_song_changes: bool = True
 
     admin_bootstrap_email: str | None = None
     admin_bootstrap_password: str | None = None
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar('V')
+
+DEFAULT_PATH = Path(tempfile.gettempdir()) / 'lyrics-app-cache.sqlite3'
+# Values at least this long are stored zlib-compressed; article HTML shrinks several times.
+COMPRESS_MIN_BYTES = 512
+# A hit refreshes its entry's recency at most this often, so reads rarely write.
+TOUCH_INTERVAL_SECONDS = 30.0
+# A full cache is trimmed to this share of its budget, so eviction does not run on every store.
+EVICT_TO = 0.9
+# How long a worker waits for another one's write before treating the lookup as a miss.
+BUSY_TIMEOUT_SECONDS = 0.05
+MMAP_BYTES = 256 * 1024 * 1024
+
+# `cache_usage` is kept current by triggers, so checking the byte budget never scans entries.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entries_used ON cache_entries (namespace, used);
+CREATE TABLE IF NOT EXISTS cache_usage (
+    namespace TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    entries INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS cache_entries_added AFTER INSERT ON cache_entries BEGIN
+    INSERT INTO cache_usage (namespace, bytes, entries) VALUES (NEW.namespace, NEW.size, 1)
+    ON CONFLICT (namespace) DO UPDATE SET bytes = bytes + excluded.bytes, entries = entries + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entries_resized AFTER UPDATE OF size ON cache_entries BEGIN
+    UPDATE cache_usage SET bytes = bytes - OLD.size + NEW.size WHERE namespace = NEW.namespace;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entries_removed AFTER DELETE ON cache_entries BEGIN
+    UPDATE cache_usage SET bytes = bytes - OLD.size, entries = entries - 1
+    WHERE namespace = OLD.namespace;
+END;
+"""
+
+_UPSERT = """
+INSERT INTO cache_entries (namespace, key, value, size, used) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (namespace, key) DO UPDATE
+SET value = excluded.value, size = excluded.size, used = excluded.used
+"""
+
+# Keep the most recently used entries that fit in the target and drop the rest.
+_EVICT = """
+DELETE FROM cache_entries WHERE namespace = ?1 AND key IN (
+    SELECT key FROM (
+        SELECT key, SUM(size) OVER (ORDER BY used DESC, key) AS kept
+        FROM cache_entries WHERE namespace = ?1
+    )
+    WHERE kept > ?2
+)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Codec(Generic[V]):
+    """Turn cached values into bytes and back."""
+
+    dumps: Callable[[V], bytes]
+    loads: Callable[[bytes], V]
+
+
+TEXT_CODEC: Codec[str] = Codec(str.encode, bytes.decode)
+
+
+def _encode_part(part: Any) -> Any:
+    if isinstance(part, uuid.UUID):
+        return {'u': str(part)}
+    if isinstance(part, datetime):
+        return {'t': part.isoformat()}
+    return part
+
+
+def _decode_part(part: Any) -> Any:
+    if isinstance(part, dict):
+        if 'u' in part:
+            return uuid.UUID(part['u'])
+        return datetime.fromisoformat(part['t'])
+    return part
+
+
+def encode_key(key: tuple[Any, ...]) -> str:
+    """Spell a tuple of str, int, float, bool, None, UUID and datetime the same way every time."""
+    return json.dumps([_encode_part(part) for part in key], separators=(',', ':'))
+
+
+def decode_key(encoded: str) -> tuple[Any, ...]:
+    """Rebuild a key tuple from `encode_key` output."""
+    return tuple(_decode_part(part) for part in json.loads(encoded))
+
+
+def _pack(data: bytes) -> bytes:
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b'z' + zlib.compress(data, 1)
+    return b'r' + data
+
+
+def _unpack(blob: bytes) -> bytes:
+    if blob[:1] == b'z':
+        return zlib.decompress(blob[1:])
+    return blob[1:]
+
+
+class SharedCache(Generic[V]):
+    """
+    Keep cache entries in an SQLite file that every worker on the host reads.
+
+    Entries live under `namespace`, are serialized with `codec`, and the least
+    recently used ones are evicted once the namespace holds more than
+    `max_bytes`. The file is memory-mapped and written in WAL mode, so
+    readers do not block each other. Any SQLite error, such as a lock held
+    too long, is logged and counts as a miss; a cache never fails a request.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str | Path, namespace: str, max_bytes: int, codec: Codec[V]) -> None:
+        """Describe the store; the file is opened on first use in each process."""
+        self.path = Path(path or DEFAULT_PATH)
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self._db: sqlite3.Connection | None = None
+        self._pid = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not cross a fork, so each worker process opens its own.
+        if self._db is None or self._pid != os.getpid():
+            db = sqlite3.connect(
+                self.path,
+                timeout=BUSY_TIMEOUT_SECONDS,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            try:
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute('PRAGMA synchronous=OFF')
+                db.execute(f'PRAGMA mmap_size={MMAP_BYTES}')
+                db.executescript(_SCHEMA)
+            except sqlite3.Error:
+                db.close()
+                raise
+            self._db = db
+            self._pid = os.getpid()
+        return self._db
+
+    def _failed(self, action: str, exc: sqlite3.Error) -> None:
+        self.errors += 1
+        logger.warning('Shared cache %s: %s failed: %s', self.namespace, action, exc)
+
+    def __len__(self) -> int:
+        return self._usage()[1]
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    'SELECT 1 FROM cache_entries WHERE namespace = ? AND key = ?',
+                    (self.namespace, encode_key(key)),  # type: ignore[arg-type]
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            self._failed('lookup', exc)
+            return False
+        return row is not None
+
+    def get(self, key: tuple[Any, ...]) -> V | None:
+        """Return a stored value, or None on a miss."""
+        encoded = encode_key(key)
+        try:
+            db = self._connection()
+            row = db.execute(
+                'SELECT value, used FROM cache_entries WHERE namespace = ? AND key = ?',
+                (self.namespace, encoded),
+            ).fetchone()
+            now = time.time()
+            if row is not None and now - row[1] > TOUCH_INTERVAL_SECONDS:
+                db.execute(
+                    'UPDATE cache_entries SET used = ? WHERE namespace = ? AND key = ?',
+                    (now, self.namespace, encoded),
+                )
+        except sqlite3.Error as exc:
+            self._failed('read', exc)
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.codec.loads(_unpack(row[0]))
+
+    def set(self, key: tuple[Any, ...], value: V) -> None:
+        """Store a value, evicting the least recently used entries beyond the byte budget."""
+        if self.max_bytes <= 0:
+            return
+        blob = _pack(self.codec.dumps(value))
+        if len(blob) > self.max_bytes:
+            return
+        try:
+            db = self._connection()
+            db.execute('BEGIN IMMEDIATE')
+            with db:  # commits, or rolls back on error
+                db.execute(
+                    _UPSERT,
+                    (self.namespace, encode_key(key), blob, len(blob), time.time()),
+                )
+                (used,) = db.execute(
+                    'SELECT bytes FROM cache_usage WHERE namespace = ?',
+                    (self.namespace,),
+                ).fetchone()
+                if used > self.max_bytes:
+                    target = int(self.max_bytes * EVICT_TO)
+                    self.evictions += db.execute(_EVICT, (self.namespace, target)).rowcount
+        except sqlite3.Error as exc:
+            self._failed('write', exc)
+
+    def discard_where(self, predicate: Callable[[tuple[Any, ...]], bool]) -> int:
+        """Drop entries whose key matches the predicate and return how many."""
+        try:
+            db = self._connection()
+            rows = db.execute(
+                'SELECT key FROM cache_entries WHERE namespace = ?',
+                (self.namespace,),
+            ).fetchall()
+            stale = [(self.namespace, key) for (key,) in rows if predicate(decode_key(key))]
+            db.executemany('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', stale)
+        except sqlite3.Error as exc:
+            self._failed('discard', exc)
+            return 0
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry of this namespace, keeping the counters."""
+        try:
+            self._connection().execute(
+                'DELETE FROM cache_entries WHERE namespace = ?',
+                (self.namespace,),
+            )
+        except sqlite3.Error as exc:
+            self._failed('clear', exc)
+
+    def _usage(self) -> tuple[int, int]:
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    'SELECT bytes, entries FROM cache_usage WHERE namespace = ?',
+                    (self.namespace,),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            self._failed('usage', exc)
+            return 0, 0
+        return row or (0, 0)
+
+    def stats(self) -> dict[str, Any]:
+        """Return shared size and bytes, plus this worker's hit/miss/eviction/error counters."""
+        used, entries = self._usage()
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'size': entries,
+            'bytes': used,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'errors': self.errors,
+        }
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .db import get_connection
+from .parser import ParsedSong, dump_parsed_song, load_parsed_song, parse_chordpro
+from .repositories.songs import list_songs_with_stale_ast, set_song_ast
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the stored layout or the parser's output for the same input changes.
+AST_FORMAT_VERSION = 1
+
+
+def parsed_song_from_row(row: Mapping[str, Any]) -> ParsedSong:
+    """Load the stored parse of a song row, re-parsing only when it is missing or stale."""
+    stored = row.get('chordpro_ast')
+    if stored is not None and row.get('chordpro_ast_version') == AST_FORMAT_VERSION:
+        return load_parsed_song(stored)
+    return parse_chordpro(row['chordpro_content'])
+
+
+async def backfill() -> int:
+    """Store the current-format parse of every song lacking one."""
+    done = 0
+    async for conn in get_connection():
+        for row in await list_songs_with_stale_ast(conn, AST_FORMAT_VERSION):
+            try:
+                ast = dump_parsed_song(parse_chordpro(row['chordpro_content']))
+            except Exception:
+                # Readers keep re-parsing (and reporting) songs that do not parse.
+                logger.exception('Parsing song %s failed', row['id'])
+                continue
+            await set_song_ast(conn, row['id'], ast, AST_FORMAT_VERSION)
+            await conn.commit()
+            done += 1
+        break
+    return done
+
+
+def main() -> None:
+    """Backfill stored song parses from the command line."""
+    argparse.ArgumentParser(description='Store parsed ChordPro of songs lacking it.').parse_args()
+    logging.basicConfig(level=logging.INFO)
+    count = asyncio.run(backfill())
+    logger.info('Stored parses of %d songs', count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from .settings import settings
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Awaitable, Callable
+
+    from .cache import CacheBackend
+
+    Evict = Callable[[uuid.UUID, datetime | None], object]
+    Flush = Callable[[], object]
+
+logger = logging.getLogger(__name__)
+
+# Channel the `songs_notify_change` trigger notifies; see its migration.
+CHANNEL = 'song_changes'
+# A quiet listener checks its connection this often, so a silently dropped one is noticed.
+KEEPALIVE_SECONDS = 30.0
+CONNECT_TIMEOUT_SECONDS = 5.0
+# Reconnect attempts back off from the first delay to the second.
+RECONNECT_SECONDS = (1.0, 30.0)
+
+
+class SongChangeBus:
+    """
+    Hand song changes to every cache registered with it.
+
+    `handle` applies one notification from the `songs` trigger; `flush` empties
+    every cache and is used whenever notifications may have been missed.
+    """
+
+    def __init__(self) -> None:
+        """Create a bus with no subscribers."""
+        self.connected = False
+        self.notifications = 0
+        self.flushes = 0
+        self.reconnects = 0
+        self._subscribers: list[tuple[Evict, Flush]] = []
+
+    def subscribe(self, evict: Evict, flush: Flush) -> None:
+        """Call `evict(song_id, updated_at)` per change and `flush()` after missed ones."""
+        self._subscribers.append((evict, flush))
+
+    def register_cache(self, cache: CacheBackend[Any, Any]) -> None:
+        """Keep a cache keyed by `(song id, updated_at, ...)` free of outdated song versions."""
+
+        def evict(song_id: uuid.UUID, updated_at: datetime | None) -> None:
+            # Entries already built from the new version stay; a deleted song has none.
+            cache.discard_where(lambda key: key[0] == song_id and key[1] != updated_at)
+
+        self.subscribe(evict, cache.clear)
+
+    def publish(self, song_id: uuid.UUID, updated_at: datetime | None) -> None:
+        """Evict one song, at `updated_at` or deleted when None, from every cache."""
+        for evict, _ in self._subscribers:
+            evict(song_id, updated_at)
+
+    def flush(self) -> None:
+        """Empty every cache."""
+        self.flushes += 1
+        for _, flush in self._subscribers:
+            flush()
+
+    def handle(self, payload: str) -> None:
+        """Apply a `{"id": ..., "updated_at": ...}` notification; flush on anything else."""
+        try:
+            change = json.loads(payload)
+            song_id = uuid.UUID(change['id'])
+            stamp = change['updated_at']
+            updated_at = None if stamp is None else datetime.fromisoformat(stamp)
+        except (TypeError, ValueError, KeyError):
+            logger.warning('Unreadable song change %r; flushing every cache', payload)
+            self.flush()
+            return
+        self.notifications += 1
+        self.publish(song_id, updated_at)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the listener state and counters."""
+        return {
+            'connected': self.connected,
+            'notifications': self.notifications,
+            'flushes': self.flushes,
+            'reconnects': self.reconnects,
+        }
+
+
+song_changes = SongChangeBus()
+
+
+async def _connect() -> asyncpg.Connection:
+    # A connection of its own: LISTEN must outlive any pooled checkout.
+    url = make_url(settings.database_url).set(drivername='postgresql')
+    return await asyncpg.connect(
+        url.render_as_string(hide_password=False),
+        timeout=CONNECT_TIMEOUT_SECONDS,
+    )
+
+
+class SongChangeListener:
+    """
+    Feed `CHANNEL` notifications to a bus over one LISTEN connection.
+
+    A lost connection is reopened with backoff. Changes made while nobody
+    listened were never delivered, so the bus is flushed once listening resumes.
+    """
+
+    def __init__(
+        self,
+        bus: SongChangeBus,
+        connect: Callable[[], Awaitable[asyncpg.Connection]] = _connect,
+    ) -> None:
+        """Prepare a listener; `start` opens its connection."""
+        self.bus = bus
+        self._connect = connect
+        self._missed = False
+
+    async def start(self) -> asyncio.Task[None]:
+        """Listen before returning, so no change slips by unseen, and keep listening in a task."""
+        try:
+            subscription = await self._subscribe()
+        except Exception:
+            logger.exception('Listening for song changes failed; retrying in the background')
+            self._missed = True
+            subscription = None
+        return asyncio.get_running_loop().create_task(self._run(subscription))
+
+    async def _subscribe(self) -> tuple[asyncpg.Connection, asyncio.Queue[str | None]]:
+        conn = await self._connect()
+        # None marks a closed connection.
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+        try:
+            conn.add_termination_listener(lambda _conn: queue.put_nowait(None))
+            await conn.add_listener(
+                CHANNEL,
+                lambda _conn, _pid, _channel, payload: queue.put_nowait(payload),
+            )
+        except BaseException:
+            conn.terminate()
+            raise
+        if self._missed:
+            self.bus.flush()
+            self._missed = False
+        self.bus.connected = True
+        return conn, queue
+
+    async def _drain(self, conn: asyncpg.Connection, queue: asyncio.Queue[str | None]) -> None:
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except TimeoutError:
+                await conn.fetchval('SELECT 1', timeout=KEEPALIVE_SECONDS)
+                continue
+            if payload is None:
+                raise ConnectionError('connection closed')
+            self.bus.handle(payload)
+
+    async def _run(
+        self,
+        subscription: tuple[asyncpg.Connection, asyncio.Queue[str | None]] | None,
+    ) -> None:
+        delay = RECONNECT_SECONDS[0]
+        while True:
+            if subscription is None:
+                await asyncio.sleep(delay)
+                try:
+                    subscription = await self._subscribe()
+                except Exception:
+                    logger.exception('Reconnecting the song change listener failed')
+                    delay = min(delay * 2, RECONNECT_SECONDS[1])
+                    continue
+                self.bus.reconnects += 1
+                delay = RECONNECT_SECONDS[0]
+            conn, queue = subscription
+            try:
+                await self._drain(conn, queue)
+            except Exception:
+                logger.exception('The song change listener lost its connection')
+            finally:
+                self.bus.connected = False
+                conn.terminate()
+            self._missed = True
+            subscription = None
+
+
+async def start_song_change_listener() -> asyncio.Task[None] | None:
+    """
+    Evict songs changed by any worker or the admin, when `listen_song_changes` is on.
+
+    Returns the listener task for the caller to cancel on shutdown.
+    """
+    if not settings.listen_song_changes:
+        return None
+    return await SongChangeListener(song_changes).start()
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 import re
+from typing import TYPE_CHECKING
 
-from pychord import Chord  # type: ignore[import-not-found]
+from .parser import LineBlock, ParsedSong, Section
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .cache import CacheBackend
+
+    ChordMemo = CacheBackend[tuple[str, int, bool], str]
 
 NOTE_TO_SEMITONE = {
     'C': 0,
@@ -71,45 +77,38 @@ def prefer_sharps_for_key(key: str | None) -> bool:
     return root not in MAJOR_FLAT_PREF
 
 
-def _respell_note(note: str, prefer_sharps: bool) -> str:
+# Enharmonic spellings of the black keys towards sharps, and back towards flats.
+_TO_SHARPS = {'Db': 'C#', 'Eb': 'D#', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#'}
+_TO_FLATS = {sharp: flat for flat, sharp in _TO_SHARPS.items()}
+
+
+def respell_note(note: str, prefer_sharps: bool) -> str:
     """Respell a single note name to sharps or flats."""
-    if prefer_sharps:
-        return {
-            'Db': 'C#',
-            'Eb': 'D#',
-            'Gb': 'F#',
-            'Ab': 'G#',
-            'Bb': 'A#',
-        }.get(note, note)
-    return {
-        'C#': 'Db',
-        'D#': 'Eb',
-        'F#': 'Gb',
-        'G#': 'Ab',
-        'A#': 'Bb',
-    }.get(note, note)
+    return (_TO_SHARPS if prefer_sharps else _TO_FLATS).get(note, note)
 
 
 _ROOT_RE = re.compile(r'^([A-G](?:#|b)?)(.*)$')
 
 
-def _respell_symbol_once(symbol: str, prefer_sharps: bool) -> str:
-    """Respell a single chord symbol without slash bass."""
-    m = _ROOT_RE.match(symbol)
-    if not m:
-        return symbol
-    root, tail = m.group(1), m.group(2)
-    return f'{_respell_note(root, prefer_sharps)}{tail}'
+# Roots accepted in chord symbols: every key name plus Cb, which chord charts also use.
+_CHORD_ROOT_TO_SEMITONE = {**NOTE_TO_SEMITONE, 'Cb': 11}
 
+# Spelling of each semitone, indexed 0-11, with sharps and with flats.
+_NOTE_NAMES = tuple(next(n for n, v in NOTE_TO_SEMITONE.items() if v == val) for val in range(12))
+_SHARP_NOTE_NAMES = tuple(respell_note(name, prefer_sharps=True) for name in _NOTE_NAMES)
+_FLAT_NOTE_NAMES = tuple(respell_note(name, prefer_sharps=False) for name in _NOTE_NAMES)
 
-def respell_chord_symbol(symbol: str, prefer_sharps: bool) -> str:
-    """Respell chord roots and bass to preferred accidentals."""
-    if '/' in symbol:
-        main, bass = symbol.split('/', 1)
-        main_r = _respell_symbol_once(main, prefer_sharps)
-        bass_r = _respell_symbol_once(bass, prefer_sharps)
-        return f'{main_r}/{bass_r}'
-    return _respell_symbol_once(symbol, prefer_sharps)
+
+def _transpose_chord_part(part: str, semitone_interval: int, names: tuple[str, ...]) -> str:
+    """Transpose the root of one slash-separated chord part, keeping its quality suffix."""
+    if len(part) > 1 and part[1] in '#b':
+        root, suffix = part[:2], part[2:]
+    else:
+        root, suffix = part[:1], part[1:]
+    value = _CHORD_ROOT_TO_SEMITONE.get(root)
+    if value is None:
+        raise ValueError(f'Invalid note {root!r} in chord {part!r}')
+    return names[(value + semitone_interval) % 12] + suffix
 
 
 def transpose_chord_symbol(
@@ -117,15 +116,64 @@ def transpose_chord_symbol(
     semitone_interval: int,
     prefer_sharps: bool | None = None,
 ) -> str:
-    """Transpose a chord symbol by a semitone interval."""
-    pref = True if prefer_sharps is None else prefer_sharps
+    """
+    Transpose a chord symbol by a semitone interval.
+
+    A symbol is a root (letter and optional accidental), a quality suffix kept
+    verbatim, and optional `/bass` parts transposed the same way.
+    """
+    names = _FLAT_NOTE_NAMES if prefer_sharps is False else _SHARP_NOTE_NAMES
     if '/' in symbol:
-        main, bass = symbol.split('/', 1)
-        main_t = Chord(main)
-        bass_t = Chord(bass)
-        main_t.transpose(semitone_interval)
-        bass_t.transpose(semitone_interval)
-        return respell_chord_symbol(f'{main_t}/{bass_t}', pref)
-    chord = Chord(symbol)
-    chord.transpose(semitone_interval)
-    return respell_chord_symbol(str(chord), pref)
+        return '/'.join(
+            _transpose_chord_part(part, semitone_interval, names) for part in symbol.split('/')
+        )
+    return _transpose_chord_part(symbol, semitone_interval, names)
+
+
+def _memo_transpose(
+    symbol: str,
+    semitone_interval: int,
+    prefer_sharps: bool,
+    memo: ChordMemo | None,
+) -> str:
+    """Transpose a chord symbol, through `memo` when one is given."""
+    if memo is None:
+        return transpose_chord_symbol(symbol, semitone_interval, prefer_sharps)
+    key = (symbol, semitone_interval, prefer_sharps)
+    transposed = memo.get(key)
+    if transposed is None:
+        transposed = transpose_chord_symbol(symbol, semitone_interval, prefer_sharps)
+        memo.set(key, transposed)
+    return transposed
+
+
+def transpose_parsed_song(
+    parsed: ParsedSong,
+    semitones: int,
+    prefer_sharps: bool,
+    memo: ChordMemo | None = None,
+) -> ParsedSong:
+    """
+    Return a transposed copy of a song, leaving a shared cached parse untouched.
+
+    Each distinct chord symbol is transposed once and every line is remapped
+    through the resulting table. `memo`, e.g. `cache.transposed_chords`, keeps
+    transposed symbols across songs.
+    """
+    table: dict[str | None, str | None] = {None: None, '': None}
+    for section in parsed.sections:
+        for line in section.lines:
+            for chord in line.chords:
+                if chord not in table:
+                    table[chord] = _memo_transpose(chord, semitones, prefer_sharps, memo)
+    sections = [
+        Section(
+            section.name,
+            [
+                LineBlock([table[c] for c in line.chords], line.chord_positions, line.lyrics)
+                for line in section.lines
+            ],
+        )
+        for section in parsed.sections
+    ]
+    return ParsedSong(sections, parsed.warnings)
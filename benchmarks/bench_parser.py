@@ -0,0 +1,38 @@
+"""
+Compare the single-pass ChordPro lexer with the former regex-per-line parser.
+
+Run with `python -m benchmarks.bench_parser`.
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from app.parser import parse_chordpro
+from benchmarks.corpus import SongShape, build_corpus, build_song
+from benchmarks.reference import legacy_parse_chordpro
+
+# A very long chart on top of the standard corpus, to show throughput at scale.
+HUGE = SongShape(sections=40, lines_per_section=50, words_per_line=8, chord_density=0.4)
+
+
+def _lines_per_second(parse, content: str, number: int) -> float:
+    best = min(timeit.repeat(lambda: parse(content), number=number, repeat=5))
+    return content.count('\n') * number / best
+
+
+def main() -> None:
+    """Print parser throughput on large synthetic songs, before and after."""
+    songs = {**build_corpus(), 'huge': build_song(HUGE)}
+    for name, content in songs.items():
+        assert parse_chordpro(content) == legacy_parse_chordpro(content)  # noqa: S101
+        legacy = _lines_per_second(legacy_parse_chordpro, content, number=20)
+        lexer = _lines_per_second(parse_chordpro, content, number=20)
+        print(  # noqa: T201
+            f'{name:<14} {len(content):>7} chars  legacy {legacy:>10,.0f} lines/s  '
+            f'lexer {lexer:>10,.0f} lines/s  speedup {lexer / legacy:.2f}x',
+        )
+
+
+if __name__ == '__main__':
+    main()
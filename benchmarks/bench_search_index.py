@@ -0,0 +1,89 @@
+"""
+Measure search-as-you-type latency of the in-memory search index.
+
+Loads a synthetic catalog and runs every keystroke prefix of a few queries,
+then prints load time and latency percentiles. Exits non-zero when p99 is
+over `--max-p99-ms`.
+
+    python -m benchmarks.bench_search_index --songs 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from app.parser import plain_lyrics
+from app.search_index import SearchIndex
+from benchmarks.corpus import CYRILLIC_WORDS, LATIN_WORDS, SHAPES, build_song
+
+QUERIES = ['amazing grace', 'сонце світить', 'artist 42', 'amazng grac', 'wretch sound', 'тату мій']
+REPEATS = 20
+
+
+def build_rows(count: int) -> list[dict[str, object]]:
+    """Build `count` song rows shaped like `list_search_documents` results."""
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    rows: list[dict[str, object]] = []
+    for index in range(count):
+        words = LATIN_WORDS if index % 2 else CYRILLIC_WORDS
+        shape = SHAPES['cyrillic' if index % 2 == 0 else 'short']
+        created_at = start + timedelta(minutes=index)
+        rows.append(
+            {
+                'id': uuid.UUID(int=index),
+                'translated_title': (
+                    f'{words[index % len(words)]} {words[index // 7 % len(words)]} {index}'
+                ),
+                'original_title': None,
+                'artist': f'Artist {index % 500}',
+                'default_key': 'C',
+                'is_draft': index % 50 == 0,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'lyrics_plain': plain_lyrics(build_song(shape, seed=index)),
+            },
+        )
+    return rows
+
+
+def measure(index: SearchIndex, limit: int) -> list[float]:
+    """Return sorted per-search times in milliseconds over every keystroke of QUERIES."""
+    timings: list[float] = []
+    for _ in range(REPEATS):
+        for query in QUERIES:
+            for end in range(1, len(query) + 1):
+                started = time.perf_counter()
+                index.search(query[:end], limit)
+                timings.append((time.perf_counter() - started) * 1e3)
+    return sorted(timings)
+
+
+def main() -> int:
+    """Run the latency check from the command line."""
+    parser = argparse.ArgumentParser(description='Time in-memory search on a synthetic catalog.')
+    parser.add_argument('--songs', type=int, default=20_000, help='songs to index (default: 20000)')
+    parser.add_argument('--limit', type=int, default=200, help='results per search (default: 200)')
+    parser.add_argument('--max-p99-ms', type=float, default=1.0, help='p99 budget (default: 1.0)')
+    args = parser.parse_args()
+
+    rows = build_rows(args.songs)
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.load(rows)
+    loaded = time.perf_counter() - started
+    timings = measure(index, args.limit)
+    p50 = timings[len(timings) // 2]
+    p99 = timings[int(len(timings) * 0.99)]
+    print(  # noqa: T201
+        f'{args.songs} songs loaded in {loaded:.2f} s; {len(timings)} searches  '
+        f'p50 {p50:.3f} ms  p99 {p99:.3f} ms  max {timings[-1]:.3f} ms',
+    )
+    return 0 if p99 <= args.max_p99_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Compare the native chord transposer with the former pychord-based one.
+
+Run with `python -m benchmarks.bench_transposer`.
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from app.transposer import transpose_chord_symbol
+from benchmarks.reference import legacy_transpose_chord_symbol
+
+# A chord-dense chart: common triads, sevenths and slash chords.
+CHORDS = [
+    'C', 'G/B', 'Am', 'F', 'Dm7', 'G7', 'Em', 'Fmaj7', 'C/E', 'Bb', 'Gsus4', 'E7',
+    'F#m7b5', 'Ebmaj7', 'Ab', 'D/F#', 'Bm', 'A7sus4', 'Cadd9', 'Gm7',
+] * 10  # fmt: skip
+
+
+def _per_chord_us(func, number: int) -> float:
+    def run() -> None:
+        for symbol in CHORDS:
+            func(symbol, 3, False)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / number / len(CHORDS) * 1e6
+
+
+def main() -> None:
+    """Print per-chord timings of both transposers and the speedup."""
+    legacy = _per_chord_us(legacy_transpose_chord_symbol, number=20)
+    native = _per_chord_us(transpose_chord_symbol, number=200)
+    print(f'pychord: {legacy:8.2f} us/chord')  # noqa: T201
+    print(f'native:  {native:8.2f} us/chord')  # noqa: T201
+    print(f'speedup: {legacy / native:8.1f}x')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Deterministic synthetic ChordPro corpus for benchmarks."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+CHORDS = ['C', 'G/B', 'Am', 'F', 'Dm7', 'G7', 'Em', 'Fmaj7', 'Bb', 'Gsus4', 'C#m7b5', 'Ab/Eb']
+LATIN_WORDS = ['Amazing', 'grace', 'how', 'sweet', 'the', 'sound', 'that', 'saved', 'a', 'wretch']
+CYRILLIC_WORDS = ['Сонце', 'світить', 'над', 'нами', 'Тату', 'мій', 'подих', 'серця', 'світло', '—']
+
+
+@dataclass(frozen=True, slots=True)
+class SongShape:
+    """Describe the size and texture of one synthetic song."""
+
+    sections: int
+    lines_per_section: int
+    words_per_line: int
+    chord_density: float
+    cyrillic: bool = False
+
+
+SHAPES: dict[str, SongShape] = {
+    'short': SongShape(sections=2, lines_per_section=4, words_per_line=6, chord_density=0.25),
+    'long': SongShape(sections=8, lines_per_section=12, words_per_line=8, chord_density=0.25),
+    'chord_dense': SongShape(sections=4, lines_per_section=8, words_per_line=10, chord_density=1.0),
+    'many_sections': SongShape(
+        sections=40,
+        lines_per_section=3,
+        words_per_line=6,
+        chord_density=0.3,
+    ),
+    'cyrillic': SongShape(
+        sections=6,
+        lines_per_section=8,
+        words_per_line=7,
+        chord_density=0.3,
+        cyrillic=True,
+    ),
+}
+
+
+def _build_line(rng: random.Random, shape: SongShape, words: list[str]) -> str:
+    return ' '.join(
+        f'[{rng.choice(CHORDS)}]{word}' if rng.random() < shape.chord_density else word
+        for word in rng.choices(words, k=shape.words_per_line)
+    )
+
+
+def build_song(shape: SongShape, seed: int = 0) -> str:
+    """Build ChordPro content for a shape; the same seed always yields the same text."""
+    rng = random.Random(seed)  # noqa: S311
+    words = CYRILLIC_WORDS if shape.cyrillic else LATIN_WORDS
+    out: list[str] = []
+    for number in range(shape.sections):
+        out.append(f'{{start_of_section: Section {number + 1}}}')
+        out.extend(_build_line(rng, shape, words) for _ in range(shape.lines_per_section))
+        out.append('')
+        out.append('{end_of_section}')
+    return '\n'.join(out)
+
+
+def build_corpus(seed: int = 0) -> dict[str, str]:
+    """Build one song per shape, keyed by shape name."""
+    return {name: build_song(shape, seed) for name, shape in SHAPES.items()}
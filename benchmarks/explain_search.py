@@ -0,0 +1,92 @@
+"""
+Check that full-text search is served by indexes on a large catalog.
+
+Seeds synthetic songs into the migrated database at DATABASE_URL inside a
+transaction, runs EXPLAIN ANALYZE on the search query and rolls everything
+back. Exits non-zero when the plan falls back to a sequential scan of songs.
+Also prints how many bytes the full-row and the summary search move.
+
+    python -m benchmarks.explain_search --songs 50000 --query "amazing grace"
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, insert, select, text
+
+from app.db import engine, songs
+from app.db_capabilities import db_capabilities
+from app.repositories.songs import SUMMARY_COLUMNS, fulltext_search_stmt
+from benchmarks.corpus import CYRILLIC_WORDS, LATIN_WORDS, SHAPES, build_song
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy import Select
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+BATCH = 1000
+
+
+def _song_values(index: int) -> dict[str, object]:
+    words = LATIN_WORDS if index % 2 else CYRILLIC_WORDS
+    shape = SHAPES['cyrillic' if index % 2 == 0 else 'short']
+    return {
+        'translated_title': f'{words[index % len(words)]} {words[index // 7 % len(words)]} {index}',
+        'artist': f'Artist {index % 500}',
+        'chordpro_content': build_song(shape, seed=index),
+        'default_key': 'C',
+    }
+
+
+async def _result_bytes(conn: AsyncConnection, stmt: Select) -> int:
+    """Sum the on-the-wire size estimate (`pg_column_size`) of every result row."""
+    rows = stmt.subquery('r')
+    res = await conn.execute(
+        select(func.coalesce(func.sum(func.pg_column_size(rows.table_valued())), 0)),
+    )
+    return int(res.scalar_one())
+
+
+async def explain(count: int, query: str) -> bool:
+    """Seed `count` songs, print the search plan and return whether it avoids a seq scan."""
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            for start in range(0, count, BATCH):
+                values = [_song_values(i) for i in range(start, min(start + BATCH, count))]
+                await conn.execute(insert(songs), values)
+            await conn.execute(text('ANALYZE songs'))
+            has_trgm = (await db_capabilities.detect(conn)).pg_trgm
+            stmt = fulltext_search_stmt(query, 50, include_drafts=False, has_trgm=has_trgm)
+            sql = stmt.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True})
+            res = await conn.execute(text(f'EXPLAIN (ANALYZE, BUFFERS) {sql}'))
+            plan = '\n'.join(row[0] for row in res)
+            summary = fulltext_search_stmt(
+                query,
+                50,
+                include_drafts=False,
+                has_trgm=has_trgm,
+                columns=[songs.c[name] for name in SUMMARY_COLUMNS],
+            )
+            sizes = [await _result_bytes(conn, s) for s in (stmt, summary)]
+        finally:
+            await trans.rollback()
+    print(plan)  # noqa: T201
+    print(f'result bytes: full rows {sizes[0]}, summary columns {sizes[1]}')  # noqa: T201
+    return 'Seq Scan on songs' not in plan
+
+
+def main() -> int:
+    """Run the plan check from the command line."""
+    parser = argparse.ArgumentParser(description='EXPLAIN full-text search on a seeded catalog.')
+    parser.add_argument('--songs', type=int, default=50_000, help='songs to seed (default: 50000)')
+    parser.add_argument('--query', default='amazing grace', help='search query to explain')
+    args = parser.parse_args()
+    return 0 if asyncio.run(explain(args.songs, args.query)) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
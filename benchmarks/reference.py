@@ -0,0 +1,223 @@
+"""
+Frozen pre-optimization implementations, kept as benchmark baselines and test oracles.
+
+Do not optimize these: they define the behaviour the fast paths must reproduce.
+"""
+
+from __future__ import annotations
+
+import re
+from html import escape
+
+from pychord import Chord  # type: ignore[import-not-found]
+
+from app.parser import (
+    CHORD_PATTERN,
+    SECTION_END_PATTERN,
+    SECTION_START_EMPTY_PATTERN,
+    SECTION_START_PATTERN,
+    LineBlock,
+    ParsedSong,
+    ParseError,
+    Section,
+)
+from app.renderer import WRAP_WIDTH
+from app.transposer import respell_note
+
+
+def legacy_tokenize_line(line: str) -> tuple[list[str | None], list[int], str]:
+    """Tokenize a single line into chords, positions, lyrics."""
+    chords: list[str | None] = []
+    positions: list[int] = []
+    lyrics_parts: list[str] = []
+    last_index = 0
+    removed_total = 0
+    for m in CHORD_PATTERN.finditer(line):
+        start, end = m.span()
+        lyrics_parts.append(line[last_index:start])
+        chord_text = m.group(1).strip()
+        chords.append(chord_text)
+        positions.append(start - removed_total)
+        removed_total += end - start
+        last_index = end
+    lyrics_parts.append(line[last_index:])
+    lyrics = ''.join(lyrics_parts)
+    if not chords and not lyrics:
+        return [], [], ''
+    if not chords:
+        return [], [], lyrics
+    return chords, positions, lyrics
+
+
+def legacy_parse_chordpro(content: str) -> ParsedSong:  # noqa: PLR0912
+    """Parse ChordPro content the way `parse_chordpro` did before its single-pass lexer."""
+    sections: list[Section] = []
+    current_section: Section | None = None
+    current_is_implicit = False
+    warnings: list[str] = []
+    for raw_line in content.splitlines():
+        line = raw_line.rstrip('\n')
+        if not line.strip():
+            if current_section is not None:
+                current_section.lines.append(LineBlock([], [], ''))
+            continue
+        start_named = SECTION_START_PATTERN.fullmatch(line.strip())
+        start_empty = SECTION_START_EMPTY_PATTERN.fullmatch(line.strip())
+        end_match = SECTION_END_PATTERN.fullmatch(line.strip())
+        if start_named or start_empty:
+            if current_section is not None and not current_is_implicit:
+                raise ParseError('Nested sections are not supported')
+            if current_section is not None and current_is_implicit:
+                sections.append(current_section)
+            section_name = start_named.group(1).strip() if start_named else ''
+            current_section = Section(section_name, [])
+            current_is_implicit = False
+            continue
+        if end_match:
+            if current_section is None or current_is_implicit:
+                raise ParseError('Unmatched section end')
+            sections.append(current_section)
+            current_section = None
+            current_is_implicit = False
+            continue
+        stripped = line.strip()
+        if (
+            stripped.startswith('{')
+            and stripped.endswith('}')
+            and not (start_named or start_empty or end_match)
+        ):
+            continue
+        no_chords = CHORD_PATTERN.sub('', line)
+        if '[' in no_chords or ']' in no_chords:
+            raise ParseError('Invalid chord syntax')
+        chords, positions, lyrics = legacy_tokenize_line(line)
+        line_block = LineBlock(chords, positions, lyrics)
+        if current_section is None:
+            current_section = Section('section', [])
+            current_is_implicit = True
+        current_section.lines.append(line_block)
+    if current_section is not None:
+        if current_is_implicit:
+            sections.append(current_section)
+        else:
+            raise ParseError('Unclosed section detected')
+    return ParsedSong(sections, warnings)
+
+
+def legacy_build_chord_line(line: LineBlock, show_chords: bool) -> str:
+    """Build a chord line preserving positions and avoiding overlaps with spacing."""
+    if not show_chords:
+        return ''
+    raw_tokens: list[tuple[int, str]] = []
+    for idx, ch in enumerate(line.chords):
+        token = ch or ''
+        if not token:
+            continue
+        position = line.chord_positions[idx]
+        raw_tokens.append((position, token))
+    if not raw_tokens:
+        return ''
+    raw_tokens.sort(key=lambda t: t[0])
+    placed: list[tuple[int, str]] = []
+    last_end = -2
+    for desired_start, token in raw_tokens:
+        min_start = last_end + 2
+        start = max(desired_start, min_start)
+        placed.append((start, token))
+        last_end = start + len(token) - 1
+    max_len = max(start + len(tok) for start, tok in placed)
+    chars: list[str] = [' '] * max_len
+    for start, token in placed:
+        for offset, character in enumerate(token):
+            target_index = start + offset
+            if target_index >= len(chars):
+                chars.extend([' '] * (target_index + 1 - len(chars)))
+            chars[target_index] = character
+    return ''.join(chars)
+
+
+def legacy_wrap_line_blocks(line: LineBlock, width: int) -> list[LineBlock]:
+    """Split a line into width-bound blocks while keeping chord indices."""
+    if width <= 0 or len(line.lyrics) <= width:
+        return [line]
+    result: list[LineBlock] = []
+    start = 0
+    lyrics = line.lyrics
+    while start < len(lyrics):
+        hard_end = min(start + width, len(lyrics))
+        end = hard_end
+        if end < len(lyrics):
+            for i in range(end, start, -1):
+                ch = lyrics[i - 1]
+                if ch.isspace() or ch == '-':
+                    end = i
+                    break
+        if end <= start:
+            end = hard_end
+        sub_lyrics = lyrics[start:end].rstrip()
+        next_start = end
+        while next_start < len(lyrics) and lyrics[next_start].isspace():
+            next_start += 1
+        sub_chords: list[str | None] = []
+        sub_positions: list[int] = []
+        for token, pos in zip(line.chords, line.chord_positions, strict=False):
+            if start <= pos < next_start:
+                sub_chords.append(token)
+                sub_positions.append(pos - start)
+        result.append(LineBlock(sub_chords, sub_positions, sub_lyrics))
+        start = next_start
+    return result
+
+
+def legacy_render_parsed_song(parsed: ParsedSong, show_chords: bool) -> str:
+    """Render a parsed song into HTML with monospace alignment."""
+    parts: list[str] = []
+    for section in parsed.sections:
+        parts.append('<section class="song-section">')
+        if section.name:
+            parts.append(f'<h3 class="section-header">{escape(section.name)}</h3>')
+        for line in section.lines:
+            for sub in legacy_wrap_line_blocks(line, WRAP_WIDTH):
+                chord_line = legacy_build_chord_line(sub, show_chords)
+                lyric_line = escape(sub.lyrics)
+                if chord_line:
+                    parts.append('<pre class="chords">' + escape(chord_line) + '</pre>')
+                parts.append('<pre class="lyrics">' + lyric_line + '</pre>')
+        parts.append('</section>')
+    return ''.join(parts)
+
+
+_ROOT_RE = re.compile(r'^([A-G](?:#|b)?)(.*)$')
+
+
+def _respell_symbol_once(symbol: str, prefer_sharps: bool) -> str:
+    """Respell a single chord symbol without slash bass."""
+    m = _ROOT_RE.match(symbol)
+    if not m:
+        return symbol
+    root, tail = m.group(1), m.group(2)
+    return f'{respell_note(root, prefer_sharps)}{tail}'
+
+
+def respell_chord_symbol(symbol: str, prefer_sharps: bool) -> str:
+    """Respell chord roots and bass to preferred accidentals."""
+    if '/' in symbol:
+        main, bass = symbol.split('/', 1)
+        main_r = _respell_symbol_once(main, prefer_sharps)
+        bass_r = _respell_symbol_once(bass, prefer_sharps)
+        return f'{main_r}/{bass_r}'
+    return _respell_symbol_once(symbol, prefer_sharps)
+
+
+def legacy_transpose_chord_symbol(symbol: str, semitone_interval: int, prefer_sharps: bool) -> str:
+    """Transpose a chord symbol through pychord, as before the native transposer."""
+    if '/' in symbol:
+        main, bass = symbol.split('/', 1)
+        main_t = Chord(main)
+        bass_t = Chord(bass)
+        main_t.transpose(semitone_interval)
+        bass_t.transpose(semitone_interval)
+        return respell_chord_symbol(f'{main_t}/{bass_t}', prefer_sharps)
+    chord = Chord(symbol)
+    chord.transpose(semitone_interval)
+    return respell_chord_symbol(str(chord), prefer_sharps)
@@ -0,0 +1,154 @@
+"""
+Time the parser, transposer, renderer and per-song setlist pipeline.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json --max-regression 15
+
+With `--compare` the run exits non-zero when any case is slower than the
+baseline by more than `--max-regression` percent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from app.cache import transposed_chords
+from app.parser import parse_chordpro
+from app.renderer import render_parsed_song, render_song_body
+from app.song_ast import AST_FORMAT_VERSION, dump_parsed_song, parsed_song_from_row
+from app.transposer import transpose_chord_symbol
+from benchmarks.corpus import build_corpus
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable
+
+# Each timed repeat runs for at least this long, so timer resolution stays negligible.
+MIN_REPEAT_SECONDS = 0.05
+REPEATS = 5
+
+
+def time_call(func: Callable[[], object]) -> dict[str, float]:
+    """Return the best per-call time of `func` in microseconds."""
+    number = 1
+    while timeit.timeit(func, number=number) < MIN_REPEAT_SECONDS:
+        number *= 2
+    best = min(timeit.repeat(func, number=number, repeat=REPEATS))
+    return {'us_per_call': best / number * 1e6, 'calls': number}
+
+
+def build_cases(seed: int = 0) -> dict[str, Callable[[], object]]:
+    """Build every benchmark case as a zero-argument callable, keyed by name."""
+    cases: dict[str, Callable[[], object]] = {}
+    for name, content in build_corpus(seed).items():
+        parsed = parse_chordpro(content)
+        row = {
+            'chordpro_content': content,
+            'chordpro_ast': dump_parsed_song(parsed),
+            'chordpro_ast_version': AST_FORMAT_VERSION,
+        }
+        cases[f'parse_chordpro/{name}'] = lambda content=content: parse_chordpro(content)
+        cases[f'render_parsed_song/{name}'] = lambda parsed=parsed: render_parsed_song(
+            parsed,
+            show_chords=True,
+        )
+        cases[f'render_parsed_song_fluid/{name}'] = lambda parsed=parsed: render_parsed_song(
+            parsed,
+            show_chords=True,
+            layout='fluid',
+        )
+        # What render_setlist does for a song missing from every cache.
+        cases[f'song_pipeline/{name}'] = lambda row=row: render_song_body(
+            parsed_song_from_row(row),
+            'C',
+            'Eb',
+            show_chords=True,
+            chord_memo=transposed_chords,
+        )
+    chords = [
+        chord
+        for section in parse_chordpro(build_corpus(seed)['chord_dense']).sections
+        for line in section.lines
+        for chord in line.chords
+        if chord
+    ]
+    cases['transpose_chord_symbol/chord_dense'] = lambda: [
+        transpose_chord_symbol(chord, 3, prefer_sharps=False) for chord in chords
+    ]
+    return cases
+
+
+def run(seed: int = 0, only: str | None = None) -> dict[str, Any]:
+    """Run the suite and return JSON-ready results."""
+    results = {
+        name: time_call(case)
+        for name, case in build_cases(seed).items()
+        if only is None or only in name
+    }
+    return {
+        'meta': {'python': platform.python_version(), 'machine': platform.machine(), 'seed': seed},
+        'results': results,
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    max_regression: float,
+) -> list[str]:
+    """List cases slower than the baseline by more than `max_regression` percent."""
+    regressions: list[str] = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        change = (result['us_per_call'] / base['us_per_call'] - 1) * 100
+        if change > max_regression:
+            regressions.append(f'{name}: {change:+.1f}%')
+    return regressions
+
+
+def _print_results(current: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    for name, result in current['results'].items():
+        line = f'{name:<40} {result["us_per_call"]:>12.2f} us'
+        base = baseline['results'].get(name) if baseline else None
+        if base is not None:
+            line += f'  {(result["us_per_call"] / base["us_per_call"] - 1) * 100:+7.1f}%'
+        print(line)  # noqa: T201
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run benchmarks from the command line and return the exit status."""
+    parser = argparse.ArgumentParser(description='Run parser/transposer/renderer benchmarks.')
+    parser.add_argument('--output', type=Path, help='write results as JSON to this file')
+    parser.add_argument('--compare', type=Path, help='baseline JSON to compare against')
+    parser.add_argument(
+        '--max-regression',
+        type=float,
+        default=20.0,
+        help='allowed slowdown per case in percent (default: 20)',
+    )
+    parser.add_argument('--only', help='run only cases whose name contains this text')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed (default: 0)')
+    args = parser.parse_args(argv)
+
+    current = run(seed=args.seed, only=args.only)
+    baseline = json.loads(args.compare.read_text(encoding='utf-8')) if args.compare else None
+    _print_results(current, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + '\n', encoding='utf-8')
+    if baseline is None:
+        return 0
+    regressions = compare_results(baseline, current, args.max_regression)
+    for regression in regressions:
+        print(f'REGRESSION {regression}', file=sys.stderr)  # noqa: T201
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+// Browser mirror of app/transposer.py and app/renderer.py, so a key change re-renders one song
+// without a page load. tests/transposer_vectors.json holds cases both implementations must pass.
+(function(root){
+  'use strict';
+
+  const NOTE_TO_SEMITONE = new Map([
+    ['C', 0], ['C#', 1], ['Db', 1], ['D', 2], ['D#', 3], ['Eb', 3], ['E', 4], ['F', 5],
+    ['F#', 6], ['Gb', 6], ['G', 7], ['G#', 8], ['Ab', 8], ['A', 9], ['A#', 10], ['Bb', 10], ['B', 11],
+  ]);
+  const CHORD_ROOT_TO_SEMITONE = new Map([...NOTE_TO_SEMITONE, ['Cb', 11]]);
+  const SHARP_NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B'];
+  const FLAT_NOTE_NAMES = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B'];
+  const MAJOR_SHARP_PREF = new Set(['G', 'D', 'A', 'E', 'B', 'F#']);
+  const MAJOR_FLAT_PREF = new Set(['C', 'F', 'Bb', 'Eb', 'Ab', 'Db']);
+  const MINOR_SHARP_PREF = new Set(['Am', 'Em', 'Bm', 'F#m', 'C#m', 'G#m', 'D#m']);
+  const MINOR_FLAT_PREF = new Set(['Dm', 'Gm', 'Cm', 'Fm', 'Bbm']);
+  const ROOT_RE = /^([A-G](?:#|b)?)(.*)$/;
+  const WRAP_WIDTH = 40;  // used by the 'wrapped' layout only
+  // Python's str.isspace(); JavaScript's \s differs in a few code points.
+  const PY_SPACE = /^[\t-\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]$/;
+
+  const mod12 = n => ((n % 12) + 12) % 12;
+  const isSpace = ch => PY_SPACE.test(ch);
+  const isBreak = ch => isSpace(ch) || ch === '-';
+  // Positions and widths count code points, as Python does.
+  const chars = s => Array.from(s);
+
+  function rstrip(s){
+    const cs = chars(s);
+    let end = cs.length;
+    while(end > 0 && isSpace(cs[end - 1])) end--;
+    return cs.slice(0, end).join('');
+  }
+
+  function escapeHtml(s){
+    return s.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;')
+      .replace(/"/g, '&quot;').replace(/'/g, '&#x27;');
+  }
+
+  function computeSemitoneInterval(fromKey, toKey){
+    if(!fromKey || !toKey) return 0;
+    const a = NOTE_TO_SEMITONE.get(fromKey.replace(/m+$/, ''));
+    const b = NOTE_TO_SEMITONE.get(toKey.replace(/m+$/, ''));
+    if(a === undefined || b === undefined) return 0;
+    return mod12(b - a);
+  }
+
+  function preferSharpsForKey(key){
+    if(!key) return true;
+    const m = key.trim().replace(/ /g, '').match(ROOT_RE);
+    if(!m) return true;
+    const root = m[1];
+    if(m[2].toLowerCase() === 'm'){
+      const normalized = `${root}m`;
+      if(MINOR_SHARP_PREF.has(normalized)) return true;
+      return !MINOR_FLAT_PREF.has(normalized);
+    }
+    if(MAJOR_SHARP_PREF.has(root)) return true;
+    return !MAJOR_FLAT_PREF.has(root);
+  }
+
+  function transposeChordPart(part, interval, names){
+    const cs = chars(part);
+    const split = cs.length > 1 && (cs[1] === '#' || cs[1] === 'b') ? 2 : 1;
+    const root = cs.slice(0, split).join('');
+    const value = CHORD_ROOT_TO_SEMITONE.get(root);
+    if(value === undefined) throw new Error(`Invalid note ${root} in chord ${part}`);
+    return names[mod12(value + interval)] + cs.slice(split).join('');
+  }
+
+  function transposeChordSymbol(symbol, interval, preferSharps){
+    const names = preferSharps === false ? FLAT_NOTE_NAMES : SHARP_NOTE_NAMES;
+    return symbol.split('/').map(part => transposeChordPart(part, interval, names)).join('/');
+  }
+
+  // Sections use the `/api/songs/{id}` layout: [name, [[chords, positions, lyrics], ...]].
+  function transposeSections(sections, semitones, preferSharps){
+    const table = new Map();
+    const map = chord => {
+      if(chord === null || chord === '') return null;
+      if(!table.has(chord)) table.set(chord, transposeChordSymbol(chord, semitones, preferSharps));
+      return table.get(chord);
+    };
+    return sections.map(([name, lines]) => [
+      name,
+      lines.map(([chords, positions, lyrics]) => [chords.map(map), positions, lyrics]),
+    ]);
+  }
+
+  function buildChordLine(line, showChords){
+    if(!showChords) return '';
+    const [chords, positions] = line;
+    const tokens = [];
+    for(let i = 0; i < Math.min(chords.length, positions.length); i++){
+      if(chords[i]) tokens.push([positions[i], chords[i]]);
+    }
+    if(!tokens.length) return '';
+    tokens.sort((x, y) => x[0] - y[0]);
+    const parts = [];
+    let column = 0;
+    for(const [desired, token] of tokens){
+      const start = Math.max(desired, parts.length ? column + 1 : 0);
+      parts.push(' '.repeat(start - column), token);
+      column = start + chars(token).length;
+    }
+    return parts.join('');
+  }
+
+  function wrapLineBlocks(line, width){
+    const [chords, positions, lyrics] = line;
+    const cs = chars(lyrics);
+    const length = cs.length;
+    if(width <= 0 || length <= width) return [line];
+    const lastBreak = new Array(length + 1).fill(0);
+    for(let i = 1; i <= length; i++){
+      lastBreak[i] = isBreak(cs[i - 1]) ? i : lastBreak[i - 1];
+    }
+    const starts = [];
+    const ends = [];
+    let start = 0;
+    while(start < length){
+      let end = Math.min(start + width, length);
+      if(end < length && lastBreak[end] > start) end = lastBreak[end];
+      starts.push(start);
+      ends.push(end);
+      start = end;
+      while(start < length && isSpace(cs[start])) start++;
+    }
+    const blocks = starts.map((s, i) => [[], [], rstrip(cs.slice(s, ends[i]).join(''))]);
+    for(let i = 0; i < Math.min(chords.length, positions.length); i++){
+      const pos = positions[i];
+      if(pos < 0 || pos >= length) continue;
+      let index = starts.length - 1;
+      while(starts[index] > pos) index--;
+      blocks[index][0].push(chords[i]);
+      blocks[index][1].push(pos - starts[index]);
+    }
+    return blocks;
+  }
+
+  // Whitespace runs, and words split after hyphens: where a fluid line may wrap.
+  function splitPieces(cs){
+    const pieces = [];
+    let start = 0;
+    while(start < cs.length){
+      let end = start + 1;
+      if(isSpace(cs[start])){
+        while(end < cs.length && isSpace(cs[end])) end++;
+      } else if(cs[start] !== '-'){
+        while(end < cs.length && !isBreak(cs[end])) end++;
+        if(end < cs.length && cs[end] === '-') end++;
+      }
+      pieces.push([start, end]);
+      start = end;
+    }
+    return pieces;
+  }
+
+  function renderSegment(token, position, lyrics){
+    return `<span class="seg" data-at="${position}">` +
+      `<span class="chord">${escapeHtml(token)}</span>${escapeHtml(lyrics)}</span>`;
+  }
+
+  // Same markup as `render_fluid_line`.
+  function renderFluidLine(line, showChords){
+    const [chords, positions, lyrics] = line;
+    const cs = chars(lyrics);
+    const text = (a, b) => cs.slice(a, b).join('');
+    const anchors = [];
+    if(showChords){
+      for(let i = 0; i < Math.min(chords.length, positions.length); i++){
+        if(chords[i]) anchors.push([positions[i], chords[i]]);
+      }
+      anchors.sort((x, y) => x[0] - y[0]);
+    }
+    const parts = ['<p class="line">'];
+    let next = 0;
+    for(const [start, end] of splitPieces(cs)){
+      const first = next;
+      while(next < anchors.length && anchors[next][0] < end) next++;
+      const inside = anchors.slice(first, next);
+      if(!inside.length){
+        parts.push(escapeHtml(text(start, end)));
+        continue;
+      }
+      const cuts = [...inside.map(([position]) => Math.max(position, start)), end];
+      const piece = [escapeHtml(text(start, cuts[0]))];
+      inside.forEach(([position, token], i) => {
+        piece.push(renderSegment(token, position, text(cuts[i], cuts[i + 1])));
+      });
+      if(isSpace(cs[start])) parts.push(...piece);
+      else parts.push(`<span class="word">${piece.join('')}</span>`);
+    }
+    for(const [position, token] of anchors.slice(next)) parts.push(renderSegment(token, position, ''));
+    parts.push('</p>');
+    return parts.join('');
+  }
+
+  function renderSections(sections, showChords, layout){
+    const parts = [];
+    for(const [name, lines] of sections){
+      parts.push('<section class="song-section">');
+      if(name) parts.push(`<h3 class="section-header">${escapeHtml(name)}</h3>`);
+      for(const line of lines){
+        if(layout === 'fluid'){
+          parts.push(renderFluidLine(line, showChords));
+          continue;
+        }
+        for(const sub of wrapLineBlocks(line, WRAP_WIDTH)){
+          const chordLine = buildChordLine(sub, showChords);
+          if(chordLine) parts.push(`<pre class="chords">${escapeHtml(chordLine)}</pre>`);
+          parts.push(`<pre class="lyrics">${escapeHtml(sub[2])}</pre>`);
+        }
+      }
+      parts.push('</section>');
+    }
+    return parts.join('');
+  }
+
+  // Same markup as `render_song_body` for the same sections and keys.
+  function renderSongBody(sections, defaultKey, targetKey, showChords, layout = 'wrapped'){
+    const semitones = computeSemitoneInterval(defaultKey, targetKey);
+    const transposed = transposeSections(sections, semitones, preferSharpsForKey(targetKey));
+    return renderSections(transposed, showChords, layout);
+  }
+
+  const api = {
+    computeSemitoneInterval,
+    preferSharpsForKey,
+    transposeChordSymbol,
+    renderSongBody,
+  };
+  if(typeof module === 'object' && module.exports){ module.exports = api; } else { root.SongTransposer = api; }
+})(typeof self !== 'undefined' ? self : this);
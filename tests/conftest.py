@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 import os
+from typing import Any
 
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import text
-from sqlalchemy.engine import make_url
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import insert, text
 
 from app import db as db_mod
 from app.main import app
+from app.search_cache import cached_searches
 from app.settings import settings
 
 # If a dedicated test DB URL is provided, switch the app engine to use it
@@ -23,14 +24,27 @@ if _test_db_url:
 async def _prepare_test_db():
     async with db_mod.engine.begin() as conn:  # type: ignore[attr-defined]
         await conn.run_sync(db_mod.metadata.create_all)  # type: ignore[attr-defined]
+    # Tests run on loops of their own; none may inherit a connection bound to this one.
+    await db_mod.engine.dispose()  # type: ignore[attr-defined]
     yield
     async with db_mod.engine.begin() as conn:  # type: ignore[attr-defined]
         await conn.run_sync(db_mod.metadata.drop_all)  # type: ignore[attr-defined]
 
 
-@pytest_asyncio.fixture(autouse=True, scope='function')
+@pytest_asyncio.fixture(autouse=True, scope='function', loop_scope='function')
 async def _reset_engine_pool():
     await db_mod.engine.dispose()  # type: ignore[attr-defined]
+    # Every test writes its own songs; results cached by an earlier one are not theirs.
+    cached_searches.invalidate()
+    yield
+    # Close this test's connections on its own loop, before that loop is gone.
+    await db_mod.engine.dispose()  # type: ignore[attr-defined]
+
+
+@pytest.fixture
+def uncached_searches(monkeypatch: pytest.MonkeyPatch) -> None:
+    # For tests that change songs between searches without the admin invalidating the cache.
+    monkeypatch.setattr(cached_searches, 'ttl', 0.0)
 
 
 @pytest_asyncio.fixture(scope='function')
@@ -43,6 +57,21 @@ async def db_conn():
         await conn.execute(text('DELETE FROM admin_users'))
 
 
+@pytest.fixture
+def insert_song():
+    # Commits each song on its own, so requests through `client` see it.
+    async def _insert(title: str = 'Song', content: str = '[C]Line', **values: Any) -> Any:
+        async with db_mod.engine.begin() as conn:  # type: ignore[attr-defined]
+            result = await conn.execute(
+                insert(db_mod.songs)
+                .values(translated_title=title, chordpro_content=content, default_key='C', **values)
+                .returning(db_mod.songs.c.id),
+            )
+            return result.scalar_one()
+
+    return _insert
+
+
 @pytest_asyncio.fixture(scope='function')
 async def client():
     transport = ASGITransport(app=app)
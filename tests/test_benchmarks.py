@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from app.parser import parse_chordpro
+from benchmarks.corpus import CYRILLIC_WORDS, SHAPES, build_corpus
+from benchmarks.run import build_cases, compare_results
+
+
+def test_corpus_is_deterministic_and_parses() -> None:
+    corpus = build_corpus(seed=3)
+    assert corpus == build_corpus(seed=3)
+    assert corpus != build_corpus(seed=4)
+    assert set(corpus) == set(SHAPES)
+    assert any(word in corpus['cyrillic'] for word in CYRILLIC_WORDS)
+    for content in corpus.values():
+        assert parse_chordpro(content).sections
+
+
+def test_every_case_runs() -> None:
+    for case in build_cases().values():
+        case()
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold() -> None:
+    baseline = {'results': {'a': {'us_per_call': 100.0}, 'b': {'us_per_call': 100.0}}}
+    current = {
+        'results': {
+            'a': {'us_per_call': 115.0},
+            'b': {'us_per_call': 125.0},
+            'new': {'us_per_call': 1.0},
+        },
+    }
+    assert compare_results(baseline, current, max_regression=20) == ['b: +25.0%']
+    assert compare_results(baseline, current, max_regression=10) == ['a: +15.0%', 'b: +25.0%']
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy import insert
+
+from app.cache import LRUCache, parsed_songs
+from app.db import songs
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['size'] == 2
+    assert stats['hits'] == 3
+    assert stats['misses'] == 1
+
+
+def test_lru_cache_zero_size_disables_storage() -> None:
+    cache: LRUCache[str, int] = LRUCache(0)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_setlist_reuses_parse_without_leaking_transposition(client: Any) -> None:
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from app.db import engine
+
+    async with engine.begin() as db_conn:  # type: ignore[assignment]
+        assert isinstance(db_conn, AsyncConnection)
+        result = await db_conn.execute(
+            insert(songs)
+            .values(translated_title='Cached', chordpro_content='[C]Line', default_key='C')
+            .returning(songs.c.id)
+        )
+        song_id = result.scalar_one()
+
+    parsed_songs.clear()
+    hits_before = parsed_songs.hits
+    res_d = await client.get(f'/?s={song_id}:D')
+    assert '<pre class="chords">D</pre>' in res_d.text
+    res_c = await client.get(f'/?s={song_id}:C')
+    assert '<pre class="chords">C</pre>' in res_c.text
+    assert parsed_songs.hits == hits_before + 1
+    cached = next(iter(parsed_songs._data.values()))
+    assert cached.sections[0].lines[0].chords == ['C']
+
+
+def test_discard_where_drops_matching_keys() -> None:
+    cache: LRUCache[tuple[str, int], str] = LRUCache(10)
+    cache.set(('a', 1), 'x')
+    cache.set(('a', 2), 'y')
+    cache.set(('b', 1), 'z')
+    assert cache.discard_where(lambda key: key[0] == 'a') == 2
+    assert cache.get(('b', 1)) == 'z'
+
+
+@pytest.mark.asyncio
+async def test_article_cache_serves_repeat_views_and_admin_edit_invalidates(client: Any) -> None:
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from app.admin import SongAdmin
+    from app.cache import song_articles
+    from app.db import engine
+
+    async with engine.begin() as db_conn:  # type: ignore[assignment]
+        assert isinstance(db_conn, AsyncConnection)
+        result = await db_conn.execute(
+            insert(songs)
+            .values(translated_title='Fragment', chordpro_content='[C]Line', default_key='C')
+            .returning(songs.c.id)
+        )
+        song_id = result.scalar_one()
+
+    song_articles.clear()
+    first = await client.get(f'/?s={song_id}:D&chords=1')
+    hits_before = song_articles.hits
+    second = await client.get(f'/?s={song_id}:D&chords=1')
+    assert song_articles.hits == hits_before + 1
+    assert first.text == second.text
+    assert any(key[0] == song_id for key in song_articles._data)
+
+    model = type('M', (), {'id': song_id, 'chordpro_content': '[C]Line'})()
+    await SongAdmin.__dict__['on_model_change'](None, {'default_key': 'C'}, model, False, object())
+    assert not any(key[0] == song_id for key in song_articles._data)
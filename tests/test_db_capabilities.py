@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db import engine, songs
+from app.db_capabilities import (
+    TRIGRAM_INDEXES,
+    TSVECTOR_INDEXES,
+    DatabaseCapabilities,
+    db_capabilities,
+)
+from app.repositories.songs import SUMMARY_COLUMNS, _search_sql
+from app.settings import settings
+
+
+def test_capabilities_summarize_extensions_and_indexes() -> None:
+    partial = DatabaseCapabilities(160004, frozenset({'pg_trgm'}), frozenset({'songs_title_trgm'}))
+    assert partial.pg_trgm
+    assert not partial.unaccent
+    assert not partial.trigram_indexes
+    full = DatabaseCapabilities(160004, frozenset(), TRIGRAM_INDEXES | {'ix_songs_search_vector'})
+    summary = full.as_dict()
+    assert (summary['trigram_indexes'], summary['tsvector_index']) == (True, True)
+    assert summary['server_version'] == 160004  # noqa: PLR2004
+    assert DatabaseCapabilities(160004, indexes=TSVECTOR_INDEXES).tsvector_index
+
+
+class _Capture:
+    async def execute(self, stmt: Any) -> str:
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('indexes', 'expected', 'absent'),
+    [
+        (TRIGRAM_INDEXES | {'ix_songs_search_vector'}, ['@@', 'similarity'], []),
+        (frozenset({'ix_songs_search_vector'}), ['@@'], ['similarity']),
+        (TRIGRAM_INDEXES, ['similarity'], ['@@']),
+    ],
+)
+async def test_search_strategy_follows_detected_indexes(
+    monkeypatch: pytest.MonkeyPatch,
+    indexes: frozenset[str],
+    expected: list[str],
+    absent: list[str],
+) -> None:
+    monkeypatch.setattr(settings, 'search_engine', 'fulltext')
+    capabilities = DatabaseCapabilities(160004, frozenset({'pg_trgm'}), indexes)
+    monkeypatch.setattr(db_capabilities, 'current', capabilities)
+    columns = [songs.c[name] for name in SUMMARY_COLUMNS]
+    sql = await _search_sql(_Capture(), 'grace', 10, False, columns)  # type: ignore[arg-type]
+    assert all(part in sql for part in expected)
+    assert not any(part in sql for part in absent)
+
+
+@pytest.mark.asyncio
+async def test_detect_reads_the_catalog_once(client: Any) -> None:
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        detected = await db_capabilities.detect(conn)
+        assert detected.server_version > 0
+        assert await db_capabilities.get(conn) is detected
+    res = await client.get('/diagnostics/database')
+    assert res.status_code == 403  # noqa: PLR2004
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from typing import Any
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.db import songs
+from app.http_cache import build_etag, is_not_modified
+
+
+class _Req:
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+
+
+def test_is_not_modified_matches_weak_and_listed_etags() -> None:
+    etag = build_etag('x', 1)
+    assert is_not_modified(_Req({'if-none-match': etag}), etag, None)
+    assert is_not_modified(_Req({'if-none-match': f'"other", {etag[2:]}'}), etag, None)
+    assert not is_not_modified(_Req({'if-none-match': '"other"'}), etag, None)
+    assert not is_not_modified(_Req({}), etag, None)
+
+
+def test_is_not_modified_falls_back_to_if_modified_since() -> None:
+    changed = datetime(2025, 1, 1, 12, 0, 0, 500, tzinfo=UTC)
+    etag = build_etag('x')
+    later = format_datetime(changed + timedelta(seconds=1), usegmt=True)
+    earlier = format_datetime(changed - timedelta(seconds=1), usegmt=True)
+    assert is_not_modified(_Req({'if-modified-since': later}), etag, changed)
+    assert not is_not_modified(_Req({'if-modified-since': earlier}), etag, changed)
+    assert not is_not_modified(_Req({'if-modified-since': 'garbage'}), etag, changed)
+
+
+@pytest.mark.asyncio
+async def test_setlist_answers_304_until_song_changes(client: Any) -> None:
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from app.db import engine
+
+    async with engine.begin() as db_conn:  # type: ignore[assignment]
+        assert isinstance(db_conn, AsyncConnection)
+        result = await db_conn.execute(
+            insert(songs)
+            .values(translated_title='Rehearsal', chordpro_content='[C]Line', default_key='C')
+            .returning(songs.c.id)
+        )
+        song_id = result.scalar_one()
+
+    first = await client.get(f'/?s={song_id}:D')
+    etag = first.headers['etag']
+    assert first.headers['last-modified']
+    again = await client.get(f'/?s={song_id}:D', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.text == ''
+    other_key = await client.get(f'/?s={song_id}:E', headers={'If-None-Match': etag})
+    assert other_key.status_code == 200
+
+    async with engine.begin() as db_conn:  # type: ignore[assignment]
+        await db_conn.execute(
+            update(songs)
+            .where(songs.c.id == song_id)
+            .values(chordpro_content='[C]Changed', updated_at=datetime.now(UTC)),
+        )
+    changed = await client.get(f'/?s={song_id}:D', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert 'Changed' in changed.text
+
+
+@pytest.mark.asyncio
+async def test_recent_listing_answers_304(client: Any) -> None:
+    first = await client.get('/')
+    assert first.status_code == 200
+    again = await client.get('/', headers={'If-None-Match': first.headers['etag']})
+    assert again.status_code == 304
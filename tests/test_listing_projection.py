@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.db import engine, songs
+from app.repositories.songs import (
+    SUMMARY_COLUMNS,
+    fulltext_search_stmt,
+    list_recent_song_page,
+    search_song_page,
+)
+
+
+def test_summary_search_selects_only_listing_columns() -> None:
+    columns = [songs.c[name] for name in SUMMARY_COLUMNS]
+    stmt = fulltext_search_stmt('grace', 10, include_drafts=False, has_trgm=True, columns=columns)
+    selected = [c.name for c in stmt.selected_columns]
+    assert selected == [*SUMMARY_COLUMNS, 'prefix_first', 'score']
+
+
+def test_recent_listing_index_covers_summary_columns() -> None:
+    [index] = [ix for ix in songs.indexes if ix.name == 'ix_songs_recent_listing']
+    covered = {'created_at', 'id', *index.dialect_options['postgresql']['include']}
+    assert covered == set(SUMMARY_COLUMNS)
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert 'WHERE is_draft IS false' in ddl
+
+
+@pytest.mark.asyncio
+async def test_summary_listings_skip_song_bodies() -> None:
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(
+            insert(songs).values(
+                translated_title='Projected',
+                chordpro_content='[C]a long body',
+                default_key='C',
+            ),
+        )
+        recent, _ = await list_recent_song_page(conn, 20)
+        [projected] = [r for r in recent if r['translated_title'] == 'Projected']
+        assert tuple(projected) == SUMMARY_COLUMNS
+        [found], _ = await search_song_page(conn, 'Projected', 20)
+        assert tuple(found) == SUMMARY_COLUMNS
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql
+
+from app.db import engine, songs
+from app.pagination import (
+    InvalidCursorError,
+    after_key,
+    decode_cursor,
+    encode_cursor,
+    parse_created_at_and_id,
+)
+from app.repositories.songs import (
+    _ilike_search_stmt,
+    fulltext_search_stmt,
+    list_recent_song_page,
+    recent_songs_stmt,
+    search_song_page,
+)
+from app.settings import settings
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _sql(clause: Any) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_round_trips_sort_keys() -> None:
+    song_id = uuid.uuid4()
+    token = encode_cursor(['sql', 0, 0.125, START, song_id])
+    assert '=' not in token
+    values = decode_cursor(token)
+    assert values[:3] == ['sql', 0, 0.125]
+    assert parse_created_at_and_id(values) == (START, song_id)
+
+
+@pytest.mark.parametrize('token', ['%%%', 'bm90IGpzb24', 'eyJhIjoxfQ'])
+def test_foreign_cursors_are_rejected(token: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
+
+
+def test_after_key_uses_a_row_comparison_when_directions_agree() -> None:
+    keys = [(songs.c.created_at, True), (songs.c.id, True)]
+    assert _sql(after_key(keys, [START, uuid.uuid4()])).startswith('(songs.created_at, songs.id) <')
+    mixed = _sql(after_key([(songs.c.default_key, False), *keys], ['C', START, uuid.uuid4()]))
+    assert ' OR ' in mixed
+
+
+def test_statements_page_after_the_cursor_row() -> None:
+    tail = [START, uuid.uuid4()]
+    assert '(songs.created_at, songs.id) <' in _sql(recent_songs_stmt(10, after=tail))
+    stmt = fulltext_search_stmt(
+        'grace',
+        10,
+        include_drafts=False,
+        has_trgm=False,
+        after=[0, 0.5, *tail],
+    )
+    assert 'OFFSET' not in _sql(stmt)
+    with pytest.raises(InvalidCursorError):
+        fulltext_search_stmt('grace', 10, include_drafts=False, has_trgm=False, after=tail)
+
+
+def test_search_scores_ignore_missing_fields() -> None:
+    # A NULL score would end up in the cursor and match no `after_key` comparison.
+    fulltext = _sql(fulltext_search_stmt('grace', 10, include_drafts=False, has_trgm=True))
+    assert 'coalesce(ts_rank_cd(' in fulltext
+    ilike = _sql(_ilike_search_stmt('grace', 10, include_drafts=False, has_trgm=True, columns=[]))
+    assert 'coalesce(similarity(songs.original_title' in ilike
+    assert 'coalesce(similarity(songs.artist' in ilike
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('engine_name', ['fulltext', 'ilike'])
+async def test_pages_cover_every_match_once(
+    monkeypatch: pytest.MonkeyPatch,
+    engine_name: str,
+) -> None:
+    monkeypatch.setattr(settings, 'search_engine', engine_name)
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(delete(songs))
+        await conn.execute(
+            insert(songs),
+            [
+                {
+                    'translated_title': f'Paged Song {n}',
+                    'chordpro_content': 'x',
+                    'default_key': 'C',
+                    # Only some songs have an artist or original title to rank by.
+                    'artist': 'Paged Band' if n % 3 == 0 else None,
+                    'original_title': None,
+                    # Pairs of equal timestamps, so ties are broken by id.
+                    'created_at': START + timedelta(minutes=n // 2),
+                }
+                for n in range(7)
+            ],
+        )
+        for fetch in (
+            lambda cursor: search_song_page(conn, 'paged', 3, cursor),
+            lambda cursor: list_recent_song_page(conn, 3, cursor),
+        ):
+            seen: list[uuid.UUID] = []
+            cursor = None
+            while True:
+                rows, cursor = await fetch(cursor)
+                seen += [row['id'] for row in rows]
+                if cursor is None:
+                    break
+            assert len(seen) == len(set(seen)) == 7  # noqa: PLR2004
+
+        with pytest.raises(InvalidCursorError):
+            await search_song_page(conn, 'paged', 3, encode_cursor(['recent', START, uuid.uuid4()]))
@@ -30,3 +30,10 @@ def test_anonymous_section_parses_and_renders_without_header() -> None:
     parsed = parse_chordpro(content)
     assert len(parsed.sections) == 1
     assert parsed.sections[0].name == ''
+
+
+def test_plain_lyrics_strips_markup_and_folds_case_and_apostrophes() -> None:
+    from app.parser import normalize_search_text, plain_lyrics
+
+    assert normalize_search_text('П’ЯТЬ пʼять `Ok‘') == "п'ять п'ять 'ok'"
+    assert plain_lyrics('{start_of_section: V}\n[C]Сім’я\n{end_of_section}') == "\nсім'я\n"
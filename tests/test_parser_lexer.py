@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.parser import ParseError, parse_chordpro
+from benchmarks.reference import legacy_parse_chordpro
+
+FRAGMENTS = [
+    '[C]',
+    '[G/B]',
+    '[ Am ]',
+    '[[C]',
+    '[]',
+    '[',
+    ']',
+    'Сонце ',
+    'grace',
+    ' ',
+    '\t',
+    '-',
+    '{',
+    '}',
+    '{title: X}',
+]
+LINES = [
+    '',
+    '   ',
+    '{start_of_section: Verse}',
+    '  {START_OF_SECTION:   Chorus 1 }  ',
+    '{start_of_section:   }',
+    '{start_of_section:}',
+    '{start_of_section}',
+    '{end_of_section}',
+    ' {End_Of_Section} ',
+    '{comment: hi}',
+    '{start_of_section: a}b}',
+]
+
+
+def _outcome(parse, content: str) -> object:
+    try:
+        return parse(content)
+    except ParseError as exc:
+        return ('ParseError', str(exc))
+
+
+def _random_song(rng: random.Random) -> str:
+    lines = []
+    for _ in range(rng.randint(0, 12)):
+        if rng.random() < 0.35:
+            lines.append(rng.choice(LINES))
+        else:
+            lines.append(''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 8))))
+    return rng.choice(['\n', '\r\n']).join(lines)
+
+
+def test_lexer_matches_legacy_parser_on_random_songs() -> None:
+    rng = random.Random(20261017)
+    for _ in range(5000):
+        content = _random_song(rng)
+        assert _outcome(parse_chordpro, content) == _outcome(legacy_parse_chordpro, content), (
+            content
+        )
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        '[[C]x',
+        'a[b[c]d',
+        '[][C]',
+        'x]y',
+        '[C',
+        '{start_of_section: A}\n[C]One\n\n{end_of_section}\nTail [D]',
+        '{start_of_section: A}\n{start_of_section: B}',
+        'implicit\n{start_of_section: A}\nx\n{end_of_section}',
+    ],
+)
+def test_lexer_matches_legacy_parser_on_edge_cases(content: str) -> None:
+    assert _outcome(parse_chordpro, content) == _outcome(legacy_parse_chordpro, content)
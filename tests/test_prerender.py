@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.cache import parsed_songs, song_articles
+from app.db import song_renders, songs
+from app.prerender import (
+    RENDER_FORMAT_VERSION,
+    backfill,
+    prerender_keys,
+    prerender_song,
+    schedule_prerender,
+)
+from app.repositories.song_renders import get_fresh_song_renders
+
+
+def test_prerender_keys_follow_key_picker() -> None:
+    major = prerender_keys('E')
+    assert major[0] == ''
+    assert len(major) == 13
+    assert 'F#' in major and 'Gb' not in major
+    minor = prerender_keys('Em')
+    assert 'C#m' in minor and 'E' not in minor
+    assert prerender_keys('Gb')[-1] == 'Gb'
+
+
+@pytest.mark.asyncio
+async def test_setlist_serves_fresh_prerender_and_ignores_stale(
+    client: Any,
+    insert_song: Any,
+) -> None:
+    from app.db import engine
+
+    song_id = await insert_song()
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        assert await prerender_song(conn, song_id) == 14
+        await conn.execute(
+            update(song_renders)
+            .where(song_renders.c.song_id == song_id, song_renders.c.key == 'D')
+            .values(html='<p>from-table</p>'),
+        )
+    song_articles.clear()
+    res = await client.get(f'/?s={song_id}:D')
+    assert '<p>from-table</p>' in res.text
+
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(
+            update(songs).where(songs.c.id == song_id).values(updated_at=datetime.now(UTC)),
+        )
+    song_articles.clear()
+    parsed_songs.clear()
+    res_stale = await client.get(f'/?s={song_id}:D')
+    assert '<p>from-table</p>' not in res_stale.text
+    assert '<pre class="chords">D</pre>' in res_stale.text
+
+
+@pytest.mark.asyncio
+async def test_prerender_matches_live_render(client: Any, insert_song: Any) -> None:
+    from app.db import engine
+
+    song_id = await insert_song(
+        content='{start_of_section: V}\n[C]Amazing [G/B]grace\n{end_of_section}',
+    )
+    song_articles.clear()
+    live = await client.get(f'/?s={song_id}:Eb&chords=1')
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await prerender_song(conn, song_id)
+    song_articles.clear()
+    stored = await client.get(f'/?s={song_id}:Eb&chords=1')
+    assert live.text == stored.text
+
+
+@pytest.mark.asyncio
+async def test_backfill_and_admin_save_prerender(insert_song: Any) -> None:
+    from app.admin import SongAdmin
+    from app.db import engine
+
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(songs.delete())
+    first = await insert_song()
+    second = await insert_song()
+    assert await backfill() == 2
+    assert await backfill() == 0
+
+    model = type('M', (), {'id': first})()
+    await SongAdmin.__dict__['after_model_change'](None, {}, model, False, object())
+    await schedule_prerender(second)
+    async with engine.connect() as conn:  # type: ignore[assignment]
+        count = await conn.scalar(select(func.count()).select_from(song_renders))
+    assert count == 28
+
+
+@pytest.mark.asyncio
+async def test_stored_renders_are_kept_per_layout(
+    client: Any,
+    monkeypatch: pytest.MonkeyPatch,
+    insert_song: Any,
+) -> None:
+    from app.db import engine
+    from app.settings import settings
+
+    song_id = await insert_song()
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await prerender_song(conn, song_id)
+        monkeypatch.setattr(settings, 'render_layout', 'fluid')
+        await prerender_song(conn, song_id)
+        res = await conn.execute(
+            select(song_renders.c.layout, func.count())
+            .where(song_renders.c.song_id == song_id)
+            .group_by(song_renders.c.layout),
+        )
+        assert dict(res.all()) == {'wrapped': 14, 'fluid': 14}
+    page = await client.get(f'/?s={song_id}:D')
+    assert '<p class="line"><span class="word"><span class="seg" data-at="0">' in page.text
+    assert 'data-layout="fluid"' in page.text
+
+
+@pytest.mark.asyncio
+async def test_renders_of_an_older_format_are_stale(insert_song: Any) -> None:
+    from app.db import engine
+
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(songs.delete())
+    song_id = await insert_song()
+    wanted = [(song_id, 'D', True)]
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await prerender_song(conn, song_id)
+        assert await get_fresh_song_renders(conn, wanted, 'wrapped', RENDER_FORMAT_VERSION)
+        await conn.execute(update(song_renders).values(format_version=RENDER_FORMAT_VERSION - 1))
+        assert not await get_fresh_song_renders(conn, wanted, 'wrapped', RENDER_FORMAT_VERSION)
+    assert await backfill() == 1
+    assert await backfill() == 0
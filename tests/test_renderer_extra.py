@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from app.parser import LineBlock, ParsedSong, Section
-from app.renderer import build_chord_line
+from app.renderer import WRAP_WIDTH, build_chord_line, render_fluid_line
 from app.renderer import render_parsed_song
 
 
@@ -35,3 +35,20 @@ def test_build_chord_line_resolves_overlaps_with_spacing() -> None:
     third = line.index('Bb/Eb')
     assert second >= first + len('Ebm') + 1
     assert third >= second + len('Ab/Eb') + 1
+
+
+def test_fluid_layout_keeps_lines_whole_and_anchors_chords() -> None:
+    lyrics = 'Amazing grace how sweet the sound that saved a wretch like me'
+    assert len(lyrics) > WRAP_WIDTH
+    section = Section('Verse', [LineBlock(['C', 'G'], [0, 10], lyrics)])
+    html = render_parsed_song(ParsedSong([section], []), True, layout='fluid')
+    assert html.count('<p class="line">') == 1
+    assert '<pre' not in html
+    # The chord inside "grace" keeps the whole word together.
+    assert '<span class="word">gr<span class="seg" data-at="10">' in html
+    assert '<span class="chord">C</span>Amazing</span>' in html
+
+
+def test_fluid_line_without_chords_is_plain_text() -> None:
+    line = LineBlock(['C'], [0], 'a <b> line')
+    assert render_fluid_line(line, show_chords=False) == '<p class="line">a &lt;b&gt; line</p>'
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import random
+
+from app.parser import LineBlock, ParsedSong, Section, parse_chordpro
+from app.renderer import build_chord_line, render_parsed_song, wrap_line_blocks
+from benchmarks.reference import (
+    legacy_build_chord_line,
+    legacy_render_parsed_song,
+    legacy_wrap_line_blocks,
+)
+
+WORDS = ['Amazing', 'grace', 'how', 'sweet', 'Сонце', 'світить', 'о', '—', 're-', 'deemed', '']
+CHORDS = ['C', 'G/B', 'Am7', 'Fmaj7', 'Ebm', 'Ab/Eb', 'C#m7b5', '']
+
+
+def _random_line(rng: random.Random) -> LineBlock:
+    separators = [' ', '  ', '-', '\t', ' - ']
+    lyrics = ''.join(rng.choice(WORDS) + rng.choice(separators) for _ in range(rng.randint(0, 25)))
+    if rng.random() < 0.2:
+        lyrics = 'x' * rng.randint(30, 120)
+    count = rng.randint(0, 20)
+    positions = sorted(rng.randint(-2, len(lyrics) + 2) for _ in range(count))
+    if rng.random() < 0.2:
+        rng.shuffle(positions)
+    chords: list[str | None] = [rng.choice([*CHORDS, None]) for _ in range(count)]
+    return LineBlock(chords, positions, lyrics)
+
+
+def test_wrap_and_chord_line_match_legacy_on_random_lines() -> None:
+    rng = random.Random(11)
+    for _ in range(3000):
+        line = _random_line(rng)
+        width = rng.choice([0, 1, 5, 17, 40, 80])
+        assert wrap_line_blocks(line, width) == legacy_wrap_line_blocks(line, width)
+        for show_chords in (True, False):
+            assert build_chord_line(line, show_chords) == legacy_build_chord_line(line, show_chords)
+
+
+def test_render_matches_legacy_on_song_corpus() -> None:
+    rng = random.Random(23)
+    for _ in range(200):
+        sections = [
+            Section(rng.choice(['', 'Verse', '<Chorus>']), [_random_line(rng) for _ in range(6)])
+            for _ in range(rng.randint(1, 4))
+        ]
+        parsed = ParsedSong(sections, [])
+        for show_chords in (True, False):
+            expected = legacy_render_parsed_song(parsed, show_chords)
+            assert render_parsed_song(parsed, show_chords) == expected
+    long_line = ' '.join(f'[{CHORDS[i % 7]}]слово{i}' for i in range(400))
+    parsed = parse_chordpro(f'{{start_of_section: Long}}\n{long_line}\n{{end_of_section}}')
+    assert render_parsed_song(parsed, True) == legacy_render_parsed_song(parsed, True)
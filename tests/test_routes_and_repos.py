@@ -184,3 +184,56 @@ async def test_repository_include_drafts_queries() -> None:
         rows = (await db_conn.execute(select(songs))).mappings().all()
         assert any(r['translated_title'] == 'Public' for r in rows)
         assert any(r['translated_title'] == 'Private' for r in rows)
+
+
+@pytest.mark.asyncio
+async def test_get_songs_by_ids_fetches_batch_keyed_by_id() -> None:
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from app.db import engine
+    from app.repositories.songs import get_songs_by_ids
+
+    async with engine.begin() as db_conn:  # type: ignore[assignment]
+        assert isinstance(db_conn, AsyncConnection)
+        ids = []
+        for title in ('First', 'Second'):
+            result = await db_conn.execute(
+                insert(songs)
+                .values(translated_title=title, chordpro_content='[C]x', default_key='C')
+                .returning(songs.c.id)
+            )
+            ids.append(result.scalar_one())
+        missing = uuid.uuid4()
+        rows = await get_songs_by_ids(db_conn, [ids[1], missing, ids[0], ids[1]])
+        assert set(rows) == set(ids)
+        assert rows[ids[0]]['translated_title'] == 'First'
+        assert 'search_vector' not in rows[ids[0]]
+        # Without a stored parse the content is still read, to parse from.
+        rows = await get_songs_by_ids(db_conn, ids, ast_version=1)
+        assert rows[ids[0]]['chordpro_content'] == '[C]x'
+        assert await get_songs_by_ids(db_conn, []) == {}
+
+
+@pytest.mark.asyncio
+async def test_setlist_keeps_order_and_404s_on_missing_id(client: Any) -> None:
+    from sqlalchemy.ext.asyncio import AsyncConnection
+    from app.db import engine
+
+    async with engine.begin() as db_conn:  # type: ignore[assignment]
+        assert isinstance(db_conn, AsyncConnection)
+        ids = []
+        for title in ('Alpha Song', 'Beta Song'):
+            result = await db_conn.execute(
+                insert(songs)
+                .values(translated_title=title, chordpro_content='[C]x', default_key='C')
+                .returning(songs.c.id)
+            )
+            ids.append(result.scalar_one())
+
+    res = await client.get(f'/?s={ids[1]}:D,{ids[0]},{ids[1]}:D')
+    assert res.status_code == 200
+    html = res.text
+    assert html.count('<article class="song">') == 3
+    assert html.index('Beta Song') < html.index('Alpha Song') < html.rindex('Beta Song')
+
+    res_missing = await client.get(f'/?s={ids[0]},{uuid.uuid4()}')
+    assert res_missing.status_code == 404
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from app.search_cache import SearchResultCache
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import AsyncIterator
+
+TTL = 0.05
+
+
+async def _connect() -> AsyncIterator[Any]:
+    yield 'background'
+
+
+class _Loader:
+    def __init__(self) -> None:
+        self.calls: list[Any] = []
+
+    async def __call__(self, conn: Any) -> int:
+        self.calls.append(conn)
+        return len(self.calls)
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_hit_and_invalidation_misses() -> None:
+    cache: SearchResultCache[int] = SearchResultCache(8, ttl=60, stale_ttl=60, connect=_connect)
+    load = _Loader()
+    assert await cache.get('grace', load, 'request') == 1
+    assert await cache.get('grace', load, 'request') == 1
+    cache.invalidate()
+    assert await cache.get('grace', load, 'request') == 2  # noqa: PLR2004
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_ratio']) == (1, 2, 0.3333)
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_served_stale_during_one_refresh() -> None:
+    cache: SearchResultCache[int] = SearchResultCache(8, ttl=TTL, stale_ttl=60, connect=_connect)
+    load = _Loader()
+    await cache.get('grace', load, 'request')
+    await asyncio.sleep(TTL * 2)
+    assert [await cache.get('grace', load, 'request') for _ in range(3)] == [1, 1, 1]
+    await asyncio.sleep(0)
+    assert load.calls == ['request', 'background']
+    assert await cache.get('grace', load, 'request') == 2  # noqa: PLR2004
+    assert cache.stats()['stale_hits'] == 3  # noqa: PLR2004
+    assert cache.stats()['refreshes'] == 1
+
+
+@pytest.mark.asyncio
+async def test_past_the_stale_window_or_disabled_loads_inline() -> None:
+    cache: SearchResultCache[int] = SearchResultCache(8, ttl=TTL, stale_ttl=0, connect=_connect)
+    load = _Loader()
+    await cache.get('grace', load, 'request')
+    await asyncio.sleep(TTL * 2)
+    assert await cache.get('grace', load, 'request') == 2  # noqa: PLR2004
+    off: SearchResultCache[int] = SearchResultCache(0, ttl=60, stale_ttl=60, connect=_connect)
+    await off.get('grace', load, 'request')
+    await off.get('grace', load, 'request')
+    assert len(load.calls) == 4  # noqa: PLR2004
+    assert off.stats()['size'] == 0
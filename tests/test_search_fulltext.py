@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy import delete, func, literal_column
+
+from app.db import engine, songs
+from app.repositories.songs import search_song_page
+from app.settings import settings
+
+
+def _vector(text: str) -> Any:
+    # setweight takes a "char"; a bound 'C' would arrive as varchar and match no overload.
+    return func.setweight(func.to_tsvector('simple', text), literal_column("'C'"))
+
+
+async def _delete_songs() -> None:
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(delete(songs))
+
+
+async def _search(conn: Any, query: str) -> list[dict[str, Any]]:
+    rows, _ = await search_song_page(conn, query, 50)
+    return rows
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('uncached_searches')
+async def test_fulltext_ranks_search_vector_matches_first(
+    monkeypatch: pytest.MonkeyPatch,
+    insert_song: Any,
+) -> None:
+    await _delete_songs()
+    await insert_song(
+        'Indexed',
+        '[C]hallelujah forever',
+        search_vector=_vector('hallelujah forever'),
+    )
+    await insert_song('Unindexed', '[C]hallelujah again')
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        monkeypatch.setattr(settings, 'search_engine', 'fulltext')
+        titles = [r['translated_title'] for r in await _search(conn, 'hallelujah')]
+        assert titles[0] == 'Indexed'
+
+        monkeypatch.setattr(settings, 'search_engine', 'ilike')
+        titles = [r['translated_title'] for r in await _search(conn, 'hallelujah')]
+        assert sorted(titles) == ['Indexed', 'Unindexed']
+
+
+@pytest.mark.asyncio
+async def test_fulltext_keeps_title_matches_and_web_syntax(
+    monkeypatch: pytest.MonkeyPatch,
+    insert_song: Any,
+) -> None:
+    await _delete_songs()
+    await insert_song(
+        'Amazing Grace',
+        '[C]how sweet the sound',
+        search_vector=_vector('amazing grace how sweet the sound'),
+    )
+    await insert_song('Sweet Song', '[C]so sweet', search_vector=_vector('sweet song so sweet'))
+    monkeypatch.setattr(settings, 'search_engine', 'fulltext')
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        by_title = await _search(conn, 'Amaz')
+        assert [r['translated_title'] for r in by_title] == ['Amazing Grace']
+        excluded = await _search(conn, 'sweet -grace')
+        assert [r['translated_title'] for r in excluded] == ['Sweet Song']
+    assert 'score' not in by_title[0]
+
+
+@pytest.mark.asyncio
+async def test_lyrics_plain_is_stripped_and_normalized(insert_song: Any) -> None:
+    from sqlalchemy import select
+
+    from app.parser import plain_lyrics
+
+    content = '{start_of_section: Приспів}\n[Am]П\u2019ять [G/B]Хлібів\n{end_of_section}'
+    song_id = await insert_song('Apostrophe', content)
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        stored = await conn.scalar(select(songs.c.lyrics_plain).where(songs.c.id == song_id))
+    assert stored == plain_lyrics(content)
+    assert "п'ять хлібів" in stored
+    assert '[' not in stored and 'приспів' not in stored
+
+
+@pytest.mark.asyncio
+async def test_ilike_lyric_search_ignores_chords_and_folds_apostrophes(
+    monkeypatch: pytest.MonkeyPatch,
+    insert_song: Any,
+) -> None:
+    await _delete_songs()
+    await insert_song('Apostrophe', '[Am]П\u02bcять хлібів')
+    monkeypatch.setattr(settings, 'search_engine', 'ilike')
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        assert [r['translated_title'] for r in await _search(conn, "п'ять")] == ['Apostrophe']
+        assert await _search(conn, 'Am]') == []
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import random
+import re
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import delete, insert, update
+
+from app.db import engine, songs
+from app.repositories.songs import search_song_page
+from app.search_index import SearchIndex, search_index, similarity
+from app.search_refresh import load_search_index, refresh_search_index
+from app.settings import settings
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+WORDS = ['amazing', 'grace', 'світло', 'сонце', 'sound', 'amazed', 'gracious', 'тату', "it's"]
+
+
+def _row(number: int, title: str, **values: Any) -> dict[str, Any]:
+    return {
+        'id': uuid.UUID(int=number),
+        'translated_title': title,
+        'original_title': None,
+        'artist': None,
+        'lyrics_plain': '',
+        'is_draft': False,
+        'created_at': START + timedelta(minutes=number),
+        'updated_at': START,
+        **values,
+    }
+
+
+def _titles(index: SearchIndex, query: str, **kwargs: Any) -> list[str]:
+    return [song['translated_title'] for song in index.search(query, **kwargs)]
+
+
+def _expected(rows: list[dict[str, Any]], term: str) -> list[str]:
+    """Rank by the SQL sort key, computed song by song."""
+    words = re.findall(r'\w+', term)
+    ranked = []
+    for row in rows:
+        title, original, artist = (
+            (row[c] or '').lower() for c in ('translated_title', 'original_title', 'artist')
+        )
+        fields = [(1.0, title), (0.4, original), (0.4, artist), (0.2, row['lyrics_plain'])]
+        weights = []
+        for i, word in enumerate(words):
+            prefix = i == len(words) - 1 and len(word) >= 3  # noqa: PLR2004
+            weights.append(
+                max(
+                    (
+                        weight
+                        for weight, text in fields
+                        for each in re.findall(r'\w+', text)
+                        if each == word or (prefix and each.startswith(word))
+                    ),
+                    default=0.0,
+                ),
+            )
+        rank = min(weights) if words else 0.0
+        sim = similarity(title, term)
+        if not (rank or sim >= 0.3 or any(term in text for _, text in fields[:3])):  # noqa: PLR2004
+            continue
+        key = (
+            0 if title.startswith(term) else 1,
+            -(rank + 0.5 * sim),
+            -row['created_at'].timestamp(),
+        )
+        ranked.append((key, row['translated_title']))
+    return [title for _, title in sorted(ranked)]
+
+
+def test_ranking_matches_the_sql_sort_key() -> None:
+    rng = random.Random(3)
+    rows = [
+        _row(
+            n,
+            f'{" ".join(rng.choices(WORDS, k=rng.randint(1, 3)))} {n}',
+            artist=rng.choice(['', 'Grace Band', 'Сонце']),
+            lyrics_plain=' '.join(rng.choices(WORDS, k=6)),
+        )
+        for n in range(300)
+    ]
+    index = SearchIndex()
+    index.load(rows)
+    for query in ['amazing', 'amaz', 'grace', 'сонце світ', 'gracous', 'тату', 'sound amazing']:
+        assert _titles(index, query, limit=500) == _expected(rows, query), query
+
+
+def test_prefix_typos_lyrics_and_drafts() -> None:
+    index = SearchIndex()
+    index.load(
+        [
+            _row(1, 'Grace Alone'),
+            _row(2, 'Amazing Grace'),
+            _row(3, 'Hidden', lyrics_plain="how sweet the sound it's"),
+            _row(4, 'Amazing Draft', is_draft=True),
+        ],
+    )
+    assert _titles(index, 'Amazing') == ['Amazing Grace']
+    assert _titles(index, 'Amazing', include_drafts=True) == ['Amazing Draft', 'Amazing Grace']
+    assert _titles(index, 'grace') == ['Grace Alone', 'Amazing Grace']
+    assert _titles(index, 'amazng grace') == ['Amazing Grace', 'Grace Alone']
+    assert _titles(index, 'swe') == ['Hidden']
+    assert _titles(index, 'it’s') == ['Hidden']
+    assert _titles(index, 'nothing') == []
+
+
+def test_upsert_and_remove_keep_ranking_by_recency() -> None:
+    index = SearchIndex()
+    index.load([_row(2, 'Song B'), _row(3, 'Song C')])
+    index.upsert(_row(4, 'Song D'))
+    index.upsert(_row(1, 'Song A'))
+    assert _titles(index, 'song') == ['Song D', 'Song C', 'Song B', 'Song A']
+    index.upsert(_row(3, 'Renamed'))
+    assert index.remove(uuid.UUID(int=2))
+    assert not index.remove(uuid.UUID(int=2))
+    assert _titles(index, 'song') == ['Song D', 'Song A']
+    assert _titles(index, 'renamed') == ['Renamed']
+    assert len(index) == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_memory_engine_refreshes_from_the_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(delete(songs))
+        res = await conn.execute(
+            insert(songs)
+            .values(translated_title='Indexed Song', chordpro_content='[C]la', default_key='C')
+            .returning(songs.c.id),
+        )
+        song_id = res.scalar_one()
+        monkeypatch.setattr(settings, 'search_engine', 'memory')
+        try:
+            assert await load_search_index(conn) == 1
+            assert [r['id'] for r in (await search_song_page(conn, 'indexed', 50))[0]] == [song_id]
+
+            await conn.execute(
+                update(songs).where(songs.c.id == song_id).values(translated_title='Renamed Song'),
+            )
+            await conn.execute(
+                insert(songs).values(
+                    translated_title='New Song', chordpro_content='x', default_key='C'
+                ),
+            )
+            assert await refresh_search_index(conn) >= 2  # noqa: PLR2004
+            titles = {r['translated_title'] for r in (await search_song_page(conn, 'song', 50))[0]}
+            assert titles == {'New Song', 'Renamed Song'}
+
+            await conn.execute(delete(songs).where(songs.c.id == song_id))
+            await refresh_search_index(conn)
+            assert song_id not in search_index
+        finally:
+            search_index.__init__()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+
+from app.db import engine, songs
+from app.repositories.songs import _like_prefix, suggest_songs_stmt
+
+
+def test_like_prefix_escapes_wildcards() -> None:
+    assert _like_prefix('100%_a\\b') == '100\\%\\_a\\\\b%'
+
+
+def test_suggest_query_matches_the_prefix_index_expression() -> None:
+    compiled = suggest_songs_stmt('Ama', 8).compile(dialect=postgresql.dialect())
+    assert 'lower(songs.translated_title) LIKE' in str(compiled)
+    assert 'chordpro_content' not in str(compiled)
+    assert 'ama%' in compiled.params.values()
+
+
+@pytest.mark.asyncio
+async def test_suggest_returns_compact_prefix_matches(client: Any) -> None:
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(songs.delete())
+        for values in (
+            {'translated_title': 'Amazing Grace', 'artist': 'Newton', 'default_key': 'G'},
+            {'translated_title': 'Amazing Draft', 'default_key': 'C', 'is_draft': True},
+            {'translated_title': 'Grace Amazing', 'default_key': 'C'},
+            {'translated_title': '100% Love', 'default_key': 'D'},
+            {'translated_title': '1000 Reasons', 'default_key': 'D'},
+        ):
+            await conn.execute(insert(songs).values(chordpro_content='[C]la', **values))
+
+    res = await client.get('/api/search/suggest', params={'q': 'amaz'})
+    assert res.status_code == 200  # noqa: PLR2004
+    assert res.headers['cache-control'].startswith('public')
+    [song] = res.json()
+    assert set(song) == {'id', 'translated_title', 'artist', 'default_key'}
+    assert (song['translated_title'], song['artist'], song['default_key']) == (
+        'Amazing Grace',
+        'Newton',
+        'G',
+    )
+    titles = [
+        s['translated_title'] for s in (await client.get('/api/search/suggest?q=100%25')).json()
+    ]
+    assert titles == ['100% Love']
+    assert (await client.get('/api/search/suggest?q=')).json() == []
+    assert (await client.get('/api/search/suggest?q=a&limit=0')).status_code == 422  # noqa: PLR2004
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import secrets
+import uuid
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.cache import PARSED_SONG_CODEC, LRUCache, song_cache
+from app.parser import parse_chordpro
+from app.settings import settings
+from app.shared_cache import TEXT_CODEC, SharedCache, decode_key, encode_key
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
+NOW = datetime(2026, 10, 17, 12, 30, tzinfo=UTC)
+
+
+def test_keys_round_trip_in_one_spelling() -> None:
+    key = (uuid.uuid4(), NOW, None, True, 'fluid')
+    assert decode_key(encode_key(key)) == key
+    assert encode_key(key) == encode_key(tuple(key))
+
+
+def test_workers_on_one_file_share_entries(tmp_path: Path) -> None:
+    path = tmp_path / 'cache.sqlite3'
+    first: SharedCache[str] = SharedCache(path, 'articles', 1 << 20, TEXT_CODEC)
+    second: SharedCache[str] = SharedCache(path, 'articles', 1 << 20, TEXT_CODEC)
+    other: SharedCache[str] = SharedCache(path, 'other', 1 << 20, TEXT_CODEC)
+    key = (uuid.uuid4(), NOW, 'D', True, 'wrapped')
+    html = '<pre class="lyrics">Amazing grace</pre>' * 50
+    first.set(key, html)
+    assert key in second
+    assert second.get(key) == html
+    assert other.get(key) is None
+    stats = second.stats()
+    assert (stats['backend'], stats['size'], stats['hits']) == ('sqlite', 1, 1)
+    # Repetitive markup is stored compressed.
+    assert stats['bytes'] < len(html) // 4
+
+
+def test_byte_budget_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache: SharedCache[str] = SharedCache(tmp_path / 'cache.sqlite3', 'a', 1000, TEXT_CODEC)
+    for n in range(10):
+        cache.set(('song', n), f'{n:03d}' + 'x' * 197)
+    stats = cache.stats()
+    assert stats['bytes'] <= 1000
+    assert stats['evictions'] == 10 - stats['size']
+    assert cache.get(('song', 9)) is not None
+    assert cache.get(('song', 0)) is None
+    # Larger than the whole budget even compressed.
+    cache.set(('huge',), secrets.token_hex(5000))
+    assert ('huge',) not in cache
+
+
+def test_discard_where_and_clear(tmp_path: Path) -> None:
+    cache: SharedCache[str] = SharedCache(tmp_path / 'cache.sqlite3', 'a', 1 << 20, TEXT_CODEC)
+    song_id = uuid.uuid4()
+    cache.set((song_id, NOW, 'C'), 'one')
+    cache.set((song_id, NOW, 'D'), 'two')
+    cache.set((uuid.uuid4(), NOW, 'C'), 'three')
+    assert cache.discard_where(lambda key: key[0] == song_id) == 2
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_parsed_songs_survive_serialization(tmp_path: Path) -> None:
+    cache = SharedCache(tmp_path / 'cache.sqlite3', 'parsed', 1 << 20, PARSED_SONG_CODEC)
+    parsed = parse_chordpro('{start_of_verse}\n[C]Привіт, [G/B]світ\n{end_of_verse}')
+    key = (uuid.uuid4(), NOW)
+    cache.set(key, parsed)
+    stored = cache.get(key)
+    assert stored == parsed
+    assert stored is not parsed
+
+
+def test_unusable_file_counts_as_miss(tmp_path: Path) -> None:
+    cache: SharedCache[str] = SharedCache(tmp_path / 'missing' / 'x', 'a', 100, TEXT_CODEC)
+    cache.set(('k',), 'v')
+    assert cache.get(('k',)) is None
+    assert cache.stats()['errors'] >= 2  # noqa: PLR2004
+
+
+def test_song_cache_follows_the_backend_setting(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    assert isinstance(song_cache('x', 10, TEXT_CODEC), LRUCache)
+    monkeypatch.setattr(settings, 'cache_backend', 'sqlite')
+    monkeypatch.setattr(settings, 'shared_cache_path', str(tmp_path / 'cache.sqlite3'))
+    assert isinstance(song_cache('x', 10, TEXT_CODEC), SharedCache)
+    # Size 0 still turns the cache off.
+    assert isinstance(song_cache('x', 0, TEXT_CODEC), LRUCache)
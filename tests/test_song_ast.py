@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.cache import parsed_songs, song_articles
+from app.db import songs
+from app.parser import parse_chordpro
+from app.song_ast import (
+    AST_FORMAT_VERSION,
+    backfill,
+    dump_parsed_song,
+    load_parsed_song,
+    parsed_song_from_row,
+)
+
+CONTENT = (
+    '{start_of_section: Verse}\n'
+    '[C]Amazing [G/B]grace, how [F]sweet the [C]sound\n'
+    '\n'
+    'plain line\n'
+    '{end_of_section}\n'
+    '[Am]Tail'
+)
+
+
+def test_dump_and_load_round_trip() -> None:
+    parsed = parse_chordpro(CONTENT)
+    assert load_parsed_song(dump_parsed_song(parsed)) == parsed
+
+
+def test_stale_or_missing_ast_is_reparsed() -> None:
+    stored = dump_parsed_song(parse_chordpro('[D]Stored'))
+    row = {'chordpro_content': '[C]Live', 'chordpro_ast': stored}
+
+    def first_chords(r: dict[str, Any]) -> list[str | None]:
+        return parsed_song_from_row(r).sections[0].lines[0].chords
+
+    assert first_chords({**row, 'chordpro_ast_version': AST_FORMAT_VERSION}) == ['D']
+    assert first_chords({**row, 'chordpro_ast_version': 0}) == ['C']
+    assert first_chords({'chordpro_content': '[C]Live'}) == ['C']
+
+
+@pytest.mark.asyncio
+async def test_setlist_reads_stored_ast(client: Any) -> None:
+    from app.db import engine
+
+    stored = dump_parsed_song(parse_chordpro('[D]From the column'))
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        res = await conn.execute(
+            insert(songs)
+            .values(
+                translated_title='Stored AST',
+                chordpro_content='[C]From the content',
+                chordpro_ast=stored,
+                chordpro_ast_version=AST_FORMAT_VERSION,
+                default_key='C',
+            )
+            .returning(songs.c.id)
+        )
+        song_id = res.scalar_one()
+    parsed_songs.clear()
+    song_articles.clear()
+    page = await client.get(f'/?s={song_id}')
+    assert 'From the column' in page.text
+    assert 'From the content' not in page.text
+
+
+@pytest.mark.asyncio
+async def test_backfill_stores_ast_and_keeps_updated_at() -> None:
+    from app.db import engine
+
+    async with engine.begin() as conn:  # type: ignore[assignment]
+        await conn.execute(songs.delete())
+        res = await conn.execute(
+            insert(songs)
+            .values(translated_title='Legacy', chordpro_content=CONTENT, default_key='C')
+            .returning(songs.c.id, songs.c.updated_at)
+        )
+        song_id, updated_at = res.one()
+    assert await backfill() == 1
+    assert await backfill() == 0
+    async with engine.connect() as conn:  # type: ignore[assignment]
+        row = (await conn.execute(select(songs).where(songs.c.id == song_id))).mappings().one()
+    assert row['chordpro_ast_version'] == AST_FORMAT_VERSION
+    assert load_parsed_song(row['chordpro_ast']) == parse_chordpro(CONTENT)
+    assert row['updated_at'] == updated_at
+
+
+@pytest.mark.asyncio
+async def test_song_admin_stores_ast_on_save() -> None:
+    from app.admin import SongAdmin
+
+    model = type('M', (), {'chordpro_content': '[C]Line'})()
+    data: dict[str, Any] = {'default_key': 'C'}
+    await SongAdmin.__dict__['on_model_change'](None, data, model, True, object())
+    assert data['chordpro_ast_version'] == AST_FORMAT_VERSION
+    assert load_parsed_song(data['chordpro_ast']) == parse_chordpro('[C]Line')
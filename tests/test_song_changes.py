@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from app import search_refresh
+from app import song_changes as song_changes_mod
+from app.cache import LRUCache
+from app.catalog import CatalogVersionCache
+from app.search_index import search_index
+from app.song_changes import CHANNEL, SongChangeBus, SongChangeListener, song_changes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable
+
+NOW = datetime(2026, 10, 17, 12, 30, tzinfo=UTC)
+
+
+class _Connection:
+    """Just the part of an asyncpg connection the listener uses."""
+
+    def __init__(self) -> None:
+        self.listeners: list[Callable[..., None]] = []
+        self.on_close: list[Callable[..., None]] = []
+        self.terminated = False
+
+    def add_termination_listener(self, callback: Callable[..., None]) -> None:
+        self.on_close.append(callback)
+
+    async def add_listener(self, channel: str, callback: Callable[..., None]) -> None:
+        assert channel == CHANNEL
+        self.listeners.append(callback)
+
+    async def fetchval(self, *_args: Any, **_kwargs: Any) -> int:
+        return 1
+
+    def terminate(self) -> None:
+        self.terminated = True
+
+    def notify(self, song_id: uuid.UUID, updated_at: datetime | None) -> None:
+        stamp = updated_at and updated_at.isoformat()
+        payload = json.dumps({'id': str(song_id), 'updated_at': stamp})
+        for callback in self.listeners:
+            callback(self, 1, CHANNEL, payload)
+
+    def close(self) -> None:
+        for callback in self.on_close:
+            callback(self)
+
+
+def _connector(*outcomes: _Connection | Exception) -> Callable[[], Any]:
+    pending = list(outcomes)
+
+    async def connect() -> _Connection:
+        outcome = pending.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return connect
+
+
+async def _settle() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_changes_evict_older_versions_and_deletes_everything() -> None:
+    bus = SongChangeBus()
+    cache: LRUCache[tuple[Any, ...], str] = LRUCache(10)
+    bus.register_cache(cache)
+    song_id, other_id = uuid.uuid4(), uuid.uuid4()
+    later = NOW + timedelta(seconds=1)
+    for key in ((song_id, NOW, 'C'), (song_id, later, 'C'), (other_id, NOW, 'C')):
+        cache.set(key, 'html')
+    bus.handle(json.dumps({'id': str(song_id), 'updated_at': later.isoformat()}))
+    assert (song_id, NOW, 'C') not in cache
+    assert (song_id, later, 'C') in cache
+    bus.handle(json.dumps({'id': str(song_id), 'updated_at': None}))
+    assert (song_id, later, 'C') not in cache
+    assert (other_id, NOW, 'C') in cache
+    bus.handle('not json')
+    assert len(cache) == 0
+    assert (bus.notifications, bus.flushes) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_listener_flushes_after_reconnecting(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(song_changes_mod, 'RECONNECT_SECONDS', (0.0, 0.0))
+    bus = SongChangeBus()
+    cache: LRUCache[tuple[Any, ...], str] = LRUCache(10)
+    bus.register_cache(cache)
+    first, second = _Connection(), _Connection()
+    listener = SongChangeListener(bus, _connector(first, OSError('refused'), second))
+    task = await listener.start()
+    try:
+        song_id = uuid.uuid4()
+        cache.set((song_id, NOW), 'one')
+        cache.set((uuid.uuid4(), NOW), 'two')
+        first.notify(song_id, NOW + timedelta(seconds=1))
+        await _settle()
+        assert len(cache) == 1
+        assert bus.flushes == 0
+        first.close()
+        await _settle()
+        assert first.terminated
+        assert len(cache) == 0
+        assert bus.stats() == {
+            'connected': True,
+            'notifications': 1,
+            'flushes': 1,
+            'reconnects': 1,
+        }
+    finally:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_listener_flushes_when_it_starts_late(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(song_changes_mod, 'RECONNECT_SECONDS', (0.0, 0.0))
+    bus = SongChangeBus()
+    flushes: list[bool] = []
+    bus.subscribe(lambda _song_id, _updated_at: None, lambda: flushes.append(True))
+    task = await SongChangeListener(bus, _connector(OSError('refused'), _Connection())).start()
+    try:
+        assert not bus.connected
+        await _settle()
+        assert bus.connected
+        assert flushes == [True]
+    finally:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_catalog_version_is_read_once_per_change() -> None:
+    bus = SongChangeBus()
+    versions = iter([(NOW, 1), (NOW, 2), (NOW, 3)])
+
+    async def load(_conn: Any) -> tuple[datetime, int]:
+        return next(versions)
+
+    cache = CatalogVersionCache(bus, load)
+    # Without a listener nothing would announce changes, so every lookup reads.
+    assert await cache.get(None) == (NOW, 1)  # type: ignore[arg-type]
+    bus.connected = True
+    assert await cache.get(None) == (NOW, 2)  # type: ignore[arg-type]
+    assert await cache.get(None) == (NOW, 2)  # type: ignore[arg-type]
+    bus.handle(json.dumps({'id': str(uuid.uuid4()), 'updated_at': None}))
+    assert await cache.get(None) == (NOW, 3)  # type: ignore[arg-type]
+    assert cache.loads == 3  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_changes_refresh_a_loaded_search_index_once_per_burst(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    refreshes: list[bool] = []
+
+    async def refresh() -> None:
+        refreshes.append(True)
+        if len(refreshes) == 1:
+            # Changes arriving while the first refresh runs share one more.
+            for _ in range(3):
+                song_changes.publish(uuid.uuid4(), NOW)
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(search_refresh, '_refresh_in_background', refresh)
+    monkeypatch.setattr(search_index, 'ready', True)
+    for _ in range(3):
+        song_changes.publish(uuid.uuid4(), NOW)
+    await _settle()
+    assert len(refreshes) == 2  # noqa: PLR2004
+    song_changes.flush()
+    await _settle()
+    assert len(refreshes) == 3  # noqa: PLR2004
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import re
+import uuid
+from datetime import UTC, datetime
+from http import HTTPStatus
+from typing import Any
+
+import pytest
+
+from app.main import _render_placeholder_article
+from app.settings import settings
+
+
+def _articles(html: str) -> list[str]:
+    return re.findall(r'<article class="song.*?</article>', html, flags=re.DOTALL)
+
+
+def test_placeholder_links_its_fragment_and_escapes_the_title() -> None:
+    song_id = uuid.uuid4()
+    row = {'id': song_id, 'translated_title': '<Grace>', 'updated_at': datetime.now(UTC)}
+    html = _render_placeholder_article(row, 'F#', show_chords=True)
+    assert f'data-fragment="/songs/{song_id}/fragment?key=F%23&amp;chords=1"' in html
+    assert f'href="/?s={song_id}:F%23&amp;chords=1"' in html
+    assert '&lt;Grace&gt;' in html
+    assert '<div class="song-body"></div>' in html
+
+
+@pytest.mark.asyncio
+async def test_fragment_matches_the_setlist_article(client: Any, insert_song: Any) -> None:
+    first = await insert_song('Fragment One', '[C]One')
+    second = await insert_song('Fragment Two', '[G]Two')
+    page = await client.get(f'/?s={first}:D,{second}:')
+    for song_id, key, article in zip(
+        (first, second),
+        ('D', ''),
+        _articles(page.text),
+        strict=True,
+    ):
+        res = await client.get(f'/songs/{song_id}/fragment?key={key}&chords=1')
+        assert res.status_code == HTTPStatus.OK
+        assert res.text == article
+        again = await client.get(
+            f'/songs/{song_id}/fragment?key={key}&chords=1',
+            headers={'If-None-Match': res.headers['etag']},
+        )
+        assert again.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.asyncio
+async def test_fragment_hides_missing_and_draft_songs(client: Any, insert_song: Any) -> None:
+    draft = await insert_song('Fragment Draft', '[C]Hidden', is_draft=True)
+    assert (await client.get(f'/songs/{draft}/fragment')).status_code == HTTPStatus.NOT_FOUND
+    assert (await client.get(f'/songs/{uuid.uuid4()}/fragment')).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('stream_min_songs', [0, 1])
+async def test_setlist_renders_eager_songs_and_placeholders(
+    client: Any,
+    monkeypatch: pytest.MonkeyPatch,
+    stream_min_songs: int,
+    insert_song: Any,
+) -> None:
+    monkeypatch.setattr(settings, 'setlist_stream_min_songs', stream_min_songs)
+    ids = [await insert_song(f'Lazy {n}', f'[C]Line {n}') for n in range(3)]
+    url = '/?s=' + ','.join(f'{song_id}:G' for song_id in ids)
+    full = await client.get(url)
+    monkeypatch.setattr(settings, 'setlist_eager_songs', 1)
+    lazy = await client.get(url)
+    assert lazy.headers['etag'] != full.headers['etag']
+    articles = _articles(lazy.text)
+    assert articles[0] == _articles(full.text)[0]
+    assert [a.startswith('<article class="song song-placeholder"') for a in articles] == [
+        False,
+        True,
+        True,
+    ]
+    assert 'Line 2' not in lazy.text
+    assert f'data-fragment="/songs/{ids[2]}/fragment?key=G&amp;chords=1"' in lazy.text
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import zlib
+from http import HTTPStatus
+from typing import Any
+
+import pytest
+
+from app.middleware import FlushingGZipResponse
+from app.settings import settings
+
+
+@pytest.fixture
+def streaming(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'setlist_stream_min_songs', 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('streaming')
+async def test_streamed_setlist_matches_buffered_page(
+    client: Any,
+    monkeypatch: Any,
+    insert_song: Any,
+) -> None:
+    first = await insert_song('Stream One', '[C]One')
+    second = await insert_song('Stream Two', '[G]Two')
+    url = f'/?s={first}:D,{second}:A'
+    streamed = await client.get(url)
+    monkeypatch.setattr(settings, 'setlist_stream_min_songs', 0)
+    buffered = await client.get(url)
+    assert streamed.status_code == buffered.status_code == 200
+    assert streamed.text == buffered.text
+    assert streamed.headers['etag'] == buffered.headers['etag']
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('streaming')
+async def test_streamed_setlist_keeps_404_and_inlines_parse_errors(
+    client: Any,
+    insert_song: Any,
+) -> None:
+    import uuid
+
+    good = await insert_song('Good Song', '[C]Fine')
+    broken = await insert_song('Broken Song', '{start_of_section: A}\n[C]x')
+    missing = await client.get(f'/?s={good},{uuid.uuid4()}')
+    assert missing.status_code == 404
+    res = await client.get(f'/?s={good},{broken}')
+    assert res.status_code == 200
+    assert 'Fine' in res.text
+    assert 'class="song song-error"' in res.text
+    assert 'Broken Song' in res.text
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('streaming')
+async def test_streamed_setlist_gzip_chunks_decode_progressively(insert_song: Any) -> None:
+    from app.main import app
+
+    first = await insert_song('Zip One', '[C]One ' * 200)
+    second = await insert_song('Zip Two', '[G]Two ' * 200)
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/',
+        'raw_path': b'/',
+        'root_path': '',
+        'scheme': 'http',
+        'query_string': f's={first},{second}'.encode(),
+        'headers': [(b'host', b'test'), (b'accept-encoding', b'gzip')],
+        'client': ('test', 1),
+        'server': ('test', 80),
+        'http_version': '1.1',
+    }
+    messages: list[dict[str, Any]] = []
+
+    request_sent = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.Event().wait()
+        request_sent = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    assert (b'content-encoding', b'gzip') in start['headers']
+    bodies = [m['body'] for m in messages[1:] if m['body']]
+    assert len(bodies) > 2
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    head = decoder.decompress(bodies[0]).decode()
+    assert '<div class="song-container">' in head
+    whole = gzip.decompress(b''.join(bodies)).decode()
+    assert whole.count('<article class="song">') == 2
+
+
+@pytest.mark.asyncio
+async def test_flushing_gzip_response_flushes_every_chunk() -> None:
+    async def chunks() -> Any:
+        for n in range(3):
+            yield f'<p>chunk {n}</p>'
+
+    messages: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        await asyncio.Event().wait()
+        return {}  # pragma: no cover
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    response = FlushingGZipResponse(chunks(), media_type='text/html')
+    await response({'type': 'http', 'asgi': {'spec_version': '2.3'}}, receive, send)
+    assert (b'content-encoding', b'gzip') in messages[0]['headers']
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    decoded = [decoder.decompress(m['body']).decode() for m in messages[1:]]
+    assert decoded[:3] == ['<p>chunk 0</p>', '<p>chunk 1</p>', '<p>chunk 2</p>']
+    assert decoder.eof
+
+
+@pytest.mark.asyncio
+async def test_app_gzips_buffered_responses(client: Any) -> None:
+    res = await client.get('/static/css/base.css', headers={'Accept-Encoding': 'gzip'})
+    assert res.status_code == HTTPStatus.OK
+    assert res.headers['content-encoding'] == 'gzip'
+    assert 'body' in res.text
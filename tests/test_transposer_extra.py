@@ -47,3 +47,26 @@ def test_prefer_sharps_minor_circle_of_fifths() -> None:
     assert prefer_sharps_for_key('Bbm') is False
     assert prefer_sharps_for_key('Ebm') is True
     assert prefer_sharps_for_key('Abm') is True
+
+
+def test_transpose_parsed_song_returns_new_song_and_memoizes() -> None:
+    from app.cache import transposed_chords
+    from app.parser import parse_chordpro
+    from app.transposer import transpose_parsed_song
+
+    parsed = parse_chordpro('[C]One [G/B]two\n[C]three [Am]four\n\nno chords')
+    transposed_chords.clear()
+    misses_before = transposed_chords.misses
+    out = transpose_parsed_song(parsed, 2, True, transposed_chords)
+    assert [line.chords for line in out.sections[0].lines] == [
+        ['D', 'A/C#'],
+        ['D', 'Bm'],
+        [],
+        [],
+    ]
+    assert out.sections[0].lines[0].lyrics == 'One two'
+    assert parsed.sections[0].lines[0].chords == ['C', 'G/B']
+    # One miss per distinct symbol, then a second song pass is served from the memo.
+    assert transposed_chords.misses == misses_before + 3
+    transpose_parsed_song(parsed, 2, True, transposed_chords)
+    assert transposed_chords.misses == misses_before + 3
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pytest
+from pychord import QualityManager  # type: ignore[import-not-found]
+from pychord.constants import NOTE_VAL_DICT  # type: ignore[import-not-found]
+
+from app.transposer import transpose_chord_symbol
+from benchmarks.reference import legacy_transpose_chord_symbol
+
+QUALITIES = sorted(QualityManager().get_qualities())
+
+
+@pytest.mark.parametrize('quality', QUALITIES)
+def test_matches_pychord_for_every_quality(quality: str) -> None:
+    for root in NOTE_VAL_DICT:
+        symbol = f'{root}{quality}'
+        for semitones in range(12):
+            for prefer_sharps in (True, False):
+                expected = legacy_transpose_chord_symbol(symbol, semitones, prefer_sharps)
+                assert transpose_chord_symbol(symbol, semitones, prefer_sharps) == expected
+
+
+@pytest.mark.parametrize('bass', sorted(NOTE_VAL_DICT))
+def test_matches_pychord_for_slash_chords(bass: str) -> None:
+    for symbol in (f'C/{bass}', f'F#m7/{bass}', f'Bbsus4/{bass}', f'Ebmaj7/{bass}'):
+        for semitones in range(12):
+            for prefer_sharps in (True, False):
+                expected = legacy_transpose_chord_symbol(symbol, semitones, prefer_sharps)
+                assert transpose_chord_symbol(symbol, semitones, prefer_sharps) == expected
+
+
+def test_unknown_quality_is_kept_and_invalid_note_rejected() -> None:
+    assert transpose_chord_symbol('Csus4add13', 2) == 'Dsus4add13'
+    with pytest.raises(ValueError, match='Invalid note'):
+        transpose_chord_symbol('H7', 2)
+    with pytest.raises(ValueError, match='Invalid note'):
+        transpose_chord_symbol('C/', 2)
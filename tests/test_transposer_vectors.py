@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import re
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import insert
+
+from app.db import songs
+from app.renderer import render_song_body
+from app.song_ast import load_parsed_song
+from app.transposer import compute_semitone_interval, prefer_sharps_for_key, transpose_chord_symbol
+
+ROOT = Path(__file__).resolve().parents[1]
+VECTORS_PATH = Path(__file__).with_name('transposer_vectors.json')
+TRANSPOSER_JS = ROOT / 'static' / 'js' / 'transposer.js'
+VECTORS = json.loads(VECTORS_PATH.read_text(encoding='utf-8'))
+
+# Runs every vector through static/js/transposer.js and prints the indexes that disagree.
+NODE_CHECK = """
+const [transposerPath, vectorsPath] = process.argv.slice(1);
+const t = require(transposerPath);
+const v = JSON.parse(require('fs').readFileSync(vectorsPath, 'utf8'));
+const attempt = f => { try { return f(); } catch (e) { return null; } };
+const failed = {
+  chords: v.chords.flatMap(([s, n, p, out], i) =>
+    attempt(() => t.transposeChordSymbol(s, n, p === null ? undefined : p)) === out ? [] : [i]),
+  intervals: v.intervals.flatMap(([a, b, out], i) =>
+    t.computeSemitoneInterval(a, b) === out ? [] : [i]),
+  prefer_sharps: v.prefer_sharps.flatMap(([k, out], i) =>
+    t.preferSharpsForKey(k) === out ? [] : [i]),
+  songs: v.songs.flatMap((c, i) =>
+    t.renderSongBody(c.sections, c.default_key, c.target_key, c.show_chords, c.layout) === c.html
+      ? [] : [i]),
+};
+console.log(JSON.stringify(failed));
+"""
+
+
+def _transpose(symbol: str, semitones: int, prefer_sharps: bool | None) -> str | None:
+    try:
+        return transpose_chord_symbol(symbol, semitones, prefer_sharps)
+    except ValueError:
+        return None
+
+
+def test_python_matches_vectors() -> None:
+    for symbol, semitones, prefer, expected in VECTORS['chords']:
+        assert _transpose(symbol, semitones, prefer) == expected, symbol
+    for from_key, to_key, expected in VECTORS['intervals']:
+        assert compute_semitone_interval(from_key, to_key) == expected, (from_key, to_key)
+    for key, expected in VECTORS['prefer_sharps']:
+        assert prefer_sharps_for_key(key) is expected, key
+    for case in VECTORS['songs']:
+        parsed = load_parsed_song([case['sections'], []])
+        html = render_song_body(
+            parsed,
+            case['default_key'],
+            case['target_key'],
+            case['show_chords'],
+            case.get('layout', 'wrapped'),
+        )
+        assert html == case['html']
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_javascript_matches_vectors() -> None:
+    node = shutil.which('node')
+    assert node is not None
+    out = subprocess.run(  # noqa: S603
+        [node, '-e', NODE_CHECK, str(TRANSPOSER_JS), str(VECTORS_PATH)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    failed: dict[str, Any] = json.loads(out.stdout)
+    assert failed == {name: [] for name in VECTORS}
+
+
+@pytest.mark.asyncio
+async def test_song_json_is_immutable_per_version(client: Any) -> None:
+    from app.db import engine
+
+    async with engine.begin() as db_conn:
+        result = await db_conn.execute(
+            insert(songs)
+            .values(translated_title='Portable', chordpro_content='[Bb]Line', default_key='Bb')
+            .returning(songs.c.id),
+        )
+        song_id = result.scalar_one()
+
+    page = await client.get(f'/?s={song_id}:C')
+    version = re.search(r'data-version="(\d+)"', page.text).group(1)  # type: ignore[union-attr]
+    res = await client.get(f'/api/songs/{song_id}?v={version}')
+    assert res.headers['cache-control'] == 'public, max-age=31536000, immutable'
+    song = res.json()
+    assert (song['default_key'], song['sections']) == ('Bb', [['section', [[['Bb'], [0], 'Line']]]])
+    unversioned = await client.get(f'/api/songs/{song_id}')
+    assert unversioned.headers['cache-control'] == 'no-cache'
+    again = await client.get(
+        f'/api/songs/{song_id}',
+        headers={'If-None-Match': unversioned.headers['etag']},
+    )
+    assert again.status_code == 304  # noqa: PLR2004